@@ -0,0 +1,112 @@
+"""Admission control in front of the connection pool.
+
+Every ``Database`` call is admitted by one of two limiters, ``readers`` or
+``writers``, each with its own budget of concurrent operations (together no
+more than the pool size) and its own bounded wait queue. A call over budget
+waits its turn in the queue for at most ``ADMISSION_QUEUE_TIMEOUT`` seconds. A
+call that finds the queue full, or outwaits the timeout, is turned away at once
+with 503 and ``Retry-After``, so a burst of submissions sheds load instead of
+piling up behind MySQL. Writes have a budget of their own so a burst of them
+cannot starve the dashboard reads, and the other way round.
+"""
+import asyncio
+import time
+from collections import deque
+
+from fastapi import HTTPException
+
+import metrics
+from config import config
+
+POOL_SIZE = int(config.get('DB_POOL_SIZE', 10))
+WRITE_CONCURRENCY = int(config.get('DB_WRITE_CONCURRENCY', max(1, POOL_SIZE // 3)))
+READ_CONCURRENCY = int(config.get('DB_READ_CONCURRENCY', max(1, POOL_SIZE - WRITE_CONCURRENCY)))
+READ_QUEUE_SIZE = int(config.get('DB_READ_QUEUE_SIZE', 200))
+WRITE_QUEUE_SIZE = int(config.get('DB_WRITE_QUEUE_SIZE', 100))
+QUEUE_TIMEOUT = float(config.get('ADMISSION_QUEUE_TIMEOUT', 5))
+RETRY_AFTER = int(config.get('ADMISSION_RETRY_AFTER', 1))
+
+ADMISSION_WAIT = metrics.Histogram("db_admission_wait_seconds", "Time spent queued for a database budget", ("kind",))
+ADMISSION_REJECTED = metrics.Counter("db_admission_rejected_total", "Database calls turned away with 503",
+                                     ("kind", "reason"))
+metrics.METRICS.extend([ADMISSION_WAIT, ADMISSION_REJECTED])
+
+class Limiter:
+    """At most ``limit`` operations at once and ``queue_size`` waiting; the rest get a 503. Event-loop only."""
+
+    def __init__(self, kind, limit, queue_size, timeout=QUEUE_TIMEOUT):
+        self.kind = kind
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self._waiters = deque()
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    async def acquire(self):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full")
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # release() hands its slot straight to the waiter, so ``active`` is already counted
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self._forget(waiter)
+            self._reject("timeout")
+        except BaseException:
+            # Cancelled while queued; if the slot was handed over in the meantime, pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._forget(waiter)
+            raise
+        finally:
+            ADMISSION_WAIT.observe(time.perf_counter() - started, (self.kind,))
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+    def _forget(self, waiter):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _reject(self, reason):
+        ADMISSION_REJECTED.inc((self.kind, reason))
+        raise HTTPException(status_code=503, detail=f"Too many concurrent database {self.kind}s; retry shortly",
+                            headers={"Retry-After": str(RETRY_AFTER)})
+
+readers = Limiter("read", READ_CONCURRENCY, READ_QUEUE_SIZE)
+writers = Limiter("write", WRITE_CONCURRENCY, WRITE_QUEUE_SIZE)
+
+def _render_gauges():
+    for name, help, value in (("active", "Database calls running, by budget", lambda limiter: limiter.active),
+                              ("queued", "Database calls waiting for their budget", lambda limiter: limiter.queued),
+                              ("limit", "Concurrent database calls each budget allows", lambda limiter: limiter.limit)):
+        metric = f"db_admission_{name}"
+        yield f"# HELP {metric} {help}"
+        yield f"# TYPE {metric} gauge"
+        for limiter in (readers, writers):
+            yield f'{metric}{{kind="{limiter.kind}"}} {value(limiter)}'
+
+metrics.collectors.append(_render_gauges)
@@ -0,0 +1,112 @@
+"""Cross-term grade distribution trends, computed with NumPy.
+
+``load_columns`` reads the grade counts of every evaluation in a term range with
+one query, in batches, into one array per column. ``grade_trends`` then groups
+them by (course, instructor or objective) and term without a Python loop over
+evaluations: ``np.unique`` numbers the groups and terms, ``np.bincount`` sums the
+counts of each (group, term) cell, and the moving window and the change from the
+previous term are differences of cumulative sums within each group's run of
+cells. Windows and changes count the terms a group has data for, so a course
+that skips a term compares against the last term it ran.
+"""
+import asyncio
+from typing import List, Literal, Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, Query, Response
+
+import queries
+from database import get_db
+from models import GradeTrendPoint
+from pagination import Page, paginate_items, MIN_INT, MIN_STR
+from terms import SEMESTER_SORT_ORDER, term_range
+from versions import conditional
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+COLUMNS = ("term_index", "course_number", "instructor_id", "objective_code", "a_count", "b_count", "c_count", "f_count")
+GRADES = ("a", "b", "c", "f")
+DIMENSIONS = {"course": "course_number", "instructor": "instructor_id", "objective": "objective_code"}
+FETCH_BATCH_SIZE = 50_000
+
+_SEMESTERS = {order: name for name, order in SEMESTER_SORT_ORDER.items()}
+
+def columns_from_rows(rows):
+    """Turn ``COLUMNS``-ordered tuples into ``{column: array}``."""
+    values = list(zip(*rows)) or [()] * len(COLUMNS)
+    columns = {name: np.fromiter(column, np.int64, len(rows)) for name, column in zip(COLUMNS, values) if name != "course_number"}
+    columns["course_number"] = np.array(values[1], dtype=str)
+    return columns
+
+def load_columns(conn, start, end, course_number=None, instructor_id=None, objective_code=None):
+    batches = []
+    with conn.cursor() as cursor:
+        cursor.execute(queries.ANALYTICS_EVALUATIONS, (start, end, course_number, course_number, instructor_id, instructor_id,
+                                                       objective_code, objective_code))
+        while True:
+            rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            # Converting batch by batch keeps the tuples of only one batch alive at a time
+            batches.append(columns_from_rows(rows))
+    if not batches:
+        return columns_from_rows([])
+    return {name: np.concatenate([batch[name] for batch in batches]) for name in COLUMNS}
+
+def grade_trends(columns, dimension, window=3):
+    """One row per (group, term with evaluations), ordered by group then term."""
+    labels, group = np.unique(columns[DIMENSIONS[dimension]], return_inverse=True)
+    terms, term = np.unique(columns["term_index"], return_inverse=True)
+    # One slot per (group, term); only the slots with evaluations become points
+    cell = group * len(terms) + term
+    evaluations = np.bincount(cell, minlength=len(labels) * len(terms))
+    cells = np.flatnonzero(evaluations)
+    evaluations = evaluations[cells]
+    counts = np.stack([np.bincount(cell, weights=columns[f"{grade}_count"], minlength=len(labels) * len(terms))[cells]
+                       for grade in GRADES])
+    cell_group = cells // len(terms)
+    cell_term = terms[cells % len(terms)]
+
+    position = np.arange(len(cells))
+    # Cells are sorted group-major, so each group's cells are one run starting at its first cell
+    first = np.searchsorted(cell_group, cell_group, side="left")
+    cumulative = np.concatenate([np.zeros((len(GRADES), 1)), np.cumsum(counts, axis=1)], axis=1)
+    moving = cumulative[:, position + 1] - cumulative[:, np.maximum(position + 1 - window, first)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percent = 100 * counts / counts.sum(axis=0)
+        moving_percent = 100 * moving / moving.sum(axis=0)
+    change = np.diff(percent, axis=1, prepend=np.nan)
+    change[:, position == first] = np.nan
+
+    def rounded(values):
+        return np.round(values, 2).tolist()
+
+    fields = {
+        "key": labels[cell_group].tolist(),
+        "term_index": cell_term.tolist(),
+        "year": ((cell_term - 1) // 4).tolist(),
+        "semester": [_SEMESTERS[order] for order in ((cell_term - 1) % 4 + 1).tolist()],
+        "evaluations": evaluations.tolist(),
+        **{f"{grade}_count": counts[i].astype(np.int64).tolist() for i, grade in enumerate(GRADES)},
+        **{f"percent_{grade}": rounded(percent[i]) for i, grade in enumerate(GRADES)},
+        **{f"moving_percent_{grade}": rounded(moving_percent[i]) for i, grade in enumerate(GRADES)},
+        **{f"change_percent_{grade}": rounded(change[i]) for i, grade in enumerate(GRADES)},
+    }
+    names = tuple(fields)
+    return [dict(zip(names, values)) for values in zip(*fields.values())]
+
+@router.get("/grade-trends/{dimension}", response_model=List[GradeTrendPoint],
+            dependencies=[Depends(conditional("sections", "course_evaluations"))],
+            summary="A/B/C/F distribution per course, instructor or objective and term, with moving averages and term-over-term changes")
+async def get_grade_trends(response: Response, dimension: Literal["course", "instructor", "objective"], terms=Depends(term_range),
+                           window: int = Query(3, ge=1, le=40, description="Terms in the moving average"),
+                           course_number: Optional[str] = Query(None, description="Only this course"),
+                           instructor_id: Optional[int] = Query(None, description="Only this instructor"),
+                           objective_code: Optional[int] = Query(None, description="Only this learning objective"),
+                           page: Page = Depends(), db=Depends(get_db)):
+    """Percentages are of all A/B/C/F grades given in the term, null where none were. ``limit`` counts points."""
+    columns = await db.run(load_columns, *terms, course_number, instructor_id, objective_code, read=True)
+    # NumPy releases the GIL for most of the work, so run it off the event loop
+    points = await asyncio.to_thread(grade_trends, columns, dimension, window)
+    return paginate_items(points, page.keyset(MIN_STR if dimension == "course" else MIN_INT, MIN_INT), page, response,
+                          key=lambda point: (point["key"], point["term_index"]), model=GradeTrendPoint)
@@ -0,0 +1,109 @@
+"""Time the NumPy grade trends against a per-row Python group-by at 1M evaluations.
+
+Synthesizes ``--rows`` evaluations spread over ``--terms`` terms, ``--courses``
+courses, ``--instructors`` instructors and five objectives, then for each
+dimension times ``analytics.grade_trends`` on the columns and a plain Python
+implementation (dicts keyed by group and term, then a loop over each group's
+terms) on the same rows as tuples, and checks they agree. Also times
+``columns_from_rows``, the per-batch conversion ``load_columns`` does after the
+fetch. No database needed.
+
+    python benchmarks/bench_analytics.py --rows 1000000
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import COLUMNS, DIMENSIONS, columns_from_rows, grade_trends  # noqa: E402
+
+
+def synthesize(rows, terms, courses, instructors, seed=7330):
+    rng = np.random.default_rng(seed)
+    columns = {
+        "term_index": 8004 + rng.integers(0, terms, rows),
+        "course_number": np.char.add("CS", (1000 + rng.integers(0, courses, rows)).astype(str)),
+        "instructor_id": 1 + rng.integers(0, instructors, rows),
+        "objective_code": 1 + rng.integers(0, 5, rows),
+    }
+    for grade, high in zip("abcf", (30, 20, 10, 5)):
+        columns[f"{grade}_count"] = rng.integers(0, high, rows)
+    return columns
+
+
+def python_trends(rows, dimension, window):
+    """The same series, one dict update per evaluation."""
+    index = COLUMNS.index(DIMENSIONS[dimension])
+    cells = defaultdict(lambda: [0, 0, 0, 0, 0])
+    for row in rows:
+        cell = cells[row[index], row[0]]
+        cell[0] += 1
+        for i in range(4):
+            cell[i + 1] += row[4 + i]
+    by_group = defaultdict(list)
+    for (key, term), cell in sorted(cells.items()):
+        by_group[key].append((term, cell))
+    points = []
+    for key, series in by_group.items():
+        previous = None
+        for position, (term, cell) in enumerate(series):
+            total = sum(cell[1:])
+            percent = [100 * count / total if total else math.nan for count in cell[1:]]
+            moving = [sum(c[i + 1] for _, c in series[max(0, position + 1 - window):position + 1]) for i in range(4)]
+            moving_percent = [100 * count / sum(moving) if sum(moving) else math.nan for count in moving]
+            change = [p - q for p, q in zip(percent, previous)] if previous else [math.nan] * 4
+            points.append((key, term, cell[0], percent, moving_percent, change))
+            previous = percent
+    return points
+
+
+def agree(numpy_points, python_points):
+    if len(numpy_points) != len(python_points):
+        return False
+    for point, (key, term, evaluations, percent, moving_percent, change) in zip(numpy_points, python_points):
+        if (point["key"], point["term_index"], point["evaluations"]) != (key, term, evaluations):
+            return False
+        for prefix, expected in (("percent", percent), ("moving_percent", moving_percent), ("change_percent", change)):
+            actual = [point[f"{prefix}_{grade}"] for grade in "abcf"]
+            if not all((math.isnan(e) and (a is None or math.isnan(a))) or abs(a - e) < 0.01
+                       for a, e in zip(actual, expected)):
+                return False
+    return True
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--terms", type=int, default=100)
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--instructors", type=int, default=2000)
+    parser.add_argument("--window", type=int, default=3)
+    args = parser.parse_args()
+
+    columns = synthesize(args.rows, args.terms, args.courses, args.instructors)
+    rows = list(zip(*(columns[name].tolist() for name in COLUMNS)))
+    convert, _ = timed(columns_from_rows, rows)
+    print(f"{args.rows:,} evaluations; columns_from_rows {convert * 1000:.0f} ms")
+    print(f"{'dimension':<12} {'points':>8} {'python ms':>10} {'numpy ms':>10} {'speedup':>8}")
+    for dimension in DIMENSIONS:
+        python, expected = timed(python_trends, rows, dimension, args.window)
+        vectorized, points = timed(grade_trends, columns, dimension, args.window)
+        if not agree(points, expected):
+            sys.exit(f"{dimension}: the two implementations disagree")
+        print(f"{dimension:<12} {len(points):>8} {python * 1000:>10.0f} {vectorized * 1000:>10.0f} {python / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
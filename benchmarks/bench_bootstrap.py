@@ -0,0 +1,77 @@
+"""Time a dashboard page load: the old request fan-out against one /bootstrap request.
+
+``before`` issues the requests the page used to make on load: the instructor,
+degree and learning objective lists and the section status of the current term,
+with the lists in parallel as the browser sends them and the status after them.
+``after`` issues ``GET /bootstrap``. ``--rtt-ms`` adds that much delay to every
+request to stand in for the network between browser and server, which is where
+the round trips cost the most. Requests go to ``main.app`` in-process unless
+``--url`` points at a running server. Load a dataset first
+(``benchmarks/generate_data.py``).
+
+    python benchmarks/bench_bootstrap.py --repeat 50 --rtt-ms 40
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LISTS = ("/instructors/", "/degrees/", "/learning-objectives/")
+
+
+async def get(client, path, rtt, **params):
+    await asyncio.sleep(rtt)
+    response = await client.get(path, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+async def before(client, rtt, term):
+    await asyncio.gather(*(get(client, path, rtt) for path in LISTS))
+    await get(client, "/sections-evaluation-status/", rtt, **term)
+    return 1 + len(LISTS)
+
+
+async def after(client, rtt, term):
+    await get(client, "/bootstrap", rtt)
+    return 1
+
+
+async def timed(load, client, rtt, term, repeat):
+    await load(client, rtt, term)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        requests = await load(client, rtt, term)
+    return (time.perf_counter() - started) / repeat, requests
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--rtt-ms", type=float, default=0, help="Delay added to every request")
+    parser.add_argument("--url", help="Base URL of a running server; defaults to the in-process app")
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    async with client:
+        term = (await get(client, "/bootstrap", 0))["current_term"]
+        if term is None:
+            sys.exit("No semesters found; load a dataset with benchmarks/generate_data.py first")
+        print(f"{'page load':<10} {'requests':>9} {'ms':>8}")
+        for label, load in (("before", before), ("after", after)):
+            elapsed, requests = await timed(load, client, args.rtt_ms / 1000, term, args.repeat)
+            print(f"{label:<10} {requests:>9} {elapsed * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
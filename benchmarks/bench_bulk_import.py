@@ -0,0 +1,65 @@
+"""Time a bulk section import.
+
+Generates ``--rows`` sections for an existing instructor and course, spread over a
+few years of terms, and posts them to ``/bulk/sections`` as one CSV upload, either
+in-process against ``main.app`` or against a running server via ``--url``. Section
+numbers start at ``--first-section``; pick a fresh range for every run, since rows
+that already exist come back as errors.
+
+    python benchmarks/bench_bulk_import.py --instructor 1 --course CS1000 --rows 50000
+"""
+import argparse
+import asyncio
+import csv
+import io
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEMESTERS = ("Winter", "Spring", "Summer", "Fall")
+
+
+def sections_csv(rows, first_section, instructor, course):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(("section_number", "number_of_students", "instructor_id", "course_number", "year", "semester"))
+    for i in range(rows):
+        writer.writerow((first_section + i, 20 + i % 30, instructor, course, 2020 + i % 5, SEMESTERS[i % 4]))
+    return out.getvalue()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--first-section", type=int, default=1_000_000)
+    parser.add_argument("--instructor", type=int, required=True)
+    parser.add_argument("--course", required=True)
+    parser.add_argument("--url", help="Base URL of a running server; defaults to the in-process app")
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=None)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None)
+
+    body = sections_csv(args.rows, args.first_section, args.instructor, args.course)
+    async with client:
+        started = time.perf_counter()
+        response = await client.post("/bulk/sections", content=body, headers={"Content-Type": "text/csv"})
+        elapsed = time.perf_counter() - started
+
+    response.raise_for_status()
+    report = response.json()
+    print(f"{report['imported']}/{report['received']} rows imported in {elapsed:.2f}s "
+          f"({report['imported'] / elapsed:,.0f} rows/s), {len(report['errors'])} errors")
+    for error in report['errors'][:5]:
+        print(f"  row {error['row']}: {error['error']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
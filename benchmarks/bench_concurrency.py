@@ -0,0 +1,69 @@
+"""Measure how well concurrent requests overlap on a single worker.
+
+Fires ``--requests`` GETs at one route with ``--concurrency`` in flight at a
+time, either in-process against ``main.app`` or against a running server via
+``--url``, and prints throughput and latency percentiles. Run it from the repo
+root (so config.txt is found) on two commits to compare them:
+
+    python benchmarks/bench_concurrency.py --path "/sections-evaluation-status/?year=2024&semester=Fall"
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def run(client, path, total, concurrency):
+    latencies = []
+    statuses = {}
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - started, sorted(latencies), statuses
+
+
+def percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/degrees/")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--url", help="Base URL of a running server; defaults to the in-process app")
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    async with client:
+        await client.get(args.path)  # warm the pool
+        elapsed, latencies, statuses = await run(client, args.path, args.requests, args.concurrency)
+
+    print(f"{args.path}: {args.requests} requests, concurrency {args.concurrency}")
+    print(f"  throughput  {args.requests / elapsed:8.1f} req/s")
+    print(f"  latency p50 {percentile(latencies, 50) * 1000:8.1f} ms  "
+          f"p95 {percentile(latencies, 95) * 1000:8.1f} ms  mean {statistics.mean(latencies) * 1000:8.1f} ms")
+    print(f"  status codes {statuses}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""Compare evaluation upserts one row per request with one batch per request.
+
+Builds an evaluation for every (section, objective) pair given, then submits
+them ``--rounds`` times each way: through ``/update-evaluation/``, one request per
+row with ``--concurrency`` in flight, and through ``/update-evaluations/``, one
+request for the whole set. Each round changes the counts so every row is really
+updated. The sections and objectives must already exist.
+
+    python benchmarks/bench_evaluation_upsert.py --sections 1 2 3 4 5 6 7 8 9 10 --objectives 1 2 3 4 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def evaluations(sections, objectives, round_number):
+    return [{
+        "section_ID": section, "objective_code": objective, "eval_criteria": "Benchmark",
+        "eval_A_count": round_number, "eval_B_count": 5, "eval_C_count": 3, "eval_F_count": 1,
+        "improvements": f"round {round_number}",
+    } for section in sections for objective in objectives]
+
+
+async def single_rows(client, rows, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(row):
+        async with gate:
+            (await client.post("/update-evaluation/", json=row)).raise_for_status()
+
+    await asyncio.gather(*(one(row) for row in rows))
+
+
+async def batch(client, rows):
+    (await client.post("/update-evaluations/", json=rows)).raise_for_status()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, nargs="+", required=True)
+    parser.add_argument("--objectives", type=int, nargs="+", required=True)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--url", help="Base URL of a running server; defaults to the in-process app")
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    rows = len(args.sections) * len(args.objectives)
+    async with client:
+        for name, submit in (("single-row", lambda rows: single_rows(client, rows, args.concurrency)),
+                             ("batch", lambda rows: batch(client, rows))):
+            started = time.perf_counter()
+            for round_number in range(1, args.rounds + 1):
+                # Offset the batch rounds so they never write what the single-row rounds left behind
+                await submit(evaluations(args.sections, args.objectives, round_number + (args.rounds if name == "batch" else 0)))
+            elapsed = time.perf_counter() - started
+            print(f"{name:<11} {rows * args.rounds} rows in {elapsed:.2f}s  {rows * args.rounds / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
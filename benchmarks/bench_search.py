@@ -0,0 +1,87 @@
+"""Time /search queries against an index of 100k learning objectives.
+
+Fills a ``search.SearchIndex`` with ``--objectives`` synthetic objectives and
+``--courses`` courses, their words drawn from a Zipf-distributed vocabulary of
+``--vocabulary`` words so that some words are in most documents and most words
+in few. Then times type-ahead queries (one to three letters of a word), common
+and rare single words, and multi-word queries, reporting p50 and p99 latency
+per kind. No database needed.
+
+    python benchmarks/bench_search.py --objectives 100000
+"""
+import argparse
+import itertools
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search import SearchIndex  # noqa: E402
+
+
+def vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))))
+    return sorted(words)
+
+
+def build(args, rng):
+    words = vocabulary(args.vocabulary, rng)
+    # Word frequency by rank, with the ranks shuffled so common words are not all early in the alphabet
+    rng.shuffle(words)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+
+    def text(count):
+        return " ".join(rng.choices(words, cum_weights=cum_weights, k=count))
+
+    index = SearchIndex()
+    started = time.perf_counter()
+    for number in range(args.courses):
+        index.add_course(f"CS{1000 + number}", text(rng.randint(2, 5)))
+    for code in range(args.objectives):
+        index.add_objective(code, text(rng.randint(3, 8)), text(rng.randint(10, 40)))
+    return index, words, time.perf_counter() - started
+
+
+def queries(words, rng, count):
+    # ``words`` is in frequency rank order
+    common, rare = words[:20], words[len(words) // 2:]
+    return {
+        "prefix (1-3 letters)": [rng.choice(words)[:rng.randint(1, 3)] for _ in range(count)],
+        "common word": [rng.choice(common) for _ in range(count)],
+        "rare word": [rng.choice(rare) for _ in range(count)],
+        "two words + prefix": [f"{rng.choice(common)} {rng.choice(words)} {rng.choice(words)[:3]}" for _ in range(count)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objectives", type=int, default=100_000)
+    parser.add_argument("--courses", type=int, default=2_000)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7330)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index, words, elapsed = build(args, rng)
+    print(f"indexed {args.objectives:,} objectives and {args.courses:,} courses in {elapsed:.1f} s")
+    print(f"{'query':<22} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, texts in queries(words, rng, args.queries).items():
+        timings = []
+        for text in texts:
+            started = time.perf_counter()
+            index.search(text, limit=args.limit)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        print(f"{label:<22} {timings[len(timings) // 2] * 1000:>8.2f} {timings[int(len(timings) * 0.99)] * 1000:>8.2f} "
+              f"{timings[-1] * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
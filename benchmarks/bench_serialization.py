@@ -0,0 +1,90 @@
+"""Time a 10k-row list response through the response_model path and the RowsResponse path.
+
+For each response model a list route uses, builds ``--rows`` rows shaped like
+the database rows behind it and serves them from two routes of a throwaway app:
+``before`` returns the list and lets FastAPI validate every row against
+``response_model`` and encode it with ``json.dumps``; ``after`` returns
+``serialization.rows_response``, which projects the rows and encodes them with
+orjson. Both bodies are checked to decode to the same JSON. No database needed.
+
+    python benchmarks/bench_serialization.py --rows 10000 --repeat 20
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import CourseResponse, Section, SectionEvaluation, SectionEvaluationDetail  # noqa: E402
+from routes import _nest_evaluation  # noqa: E402
+from serialization import rows_response  # noqa: E402
+
+
+def evaluation(i):
+    return {"eval_ID": i + 1, "section_ID": i, "objective_code": 1 + i % 5, "eval_criteria": "Exam", "eval_A_count": 20,
+            "eval_B_count": 10, "eval_C_count": 5, "eval_F_count": 2, "improvements": "Revise the assessment rubric."}
+
+
+def section(i):
+    return {"section_number": i, "number_of_students": 37, "instructor_id": 1 + i % 2000, "course_number": "CS1000",
+            "year": 2000 + i % 25, "semester": "Fall", "term_index": 8004 + i % 100}
+
+
+# (label, response model, row builder, shape applied before encoding)
+CASES = (
+    ("CourseResponse (courses-by-degree)", CourseResponse,
+     lambda i: {"course_number": f"CS{1000 + i}", "course_name": f"Course {i}", "is_core_course": i % 2}, None),
+    ("Section (list-sections)", Section, section, None),
+    ("SectionEvaluationDetail (sections-by-instructor-degree-semester)", SectionEvaluationDetail,
+     lambda i: {**section(i), "course_name": "Intro to Computing", **evaluation(i)}, None),
+    ("SectionEvaluation (sections-with-evaluations)", SectionEvaluation,
+     lambda i: {**section(i), **evaluation(i)}, _nest_evaluation),
+)
+
+
+def build_app(rows, model, shape):
+    app = FastAPI()
+
+    @app.get("/before", response_model=List[model])
+    async def before():
+        return [shape(row) for row in rows] if shape else rows
+
+    @app.get("/after", response_model=List[model])
+    async def after(response: Response):
+        return rows_response([shape(row) for row in rows] if shape else rows, response, model)
+
+    return app
+
+
+def timed(client, path, repeat):
+    client.get(path).raise_for_status()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = client.get(path).content
+    return (time.perf_counter() - started) / repeat, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'response model':<66} {'before ms':>10} {'after ms':>10} {'speedup':>8} {'KiB':>8}")
+    for label, model, row, shape in CASES:
+        rows = [row(i) for i in range(args.rows)]
+        client = TestClient(build_app(rows, model, shape))
+        before, _ = timed(client, "/before", args.repeat)
+        after, body = timed(client, "/after", args.repeat)
+        if client.get("/before").json() != client.get("/after").json():
+            sys.exit(f"{label}: the two paths disagree")
+        print(f"{label:<66} {before * 1000:>10.1f} {after * 1000:>10.1f} {before / after:>7.1f}x {len(body) / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
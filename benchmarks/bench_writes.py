@@ -0,0 +1,84 @@
+"""Measure write throughput of the single-row write routes.
+
+Posts ``--requests`` new instructors to ``/add-instructor/`` and then as many new
+sections to ``/add-section/`` for an existing instructor and course, with
+``--concurrency`` requests in flight, and reports writes per second and latency.
+Each section goes into a term of its own far in the future unless
+``--sections-per-term`` says otherwise, so every ``/add-section/`` call also
+creates its semester. Requests go to ``main.app`` in-process unless ``--url``
+points at a running server. IDs start at ``--first-id``; pick a fresh range for
+every run, since rows that already exist come back as errors.
+
+    python benchmarks/bench_writes.py --instructor 1 --course CS1000 --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEMESTERS = ("Winter", "Spring", "Summer", "Fall")
+
+
+def instructor(i, args):
+    return {"instructor_id": args.first_id + i, "name": f"Benchmark Instructor {i}"}
+
+
+def section(i, args):
+    term = i // args.sections_per_term
+    return {"section_number": args.first_id + i, "number_of_students": 30, "instructor_id": args.instructor,
+            "course_number": args.course, "year": args.first_year + term // 4, "semester": SEMESTERS[term % 4]}
+
+
+async def post_all(client, path, bodies, concurrency):
+    latencies = []
+    errors = 0
+    queue = iter(bodies)
+
+    async def worker():
+        nonlocal errors
+        for body in queue:
+            started = time.perf_counter()
+            response = await client.post(path, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, sorted(latencies), errors
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--instructor", type=int, required=True)
+    parser.add_argument("--course", required=True)
+    parser.add_argument("--first-id", type=int, default=2_000_000)
+    parser.add_argument("--first-year", type=int, default=3000)
+    parser.add_argument("--sections-per-term", type=int, default=1)
+    parser.add_argument("--url", help="Base URL of a running server; defaults to the in-process app")
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    print(f"{'route':<20} {'reqs':>6} {'errs':>5} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    async with client:
+        for path, body in (("/add-instructor/", instructor), ("/add-section/", section)):
+            elapsed, latencies, errors = await post_all(client, path, [body(i, args) for i in range(args.requests)],
+                                                        args.concurrency)
+            p50, p95 = (latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))] * 1000 for pct in (50, 95))
+            print(f"{path:<20} {len(latencies):>6} {errors:>5} {len(latencies) / elapsed:>9.1f} {p50:>8.1f} {p95:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
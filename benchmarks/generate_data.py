@@ -0,0 +1,136 @@
+"""Fill the schema with a reproducible synthetic dataset.
+
+Scale factor 1 is roughly one large college: 10 degrees, 200 courses, 2,000
+instructors, 40 learning objectives and 100,000 sections over 25 years of terms,
+with evaluations for most (section, objective) pairs. Other scale factors grow
+every table but the semesters proportionally. The same ``--seed`` and ``--scale``
+always produce the same rows, so benchmark runs on different commits see the
+same data.
+
+Run it from the repository root against a migrated, empty database (``--reset``
+empties the tables first):
+
+    python benchmarks/generate_data.py --scale 1 --seed 7330 --reset
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rollup  # noqa: E402
+import versions  # noqa: E402
+from database import connect  # noqa: E402
+
+SEMESTERS = ("Spring", "Summer", "Fall")
+FIRST_YEAR, YEARS = 2000, 25
+DEPARTMENTS = ("CS", "MATH", "STAT", "EE", "PHYS", "CHEM", "BIO", "ECON", "ENGL", "HIST")
+DEGREE_NAMES = ("Computer Science", "Mathematics", "Statistics", "Electrical Engineering", "Physics",
+                "Chemistry", "Biology", "Economics", "English", "History")
+LEVELS = ("BS", "MS", "PhD")
+CRITERIA = ("Exam", "Project", "Homework", "Presentation", "Lab report")
+
+# Children before parents, so deleting in this order never trips a foreign key
+TABLES = ("evaluation_rollup", "course_evaluations", "course_learning_objectives", "sections_courses", "sections",
+          "degree_courses", "semesters", "learning_objectives", "instructors", "courses", "degrees")
+
+BATCH_SIZE = 5000
+
+def generate(scale, seed):
+    """Return ``{table: (columns, rows)}`` in insertion order."""
+    rng = random.Random(seed)
+    data = {}
+
+    degrees = [(f"{DEGREE_NAMES[i % len(DEGREE_NAMES)]}{'' if i < len(DEGREE_NAMES) else f' {i // len(DEGREE_NAMES) + 1}'}",
+                rng.choice(LEVELS)) for i in range(max(1, round(10 * scale)))]
+    data["degrees"] = (("name", "level"), degrees)
+
+    courses = []
+    for i in range(max(1, round(200 * scale))):
+        department = DEPARTMENTS[i % len(DEPARTMENTS)]
+        courses.append((f"{department} course {i}", department, 1000 + i // len(DEPARTMENTS)))
+    data["courses"] = (("name", "department_code", "course_code"), courses)
+    course_numbers = [f"{department}{code:04d}" for _, department, code in courses]
+
+    instructors = [(1 + i, f"Instructor {i + 1}") for i in range(max(1, round(2000 * scale)))]
+    data["instructors"] = (("instructor_id", "name"), instructors)
+
+    objectives = [(1 + i, f"Objective {i + 1}", f"Students demonstrate outcome {i + 1}.") for i in range(max(1, round(40 * scale)))]
+    data["learning_objectives"] = (("code", "title", "description"), objectives)
+
+    terms = [(FIRST_YEAR + y, semester) for y in range(YEARS) for semester in SEMESTERS]
+    data["semesters"] = (("year", "semester"), terms)
+
+    degree_courses = []
+    for course in course_numbers:
+        for name, level in rng.sample(degrees, min(len(degrees), rng.randint(1, 3))):
+            degree_courses.append((name, level, course, rng.random() < 0.4))
+    data["degree_courses"] = (("degree_name", "degree_level", "course_number", "core_course"), degree_courses)
+
+    course_objectives = {course: sorted(code for code, _, _ in rng.sample(objectives, min(len(objectives), rng.randint(2, 5))))
+                         for course in course_numbers}
+    data["course_learning_objectives"] = (("course_number", "objective_code"),
+                                          [(course, code) for course, codes in course_objectives.items() for code in codes])
+
+    sections, evaluations = [], []
+    for number in range(1, max(1, round(100_000 * scale)) + 1):
+        course = rng.choice(course_numbers)
+        year, semester = rng.choice(terms)
+        students = rng.randint(8, 120)
+        sections.append((number, students, rng.randint(1, len(instructors)), course, year, semester))
+        # Most sections are fully evaluated, some partially, the rest not at all
+        roll = rng.random()
+        codes = course_objectives[course] if roll < 0.7 else course_objectives[course][:1] if roll < 0.85 else []
+        for code in codes:
+            f = rng.randint(0, students // 10)
+            a = rng.randint(0, students - f)
+            b = rng.randint(0, students - f - a)
+            evaluations.append((number, code, rng.choice(CRITERIA), a, b, students - f - a - b, f,
+                                "" if rng.random() < 0.1 else "Revise the assessment rubric."))
+    data["sections"] = (("section_number", "number_of_students", "instructor_id", "course_number", "year", "semester"), sections)
+    data["course_evaluations"] = (("section_ID", "objective_code", "eval_criteria", "eval_A_count", "eval_B_count",
+                                   "eval_C_count", "eval_F_count", "improvements"), evaluations)
+    return data
+
+def load(conn, data):
+    with conn.cursor() as cursor:
+        for table, (columns, rows) in data.items():
+            started = time.perf_counter()
+            statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+            for start in range(0, len(rows), BATCH_SIZE):
+                cursor.executemany(statement, rows[start:start + BATCH_SIZE])
+                conn.commit()
+            print(f"{table:<28} {len(rows):>9,} rows  {time.perf_counter() - started:6.1f}s")
+        started = time.perf_counter()
+        rollup.rebuild(cursor)
+        # So running servers drop what they cached from before
+        versions.record(cursor, TABLES)
+        conn.commit()
+        print(f"{'evaluation_rollup':<28} {'rebuilt':>9}       {time.perf_counter() - started:6.1f}s")
+
+def reset(conn):
+    with conn.cursor() as cursor:
+        for table in TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+        conn.commit()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="Dataset size relative to scale factor 1 (100k sections)")
+    parser.add_argument("--seed", type=int, default=7330)
+    parser.add_argument("--reset", action="store_true", help="Delete every row from the schema's tables first")
+    args = parser.parse_args(argv)
+
+    data = generate(args.scale, args.seed)
+    conn = connect()
+    try:
+        if args.reset:
+            reset(conn)
+        load(conn, data)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Drive the app with an end-of-semester request mix and report latency per route.
+
+The mix is weighted towards the evaluation dashboard: section status lists (with
+and without the F-grade filter), batch and single evaluation lookups, evaluation
+submissions one at a time and in batches, and the program report for the term.
+It runs against the most recent terms in the database, so load a dataset first
+(``benchmarks/generate_data.py``). Requests go to ``main.app`` in-process unless
+``--url`` points at a running server. The same ``--seed`` replays the same
+request sequence; submissions rewrite grade counts of existing evaluations only.
+
+    python benchmarks/load_test.py --requests 2000 --concurrency 20 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (label, weight); each label has a request builder in Workload
+MIX = (
+    ("GET /sections-evaluation-status/", 30),
+    ("GET /sections-evaluation-status/?f_grade_percentage", 10),
+    ("GET /evaluations/", 15),
+    ("GET /get-evaluation/{section_id}", 15),
+    ("POST /update-evaluation/", 15),
+    ("POST /update-evaluations/", 5),
+    ("GET /reports/term-objectives/", 10),
+)
+
+
+class Workload:
+    """Builds requests from the sections and evaluations of the most recent terms."""
+
+    def __init__(self, terms, evaluations, rng):
+        self.terms = terms
+        self.evaluated = [section for section in evaluations if section["evaluations"]]
+        self.rng = rng
+
+    @classmethod
+    async def discover(cls, client, term_count, rng):
+        response = await client.get("/semesters/", params={"limit": 5000})
+        response.raise_for_status()
+        terms = [(term["year"], term["semester"]) for term in response.json()[-term_count:]]
+        if not terms:
+            sys.exit("No semesters found; load a dataset with benchmarks/generate_data.py first")
+        evaluations = []
+        for year, semester in terms:
+            response = await client.get("/evaluations/", params={"year": year, "semester": semester, "limit": 5000})
+            response.raise_for_status()
+            evaluations.extend(response.json())
+        if not any(section["evaluations"] for section in evaluations):
+            sys.exit("No evaluations found in the most recent terms")
+        return cls(terms, evaluations, rng)
+
+    def request(self, label):
+        year, semester = self.rng.choice(self.terms)
+        term = {"year": year, "semester": semester}
+        if label == "GET /sections-evaluation-status/":
+            return "GET", "/sections-evaluation-status/", {"params": term}
+        if label == "GET /sections-evaluation-status/?f_grade_percentage":
+            return "GET", "/sections-evaluation-status/", {"params": {**term, "f_grade_percentage": self.rng.choice((5, 10, 20))}}
+        if label == "GET /evaluations/":
+            return "GET", "/evaluations/", {"params": term}
+        if label == "GET /reports/term-objectives/":
+            return "GET", "/reports/term-objectives/", {"params": term}
+        section = self.rng.choice(self.evaluated)
+        if label == "GET /get-evaluation/{section_id}":
+            return "GET", f"/get-evaluation/{section['section_number']}", {}
+        if label == "POST /update-evaluation/":
+            return "POST", "/update-evaluation/", {"json": self.regrade(self.rng.choice(section["evaluations"]))}
+        return "POST", "/update-evaluations/", {"json": [self.regrade(evaluation) for evaluation in section["evaluations"]]}
+
+    def regrade(self, evaluation):
+        counts = [evaluation[key] or 0 for key in ("eval_A_count", "eval_B_count", "eval_C_count", "eval_F_count")]
+        students = sum(counts)
+        f = self.rng.randint(0, students // 10)
+        a = self.rng.randint(0, students - f)
+        b = self.rng.randint(0, students - f - a)
+        return {**evaluation, "eval_A_count": a, "eval_B_count": b, "eval_C_count": students - f - a - b, "eval_F_count": f}
+
+
+def percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def run(client, workload, total, concurrency, rng):
+    labels = rng.choices([label for label, _ in MIX], weights=[weight for _, weight in MIX], k=total)
+    requests = [(label, *workload.request(label)) for label in labels]
+    latencies = {label: [] for label, _ in MIX}
+    errors = {label: 0 for label, _ in MIX}
+    queue = iter(requests)
+
+    async def worker():
+        for label, method, path, kwargs in queue:
+            started = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies[label].append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[label] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def summarize(elapsed, latencies, errors):
+    results = {}
+    for label, values in [*latencies.items(), ("all", [v for values in latencies.values() for v in values])]:
+        if not values:
+            continue
+        values = sorted(values)
+        results[label] = {
+            "requests": len(values),
+            "errors": errors.get(label, sum(errors.values())),
+            "throughput": len(values) / elapsed,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--terms", type=int, default=3, help="How many of the most recent terms the mix touches")
+    parser.add_argument("--seed", type=int, default=7330)
+    parser.add_argument("--url", help="Base URL of a running server; defaults to the in-process app")
+    parser.add_argument("--json", help="Also write the results to this file, to compare runs across commits")
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    rng = random.Random(args.seed)
+    async with client:
+        workload = await Workload.discover(client, args.terms, rng)
+        elapsed, latencies, errors = await run(client, workload, args.requests, args.concurrency, rng)
+
+    results = summarize(elapsed, latencies, errors)
+    print(f"{'route':<52} {'reqs':>6} {'errs':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for label, row in results.items():
+        print(f"{label:<52} {row['requests']:>6} {row['errors']:>5} {row['throughput']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"requests": args.requests, "concurrency": args.concurrency, "seed": args.seed,
+                       "elapsed": elapsed, "routes": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Everything the dashboard needs on page load, in one response.
+
+``/bootstrap`` returns the instructor, degree, learning objective and semester
+lists that fill the page's drop-downs, plus the evaluation status of every
+section of the current term, so the page makes one round trip instead of one
+per list. The lists are read concurrently, each on its own pooled connection
+(the reference lists usually straight from ``reference_cache``).
+"""
+import asyncio
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+import queries
+from cache import reference_cache
+from database import get_db
+from models import (DashboardBootstrap, DegreeOption, InstructorOption, LearningObjective, Semester,
+                    SectionEvaluationStatus)
+from pagination import MIN_INT, MIN_STR
+from serialization import dumps, projector
+from terms import term_index, term_index_on
+from versions import conditional
+
+router = APIRouter(tags=["dashboard"])
+
+# LIMIT for reading a whole list with the paginated list queries
+ALL_ROWS = 2**31 - 1
+
+def _reference(db, table, query, params):
+    return reference_cache.reader(db, table).fetch_all(query, (*params, ALL_ROWS))
+
+def current_term(semesters, today=None):
+    """The latest of ``semesters`` (rows ordered by term_index) to have started by ``today``, or None."""
+    started = term_index_on(today or date.today())
+    return next((row for row in reversed(semesters) if row['term_index'] <= started), None)
+
+def _implied_term(request):
+    """Without year and semester the sections come from today's term, so the tag must change when a term starts."""
+    return None if "year" in request.query_params else str(term_index_on(date.today()))
+
+@router.get("/bootstrap", response_model=DashboardBootstrap,
+            dependencies=[Depends(conditional("instructors", "degrees", "learning_objectives", "semesters",
+                                              "sections", "course_evaluations", scope=_implied_term))],
+            summary="Reference lists and the current term's section status for the dashboard, in one request")
+async def bootstrap(response: Response,
+                    year: Optional[int] = Query(None, description="Report this term's sections instead of the current one (with semester)"),
+                    semester: Optional[str] = Query(None, description="The semester of that term"),
+                    db=Depends(get_db)):
+    if (year is None) != (semester is None):
+        raise HTTPException(status_code=400, detail="Pass year and semester together")
+    semesters = asyncio.ensure_future(_reference(db, "semesters", queries.LIST_SEMESTERS, (MIN_INT,)))
+
+    async def sections():
+        if year is not None:
+            term = {'year': year, 'semester': semester.strip().capitalize(), 'term_index': term_index(year, semester)}
+        else:
+            # Waits only for the semester list, which is usually cached; the other lists are read meanwhile
+            term = current_term(await semesters)
+        if term is None:
+            return None, []
+        return term, await db.fetch_all(queries.SECTIONS_EVALUATION_STATUS,
+                                        (term['year'], term['semester'], MIN_INT, None, None, None, None, ALL_ROWS))
+
+    reads = [asyncio.ensure_future(read) for read in (
+        _reference(db, "instructors", queries.LIST_INSTRUCTORS, (MIN_INT,)),
+        _reference(db, "degrees", queries.LIST_DEGREES, (MIN_STR, MIN_STR, MIN_STR)),
+        _reference(db, "learning_objectives", queries.LIST_LEARNING_OBJECTIVES, (MIN_INT,)),
+        semesters, sections())]
+    try:
+        instructors, degrees, objectives, semester_rows, (term, section_rows) = await asyncio.gather(*reads)
+    finally:
+        # gather returns on the first failure and leaves the other reads running; none may outlive the request
+        for read in reads:
+            read.cancel()
+        await asyncio.gather(*reads, return_exceptions=True)
+    body = {
+        "instructors": list(map(projector(InstructorOption), instructors)),
+        "degrees": list(map(projector(DegreeOption), degrees)),
+        "learning_objectives": list(map(projector(LearningObjective), objectives)),
+        "semesters": list(map(projector(Semester), semester_rows)),
+        "current_term": projector(Semester)(term) if term is not None else None,
+        "sections": list(map(projector(SectionEvaluationStatus), section_rows)),
+    }
+    # A returned Response skips FastAPI's merge of headers set on ``response`` (the ETag)
+    return Response(dumps(body), media_type="application/json", headers=dict(response.headers))
@@ -0,0 +1,239 @@
+"""Bulk import of registrar dumps.
+
+Every ``/bulk/...`` route takes the whole upload as the request body, either CSV
+(``Content-Type: text/csv``, with a header row naming the columns) or NDJSON
+(``application/x-ndjson``, one JSON object per line). Rows are validated a batch at
+a time and written with multi-row ``executemany`` inserts, one transaction per batch.
+A batch the database rejects is replayed row by row, each row under a savepoint, so
+only the offending rows are reported and none of their writes is kept. A replay the
+server aborts as a whole (a deadlock) starts over, and after ``REPLAY_ATTEMPTS`` its
+rows are all reported as not written. Rows are
+numbered from 1 in upload order, not counting the CSV header.
+"""
+import csv
+import io
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter, ValidationError
+
+import queries
+import rollup
+from config import config
+from curriculum import curriculum_index
+from search import search_index
+from database import get_db, DB_ERRORS
+from versions import record, table_changed
+from models import (Degree, Course, Instructor, Section, LearningObjective, CourseObjectiveAssociation,
+                    AssociateCourseWithDegree, EvaluationData, BulkImportReport)
+
+BATCH_SIZE = int(config.get('BULK_BATCH_SIZE', 1000))
+# Times a row-by-row replay starts over when the server rolls its transaction back (deadlock, lock wait timeout)
+REPLAY_ATTEMPTS = 3
+
+CSV_TYPES = {"text/csv", "application/csv"}
+NDJSON_TYPES = {"application/x-ndjson", "application/jsonl", "application/json"}
+
+router = APIRouter(prefix="/bulk", tags=["bulk"])
+
+def _insert(table, columns):
+    """Writer for a plain multi-row INSERT into ``table``."""
+    statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    def write(cursor, rows):
+        cursor.executemany(statement, rows)
+    return write
+
+async def _read_records(request):
+    """Parse the upload into ``[(row_number, dict)]`` plus errors for lines that are not JSON objects."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    try:
+        body = (await request.body()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Upload must be UTF-8 encoded")
+    if content_type in CSV_TYPES:
+        reader = csv.DictReader(io.StringIO(body))
+        # Cells beyond the header land under the None key; they are not columns of any model
+        return [(number, {k: v for k, v in row.items() if k is not None}) for number, row in enumerate(reader, start=1)], []
+    if content_type in NDJSON_TYPES:
+        records, errors = [], []
+        for number, line in enumerate(filter(str.strip, body.splitlines()), start=1):
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                errors.append({"row": number, "error": f"Invalid JSON: {error}"})
+                continue
+            if not isinstance(record, dict):
+                errors.append({"row": number, "error": "Expected a JSON object"})
+                continue
+            records.append((number, record))
+        return records, errors
+    raise HTTPException(status_code=415, detail="Upload CSV (text/csv) or NDJSON (application/x-ndjson)")
+
+def _validate(model, records, check=None):
+    """Validate ``records`` a batch at a time; returns ``[(row_number, model)]`` and the errors."""
+    adapter = TypeAdapter(list[model])
+    valid, errors = [], []
+    for start in range(0, len(records), BATCH_SIZE):
+        batch = records[start:start + BATCH_SIZE]
+        try:
+            entities = adapter.validate_python([record for _, record in batch])
+        except ValidationError as error:
+            # One pass over the whole batch; only a failing batch pays for sorting out which rows failed
+            messages = {}
+            for detail in error.errors():
+                index, *field = detail['loc']
+                messages.setdefault(index, []).append(f"{'.'.join(map(str, field)) or 'row'}: {detail['msg']}")
+            errors.extend({"row": batch[index][0], "error": "; ".join(message)} for index, message in messages.items())
+            batch = [row for index, row in enumerate(batch) if index not in messages]
+            entities = adapter.validate_python([record for _, record in batch])
+        for (number, _), entity in zip(batch, entities):
+            problem = check(entity) if check else None
+            if problem:
+                errors.append({"row": number, "error": problem})
+            else:
+                valid.append((number, entity))
+    return valid, errors
+
+class _TransactionLost(Exception):
+    """The server rolled back the whole replay transaction (a deadlock), taking its savepoints with it."""
+
+def _replay(conn, cursor, write, chunk, tables):
+    """Write ``chunk`` row by row in one transaction; returns the rows written, the rejected rows and the versions."""
+    conn.start_transaction()
+    replayed, errors = 0, []
+    for number, values in chunk:
+        cursor.execute("SAVEPOINT bulk_row")
+        try:
+            write(cursor, [values])
+            replayed += 1
+        except DB_ERRORS as error:
+            try:
+                cursor.execute("ROLLBACK TO SAVEPOINT bulk_row")
+            except DB_ERRORS:
+                conn.rollback()
+                raise _TransactionLost(error) from error
+            errors.append({"row": number, "error": str(error)})
+        cursor.execute("RELEASE SAVEPOINT bulk_row")
+    bumped = record(cursor, tables) if replayed else {}
+    conn.commit()
+    return replayed, errors, bumped
+
+def _write(conn, write, columns, rows, tables, versions):
+    """Pass ``rows`` to ``write(cursor, values)`` in chunked transactions; returns the number written and the rejected rows.
+
+    Every chunk that writes a row also bumps the versions of ``tables``; the latest land in ``versions``.
+    """
+    written, errors = 0, []
+    with conn.cursor() as cursor:
+        for start in range(0, len(rows), BATCH_SIZE):
+            chunk = [(number, tuple(getattr(entity, col) for col in columns)) for number, entity in rows[start:start + BATCH_SIZE]]
+            try:
+                write(cursor, [values for _, values in chunk])
+                bumped = record(cursor, tables)
+                conn.commit()
+                versions.update(bumped)
+                written += len(chunk)
+                continue
+            except DB_ERRORS:
+                conn.rollback()
+            # A writer may run several statements per row (the rollup helpers do), so a failing
+            # row is rolled back to its savepoint rather than leaving its earlier statements in.
+            for attempt in range(1, REPLAY_ATTEMPTS + 1):
+                try:
+                    replayed, rejected, bumped = _replay(conn, cursor, write, chunk, tables)
+                except _TransactionLost as lost:
+                    if attempt < REPLAY_ATTEMPTS:
+                        continue
+                    # Nothing of the chunk is kept; the earlier chunks stay committed
+                    replayed, bumped = 0, {}
+                    rejected = [{"row": number, "error": f"Not written, the database aborted the batch: {lost}"}
+                                for number, _ in chunk]
+                break
+            versions.update(bumped)
+            written += replayed
+            errors.extend(rejected)
+    return written, errors
+
+async def _import(request, db, model, write, columns, tables, check=None):
+    records, unreadable = await _read_records(request)
+    valid, invalid = _validate(model, records, check)
+    versions = {}
+    try:
+        written, rejected = await db.run(_write, write, columns, valid, tables, versions)
+    finally:
+        # Earlier chunks are committed even if a later one fails
+        table_changed(versions)
+        curriculum_index.tables_changed(tables)
+        search_index.tables_changed(tables)
+    errors = sorted(unreadable + invalid + rejected, key=lambda error: error["row"])
+    return {"received": len(records) + len(unreadable), "imported": written, "errors": errors}
+
+def _check_course_code(course):
+    if not (1000 <= course.course_code <= 9999):
+        return "Course code must be between 1000 and 9999."
+
+def _unique(*fields):
+    """Check rejecting every row after the first with the same ``fields``."""
+    seen = set()
+    def check(entity):
+        key = tuple(getattr(entity, field) for field in fields)
+        if key in seen:
+            return f"Duplicate ({', '.join(fields)}) in upload"
+        seen.add(key)
+    return check
+
+def _insert_sections(columns):
+    """Writer for sections that first creates their missing semesters, in the same transaction."""
+    insert = _insert("sections", columns)
+    year, semester = columns.index("year"), columns.index("semester")
+    def write(cursor, rows):
+        # One statement for every term in the chunk instead of a lookup per section; a rejected
+        # section rolls its semester back with it
+        cursor.executemany(queries.INSERT_SEMESTER_IGNORE, sorted({(row[year], row[semester]) for row in rows}))
+        insert(cursor, rows)
+    return write
+
+@router.post("/degrees", response_model=BulkImportReport, summary="Import degrees from CSV or NDJSON")
+async def bulk_degrees(request: Request, db=Depends(get_db)):
+    columns = ("name", "level")
+    return await _import(request, db, Degree, _insert("degrees", columns), columns, ("degrees",))
+
+@router.post("/courses", response_model=BulkImportReport, summary="Import courses from CSV or NDJSON")
+async def bulk_courses(request: Request, db=Depends(get_db)):
+    columns = ("name", "department_code", "course_code")
+    return await _import(request, db, Course, _insert("courses", columns), columns, ("courses",), check=_check_course_code)
+
+@router.post("/instructors", response_model=BulkImportReport, summary="Import instructors from CSV or NDJSON")
+async def bulk_instructors(request: Request, db=Depends(get_db)):
+    columns = ("instructor_id", "name")
+    return await _import(request, db, Instructor, _insert("instructors", columns), columns, ("instructors",))
+
+@router.post("/sections", response_model=BulkImportReport, summary="Import sections from CSV or NDJSON, creating missing semesters")
+async def bulk_sections(request: Request, db=Depends(get_db)):
+    columns = ("section_number", "number_of_students", "instructor_id", "course_number", "year", "semester")
+    return await _import(request, db, Section, _insert_sections(columns), columns, ("semesters", "sections"))
+
+@router.post("/learning-objectives", response_model=BulkImportReport, summary="Import learning objectives from CSV or NDJSON")
+async def bulk_learning_objectives(request: Request, db=Depends(get_db)):
+    columns = ("code", "title", "description")
+    return await _import(request, db, LearningObjective, _insert("learning_objectives", columns), columns, ("learning_objectives",))
+
+@router.post("/course-objectives", response_model=BulkImportReport, summary="Import course/learning objective associations from CSV or NDJSON")
+async def bulk_course_objectives(request: Request, db=Depends(get_db)):
+    columns = ("course_number", "objective_code")
+    return await _import(request, db, CourseObjectiveAssociation, _insert("course_learning_objectives", columns), columns,
+                         ("course_learning_objectives",))
+
+@router.post("/degree-courses", response_model=BulkImportReport, summary="Import course/degree associations from CSV or NDJSON")
+async def bulk_degree_courses(request: Request, db=Depends(get_db)):
+    columns = ("degree_name", "degree_level", "course_number", "core_course")
+    return await _import(request, db, AssociateCourseWithDegree, rollup.associate_courses_with_degrees, columns,
+                         ("degree_courses", "evaluation_rollup"))
+
+@router.post("/evaluations", response_model=BulkImportReport, summary="Import or update evaluations from CSV or NDJSON")
+async def bulk_evaluations(request: Request, db=Depends(get_db)):
+    columns = ("section_ID", "objective_code", "eval_criteria", "eval_A_count", "eval_B_count",
+               "eval_C_count", "eval_F_count", "improvements")
+    # The rollup deltas assume each (section, objective) appears once per chunk
+    return await _import(request, db, EvaluationData, rollup.upsert_evaluations, columns, ("course_evaluations", "evaluation_rollup"),
+                         check=_unique("section_ID", "objective_code"))
@@ -0,0 +1,125 @@
+"""In-process read-through cache for reference data.
+
+Degrees, instructors, learning objectives and semesters change a few times a term
+but are read on every page load. Their list routes read through ``reference_cache``,
+and the write routes for those tables call ``reference_cache.invalidate(table)``, so a
+write is visible on the very next read (another worker's, once ``versions.sync`` sees it).
+``ttl`` only bounds how stale an entry can get when the tables are changed behind the
+API's back (manual SQL).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+from config import config
+
+CACHE_TTL = float(config.get('CACHE_TTL', 300))
+CACHE_MAX_ENTRIES = int(config.get('CACHE_MAX_ENTRIES', 256))
+
+class TTLCache:
+    """Size-bounded LRU mapping whose entries expire ``ttl`` seconds after being stored.
+
+    Entries are tagged with the table they were read from so a write can drop exactly
+    the entries it made stale. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, tag, value)
+        self._generations = {}  # tag -> number of invalidations so far
+        self._epoch = 0  # number of full invalidations so far
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return ``(True, value)`` for a live entry, ``(False, None)`` otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def generation(self, tag=None):
+        with self._lock:
+            return self._epoch, self._generations.get(tag, 0)
+
+    def set(self, key, value, tag=None, generation=None):
+        """Store ``value``; skipped if ``tag`` was invalidated since ``generation`` was read.
+
+        That keeps a read which started before a write from caching what it saw.
+        """
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(tag, 0)):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, tag, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tag=None):
+        """Drop every entry tagged ``tag``, or everything when no tag is given."""
+        with self._lock:
+            if tag is None:
+                self._entries.clear()
+                self._epoch += 1
+                return
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in [key for key, entry in self._entries.items() if entry[1] == tag]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.maxsize, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def reader(self, db, tag):
+        """Wrap ``db`` so its ``fetch_all`` reads through this cache under ``tag``."""
+        return CachedReader(self, db, tag)
+
+class CachedReader:
+    """The slice of the ``Database`` API that ``paginate`` uses, answered from a cache when possible.
+
+    Streams are not cached: they exist for result sets too large to keep in memory.
+    """
+
+    def __init__(self, cache, db, tag):
+        self._cache = cache
+        self._db = db
+        self._tag = tag
+
+    async def fetch_all(self, query, params=()):
+        key = (query, tuple(params))
+        found, rows = self._cache.get(key)
+        if found:
+            return rows
+        generation = self._cache.generation(self._tag)
+        rows = await self._db.fetch_all(query, params)
+        self._cache.set(key, rows, self._tag, generation)
+        return rows
+
+    def stream(self, query, params=()):
+        return self._db.stream(query, params)
+
+reference_cache = TTLCache()
+
+def _render_stats():
+    stats = reference_cache.stats()
+    for name, kind, help in (("hits", "counter", "Reference cache hits"), ("misses", "counter", "Reference cache misses"),
+                             ("evictions", "counter", "Entries evicted to stay within max_entries"),
+                             ("entries", "gauge", "Entries currently cached")):
+        metric = f"reference_cache_{name}" + ("_total" if kind == "counter" else "")
+        yield f"# HELP {metric} {help}"
+        yield f"# TYPE {metric} {kind}"
+        yield f"{metric} {stats[name]}"
+
+metrics.collectors.append(_render_stats)
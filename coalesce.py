@@ -0,0 +1,84 @@
+"""Single-flight coalescing of identical concurrent reads.
+
+When the semester dashboard opens, many clients ask for the same page at once.
+``Database.fetch_all`` and ``fetch_one`` go through ``read_flights``: the first
+caller for a (statement, parameters) pair runs the query, and every identical
+call that arrives while it is in flight awaits that same result instead of
+running the query again. With ``COALESCE_TTL_MS`` above 0 a finished result
+also answers identical calls for that many milliseconds.
+
+Writes go through ``versions.table_changed`` once committed, which starts a new
+epoch: a call made after a write never joins a flight (or reuses a result) from
+before it. Results are shared, so callers must not mutate the rows they get.
+"""
+import asyncio
+import time
+
+import metrics
+from config import config
+
+COALESCE_TTL_MS = float(config.get('COALESCE_TTL_MS', 0))
+
+class SingleFlight:
+    """Shares one in-flight awaitable between identical concurrent calls. Event-loop only."""
+
+    def __init__(self, ttl=COALESCE_TTL_MS / 1000):
+        self.ttl = ttl
+        self.executed = 0
+        self.coalesced = 0
+        self.recent_hits = 0
+        self._flights = {}  # (epoch, key) -> Task
+        self._recent = {}  # (epoch, key) -> (expires_at, result)
+        self._epoch = 0
+
+    async def do(self, key, call):
+        """Return the result of ``call()``, shared with every identical ``key`` in flight."""
+        key = (self._epoch, key)
+        recent = self._recent.get(key)
+        if recent is not None:
+            if recent[0] > time.monotonic():
+                self.recent_hits += 1
+                return recent[1]
+            del self._recent[key]
+        flight = self._flights.get(key)
+        if flight is None:
+            self.executed += 1
+            # A task of its own, so a cancelled caller does not cancel the query for the others
+            flight = self._flights[key] = asyncio.ensure_future(call())
+            flight.add_done_callback(lambda task: self._landed(key, task))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(flight)
+
+    def invalidate(self):
+        """Start a new epoch: later calls neither join earlier flights nor reuse their results."""
+        self._epoch += 1
+        self._recent.clear()
+
+    def stats(self):
+        return {"executed": self.executed, "coalesced": self.coalesced, "recent_hits": self.recent_hits,
+                "in_flight": len(self._flights), "ttl": self.ttl}
+
+    def _landed(self, key, task):
+        del self._flights[key]
+        if self.ttl <= 0 or task.cancelled() or task.exception() is not None or key[0] != self._epoch:
+            return
+        now = time.monotonic()
+        for stale in [stale for stale, (expires_at, _) in self._recent.items() if expires_at <= now]:
+            del self._recent[stale]
+        self._recent[key] = (now + self.ttl, task.result())
+
+read_flights = SingleFlight()
+
+def _render_stats():
+    stats = read_flights.stats()
+    for name, kind, help in (("executed", "counter", "Reads that ran a query"),
+                             ("coalesced", "counter", "Reads that shared a query already in flight"),
+                             ("recent_hits", "counter", "Reads answered by a result younger than COALESCE_TTL_MS"),
+                             ("in_flight", "gauge", "Distinct reads currently in flight")):
+        metric = f"db_read_{name}" + ("_total" if kind == "counter" else "")
+        yield f"# HELP {metric} {help}"
+        yield f"# TYPE {metric} {kind}"
+        yield f"{metric} {stats[name]}"
+
+metrics.collectors.append(_render_stats)
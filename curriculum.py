@@ -0,0 +1,205 @@
+"""In-memory degree <-> course <-> objective index.
+
+Curriculum questions ("which courses cover all of these objectives", "which
+objectives does this degree leave uncovered") are set algebra over three small
+tables. ``CurriculumIndex`` keeps them as bitsets: every course gets a bit
+position, and each objective and each degree maps to the int whose set bits are
+its courses. ALL is ``&``, ANY is ``|``, and a degree covers an objective when
+their bitsets intersect, so each answer costs a few integer operations per
+objective instead of a join, and every course appears once.
+
+The index loads the tables on first use (``main`` warms it at startup). The
+single-row write routes apply their rows to it once committed; the bulk routes
+call ``tables_changed``, which drops it so the next read reloads. Writes made by
+other worker processes reach ``tables_changed`` through ``versions.on_change``.
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+import queries
+from database import get_db, DB_ERRORS
+from models import ObjectiveCoverage, CoverageGap
+from versions import conditional, on_change
+
+TABLES = {"courses", "learning_objectives", "degrees", "course_learning_objectives", "degree_courses"}
+
+log = logging.getLogger(__name__)
+
+def _bits(mask):
+    """Positions of the set bits of ``mask``, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def _load(conn):
+    with conn.cursor() as cursor:
+        tables = []
+        for query in (queries.CURRICULUM_COURSES, queries.CURRICULUM_OBJECTIVES, queries.CURRICULUM_DEGREES,
+                      queries.CURRICULUM_COURSE_OBJECTIVES, queries.CURRICULUM_DEGREE_COURSES):
+            cursor.execute(query)
+            tables.append(cursor.fetchall())
+        return tables
+
+class CurriculumIndex:
+    """Bitset index over courses, learning objectives, degrees and their associations. Event-loop only."""
+
+    def __init__(self):
+        self._loaded = False
+        self._generation = 0  # bumped by every change, so a load that overlapped one is retried
+        self._lock = asyncio.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._courses = []  # bit -> course_number
+        self._course_bits = {}  # course_number -> bit
+        self._names = {}  # course_number -> name
+        self._objectives = {}  # code -> title
+        self._by_objective = {}  # code -> courses bitset
+        self._by_degree = {}  # (name, level) -> courses bitset
+        self._core_by_degree = {}  # (name, level) -> bitset of its core courses
+        self._core = 0  # courses that are core in at least one degree
+
+    async def ensure_loaded(self, db):
+        while not self._loaded:
+            async with self._lock:
+                if self._loaded:
+                    return
+                generation = self._generation
+                tables = await db.run(_load, read=True)
+                if generation == self._generation:
+                    self._install(*tables)
+
+    def _install(self, courses, objectives, degrees, course_objectives, degree_courses):
+        self._clear()
+        for course_number, name in courses:
+            self.add_course(course_number, name)
+        for code, title in objectives:
+            self.add_objective(code, title)
+        for name, level in degrees:
+            self.add_degree(name, level)
+        for course_number, code in course_objectives:
+            self.link_course_objective(course_number, code)
+        for name, level, course_number, core in degree_courses:
+            self.link_degree_course(name, level, course_number, core)
+        self._loaded = True
+
+    def tables_changed(self, tables):
+        """Drop the index if ``tables`` overlap the ones it mirrors; the next read reloads it."""
+        if TABLES.intersection(tables):
+            self._generation += 1
+            self._loaded = False
+            self._clear()
+
+    # Incremental updates, applied by the write routes after their transaction commits
+
+    def add_course(self, course_number, name):
+        self._generation += 1
+        if course_number not in self._course_bits:
+            self._course_bits[course_number] = len(self._courses)
+            self._courses.append(course_number)
+        self._names[course_number] = name
+
+    def add_objective(self, code, title):
+        self._generation += 1
+        self._objectives[code] = title
+        self._by_objective.setdefault(code, 0)
+
+    def add_degree(self, name, level):
+        self._generation += 1
+        self._by_degree.setdefault((name, level), 0)
+        self._core_by_degree.setdefault((name, level), 0)
+
+    def link_course_objective(self, course_number, code):
+        self._generation += 1
+        bit = self._bit(course_number)
+        self._by_objective[code] = self._by_objective.get(code, 0) | bit
+
+    def link_degree_course(self, name, level, course_number, core):
+        self._generation += 1
+        bit = self._bit(course_number)
+        degree = (name, level)
+        self._by_degree[degree] = self._by_degree.get(degree, 0) | bit
+        # Re-associating a course updates its core flag, so the union is recomputed rather than OR-ed
+        core_courses = self._core_by_degree.get(degree, 0)
+        self._core_by_degree[degree] = core_courses | bit if core else core_courses & ~bit
+        self._core = 0
+        for core_courses in self._core_by_degree.values():
+            self._core |= core_courses
+
+    def _bit(self, course_number):
+        if course_number not in self._course_bits:
+            self.add_course(course_number, self._names.get(course_number, course_number))
+        return 1 << self._course_bits[course_number]
+
+    # Queries
+
+    def courses_covering(self, objective_codes, match="any"):
+        """Courses covering ALL or ANY of ``objective_codes``, sorted by course number."""
+        masks = [self._by_objective.get(code, 0) for code in objective_codes]
+        if not masks:
+            return []
+        covering = masks[0]
+        for mask in masks[1:]:
+            covering = covering & mask if match == "all" else covering | mask
+        return sorted(({"course_number": self._courses[bit], "course_name": self._names[self._courses[bit]],
+                        "is_core_course": bool(self._core >> bit & 1)} for bit in _bits(covering)),
+                      key=lambda course: course["course_number"])
+
+    def objectives_covered(self, name, level):
+        """Objectives at least one course of the degree covers, with how many of its courses do."""
+        degree = self._by_degree.get((name, level))
+        if degree is None:
+            return None
+        return [{"code": code, "title": self._objectives.get(code, ""), "course_count": (courses & degree).bit_count()}
+                for code, courses in sorted(self._by_objective.items()) if courses & degree]
+
+    def coverage_gaps(self, name=None, level=None):
+        """Per degree, the objectives none of its courses cover; one degree when ``name`` and ``level`` are given."""
+        degrees = sorted(self._by_degree.items()) if name is None else [((name, level), self._by_degree.get((name, level)))]
+        return [{"degree_name": degree_name, "degree_level": degree_level,
+                 "missing_objectives": [code for code, courses in sorted(self._by_objective.items()) if not courses & mask]}
+                for (degree_name, degree_level), mask in degrees if mask is not None]
+
+curriculum_index = CurriculumIndex()
+on_change(curriculum_index.tables_changed)
+
+async def warm(db):
+    """Load the index ahead of the first request; a database that is not up yet only defers it."""
+    try:
+        await curriculum_index.ensure_loaded(db)
+    except DB_ERRORS as error:
+        log.warning("Curriculum index not loaded at startup: %s", error)
+
+router = APIRouter(prefix="/curriculum", tags=["curriculum"])
+
+async def _index(db=Depends(get_db)):
+    await curriculum_index.ensure_loaded(db)
+    return curriculum_index
+
+@router.get("/degree-objectives/", response_model=List[ObjectiveCoverage],
+            dependencies=[Depends(conditional("learning_objectives", "course_learning_objectives", "degree_courses"))],
+            summary="Learning objectives covered by a degree's courses")
+async def degree_objectives(degree_name: str = Query(..., description="The name of the degree"),
+                            degree_level: str = Query(..., description="The level of the degree (e.g., Bachelor, Master)"),
+                            index: CurriculumIndex = Depends(_index)):
+    objectives = index.objectives_covered(degree_name, degree_level)
+    if objectives is None:
+        raise HTTPException(status_code=404, detail="Degree not found")
+    return objectives
+
+@router.get("/coverage-gaps/", response_model=List[CoverageGap],
+            dependencies=[Depends(conditional("degrees", "learning_objectives", "course_learning_objectives", "degree_courses"))],
+            summary="Learning objectives no course of a degree covers, for one degree or all of them")
+async def coverage_gaps(degree_name: Optional[str] = Query(None, description="Only this degree (with degree_level)"),
+                        degree_level: Optional[str] = Query(None, description="The level of the degree"),
+                        index: CurriculumIndex = Depends(_index)):
+    if (degree_name is None) != (degree_level is None):
+        raise HTTPException(status_code=400, detail="Pass degree_name and degree_level together")
+    gaps = index.coverage_gaps(degree_name, degree_level)
+    if degree_name is not None and not gaps:
+        raise HTTPException(status_code=404, detail="Degree not found")
+    return gaps
@@ -1,6 +1,30 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import LifoQueue, Empty
+
 import mysql.connector
 from fastapi import HTTPException
 from config import config  # Assuming config.py is in the same directory
+import admission
+from coalesce import read_flights
+from metrics import InstrumentedConnection, POOL_WAIT, POOL_TIMEOUTS
+import sqlite_engine
+import statements
+
+POOL_SIZE = int(config.get('DB_POOL_SIZE', 10))
+POOL_TIMEOUT = float(config.get('DB_POOL_TIMEOUT', 5))
+POOL_RECYCLE = float(config.get('DB_POOL_RECYCLE', 1800))
+POOL_PING_AFTER = float(config.get('DB_POOL_PING_AFTER', 30))
+STREAM_BATCH_SIZE = int(config.get('DB_STREAM_BATCH_SIZE', 500))
+# "mysql" or "sqlite" (embedded, in the file SQLITE_PATH)
+ENGINE = config.get('DB_ENGINE', 'mysql').lower()
+SQLITE_PATH = config.get('SQLITE_PATH', 'project.db')
+
+# What a failed statement raises, whichever engine is configured
+DB_ERRORS = (mysql.connector.Error, sqlite3.Error)
 
 def get_db_connection():
     try:
@@ -14,18 +38,217 @@ def get_db_connection():
     except mysql.connector.Error as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def add_entity(entity, table, columns):
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cursor:
-            column_names = ", ".join(columns)
-            placeholders = ", ".join(["%s"] * len(columns))
-            values = tuple(getattr(entity, col) for col in columns)
-            query = f"INSERT INTO {table} ({column_names}) VALUES ({placeholders})"
-            cursor.execute(query, values)
-            conn.commit()
-            return {"status": f"{table[:-1]} added"}  # Simplifies message creation
-    finally:
-        if conn:
+def connect():
+    """Open a connection to the configured engine."""
+    if ENGINE == 'sqlite':
+        return sqlite_engine.connect(SQLITE_PATH)
+    if ENGINE != 'mysql':
+        raise ValueError(f"Unknown DB_ENGINE {ENGINE!r}; expected mysql or sqlite")
+    return get_db_connection()
+
+class ConnectionPool:
+    """Process-wide pool of MySQL connections.
+
+    Connections are opened lazily, up to ``size`` at a time. A borrower waits at
+    most ``timeout`` seconds for a free slot. Idle connections are pinged before
+    being handed out again and are replaced once they are older than ``recycle``
+    seconds, so the server's ``wait_timeout`` never bites a request.
+    """
+
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT, recycle=POOL_RECYCLE,
+                 ping_after=POOL_PING_AFTER, connect=connect):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self._connect = connect
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = LifoQueue()
+        self._opened_at = {}
+        self._returned_at = {}
+
+    def acquire(self):
+        started = time.perf_counter()
+        acquired = self._slots.acquire(timeout=self.timeout)
+        POOL_WAIT.observe(time.perf_counter() - started)
+        if not acquired:
+            POOL_TIMEOUTS.inc()
+            raise HTTPException(status_code=503, detail="Timed out waiting for a database connection")
+        try:
+            return self._checkout()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn, reuse=True):
+        if not reuse:
+            self._discard(conn)
+            self._slots.release()
+            return
+        try:
+            # Never hand the next borrower someone else's open transaction (or its stale snapshot)
+            if conn.in_transaction:
+                conn.rollback()
+        except DB_ERRORS:
+            self._discard(conn)
+        else:
+            self._returned_at[id(conn)] = time.monotonic()
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except Empty:
+                return
+
+    def _checkout(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                return self._open()
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def _open(self):
+        conn = self._connect()
+        self._opened_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _is_healthy(self, conn):
+        now = time.monotonic()
+        if now - self._opened_at.get(id(conn), 0) > self.recycle:
+            return False
+        if now - self._returned_at.get(id(conn), 0) < self.ping_after:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except DB_ERRORS:
+            return False
+
+    def _discard(self, conn):
+        self._opened_at.pop(id(conn), None)
+        self._returned_at.pop(id(conn), None)
+        statements.close_cursors(conn)
+        try:
             conn.close()
+        except Exception:
+            pass
+
+class Database:
+    """Awaitable access to the connection pool.
+
+    Every call borrows a pooled connection on a bounded worker thread, so a slow
+    query only occupies its own worker and never blocks the event loop. Calls are
+    first admitted by the read or write budget (see admission.py), which answers
+    503 rather than letting a burst queue up without bound.
+    """
+
+    def __init__(self, pool, workers=None, readers=admission.readers, writers=admission.writers):
+        self.pool = pool
+        self.readers = readers
+        self.writers = writers
+        self._executor = ThreadPoolExecutor(max_workers=workers or pool.size, thread_name_prefix="db")
+
+    async def run(self, fn, *args, read=False):
+        """Run ``fn(conn, *args)`` on a worker thread and await its result; ``read`` picks the read budget."""
+        loop = asyncio.get_running_loop()
+        async with self.readers if read else self.writers:
+            return await loop.run_in_executor(self._executor, self._call, fn, args)
+
+    async def fetch_all(self, query, params=()):
+        """Rows of a read ``query``; identical concurrent calls share one execution (see coalesce.py)."""
+        return await read_flights.do(("all", query, tuple(params)), lambda: self.run(_fetch_all, query, params, read=True))
+
+    async def fetch_one(self, query, params=()):
+        return await read_flights.do(("one", query, tuple(params)), lambda: self.run(_fetch_one, query, params, read=True))
+
+    async def stream(self, query, params=(), batch_size=STREAM_BATCH_SIZE):
+        """Yield rows from an unbuffered (server-side) cursor, fetching ``batch_size`` at a time.
+
+        The connection, and a place in the read budget, stay taken until the stream
+        ends. If the consumer stops early the unread rows cannot be skipped cheaply,
+        so the connection is closed instead of being returned to the pool.
+        """
+        loop = asyncio.get_running_loop()
+        await self.readers.acquire()
+        try:
+            conn = await loop.run_in_executor(self._executor, self.pool.acquire)
+        except BaseException:
+            self.readers.release()
+            raise
+        cursor = None
+        finished = False
+        try:
+            cursor = await loop.run_in_executor(self._executor, _open_cursor, InstrumentedConnection(conn), query, params)
+            while True:
+                rows = await loop.run_in_executor(self._executor, cursor.fetchmany, batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+            finished = True
+        finally:
+            try:
+                if finished:
+                    await loop.run_in_executor(self._executor, self._finish_stream, conn, cursor)
+                else:
+                    self.pool.release(conn, reuse=False)
+            finally:
+                self.readers.release()
+
+    async def execute(self, query, params=()):
+        """Run a write statement in its own transaction and return the affected row count."""
+        return await self.run(_execute, query, params)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+
+    def _call(self, fn, args):
+        conn = self.pool.acquire()
+        try:
+            return fn(InstrumentedConnection(conn), *args)
+        finally:
+            self.pool.release(conn)
+
+    def _finish_stream(self, conn, cursor):
+        cursor.close()
+        self.pool.release(conn)
+
+def _open_cursor(conn, query, params):
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(query, params)
+    return cursor
+
+def _fetch_all(conn, query, params):
+    cursor = statements.prepared_cursor(conn, query)
+    if cursor is not None:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    with conn.cursor(dictionary=True) as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+def _fetch_one(conn, query, params):
+    # fetchall() rather than fetchone() so no unread result is left on the pooled connection
+    rows = _fetch_all(conn, query, params)
+    return rows[0] if rows else None
+
+def _execute(conn, query, params):
+    with conn.cursor() as cursor:
+        cursor.execute(query, params)
+        conn.commit()
+        return cursor.rowcount
+
+pool = ConnectionPool()
+db = Database(pool)
 
+async def get_db():
+    """FastAPI dependency that hands routes the shared awaitable database."""
+    return db
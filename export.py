@@ -0,0 +1,113 @@
+"""Streaming export of whole terms for accreditation reviews.
+
+``/export`` writes every section of a term range, joined with its course,
+instructor and evaluations (one line per evaluation; a section without any gets
+one line with empty evaluation fields), as CSV or NDJSON. Rows come from a
+server-side cursor and leave as soon as a batch is encoded, gzip-compressed on the
+fly when the client accepts it, so a multi-year export runs in constant memory.
+"""
+import csv
+import io
+import re
+import unicodedata
+import zlib
+from typing import Literal, Optional
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+import queries
+from database import get_db, STREAM_BATCH_SIZE
+from serialization import dumps
+from terms import term_range
+from versions import conditional
+
+router = APIRouter(tags=["export"])
+
+EXPORT_COLUMNS = ("year", "semester", "section_number", "course_number", "course_name", "instructor_id",
+                  "instructor_name", "number_of_students", "objective_code", "eval_criteria", "eval_A_count",
+                  "eval_B_count", "eval_C_count", "eval_F_count", "improvements")
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+def accepts_gzip(accept_encoding):
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            quality = params.strip().removeprefix("q=")
+            try:
+                return not params or float(quality) > 0
+            except ValueError:
+                return False
+    return False
+
+async def encode(rows, file_format, compress, batch_size=STREAM_BATCH_SIZE):
+    """Yield ``rows`` as CSV or NDJSON bytes, one chunk per ``batch_size`` rows.
+
+    When compressing, every chunk ends with a sync flush, so the client can decode
+    what it has received so far instead of waiting for the compressor's window to fill.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    lines = []  # NDJSON lines, already encoded
+
+    def chunk(final=False):
+        data = buffer.getvalue().encode() + b"".join(lines)
+        buffer.seek(0)
+        buffer.truncate()
+        lines.clear()
+        if compressor is not None:
+            data = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        return data
+
+    if file_format == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+        yield chunk()
+    pending = 0
+    async for row in rows:
+        if file_format == "csv":
+            writer.writerow([row[column] for column in EXPORT_COLUMNS])
+        else:
+            lines.append(dumps({column: row[column] for column in EXPORT_COLUMNS}) + b"\n")
+        pending += 1
+        if pending == batch_size:
+            yield chunk()
+            pending = 0
+    data = chunk(final=True)
+    if data:
+        yield data
+
+def _coding(request):
+    return "gzip" if accepts_gzip(request.headers.get("accept-encoding", "")) else None
+
+def _content_disposition(request, file_format):
+    """``attachment`` with an ASCII ``filename`` for every client and the exact one as RFC 5987 ``filename*``."""
+    params = request.query_params
+    name = "-".join(["export", params["start_year"], params["start_semester"], params["end_year"], params["end_semester"],
+                     *([params["degree_name"], params["degree_level"]] if "degree_name" in params else [])])
+    name = f"{name}.{file_format}".replace(" ", "_")
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    ascii_name = re.sub(r"[^A-Za-z0-9.-]+", "_", ascii_name)
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(name, safe='')}"
+
+@router.get("/export", response_class=StreamingResponse,
+            dependencies=[Depends(conditional("sections", "courses", "instructors", "course_evaluations", "degree_courses",
+                                              coding=_coding))],
+            summary="Stream sections, courses, instructors and evaluations of a term range as CSV or NDJSON",
+            response_description="The rows, gzip-encoded when the request sends Accept-Encoding: gzip")
+async def export(request: Request, response: Response, terms=Depends(term_range),
+                 file_format: Literal["csv", "ndjson"] = Query("csv", alias="format", description="csv or ndjson"),
+                 degree_name: Optional[str] = Query(None, description="Only sections of this degree's courses (with degree_level)"),
+                 degree_level: Optional[str] = Query(None, description="The level of the degree"),
+                 db=Depends(get_db)):
+    if (degree_name is None) != (degree_level is None):
+        raise HTTPException(status_code=400, detail="Pass degree_name and degree_level together")
+    compress = _coding(request) == "gzip"
+    rows = db.stream(queries.EXPORT_SECTIONS, (*terms, degree_name, degree_name, degree_level))
+    # A returned Response skips FastAPI's merge of headers set on ``response`` (the ETag and Vary)
+    headers = {**response.headers, "Content-Disposition": _content_disposition(request, file_format)}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(encode(rows, file_format, compress), media_type=MEDIA_TYPES[file_format], headers=headers)
@@ -1,3 +1,17 @@
+// List endpoints return one page at a time; the cursor for the next page comes back in X-Next-Cursor
+async function fetchAllPages(url) {
+    const rows = [];
+    let cursor = null;
+    do {
+        const pageUrl = cursor ? `${url}${url.includes('?') ? '&' : '?'}after=${encodeURIComponent(cursor)}` : url;
+        const response = await fetch(pageUrl);
+        if (!response.ok) throw new Error('Request failed. Status: ' + response.status);
+        rows.push(...await response.json());
+        cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return rows;
+}
+
 async function addDegree() {
     const name = document.getElementById('degreeName').value;
     const level = document.getElementById('degreeLevel').value;
@@ -145,11 +159,7 @@ async function listSections() {
     const endSemester = document.getElementById('endSemester').value;
 
     try {
-        const response = await fetch(`http://127.0.0.1:8000/list-sections/?start_year=${startYear}&start_semester=${startSemester}&end_year=${endYear}&end_semester=${endSemester}`, {
-            method: 'GET'
-        });
-        if (!response.ok) throw new Error('Failed to fetch sections. Status: ' + response.status);
-        const sections = await response.json();
+        const sections = await fetchAllPages(`http://127.0.0.1:8000/list-sections/?start_year=${startYear}&start_semester=${startSemester}&end_year=${endYear}&end_semester=${endSemester}`);
         const sectionsDisplay = document.getElementById('sectionsDisplay');
         sectionsDisplay.innerHTML = '<h3>Sections:</h3>' + sections.map(section => 
             `Number: ${section.section_number}, Students: ${section.number_of_students}, Instructor ID: ${section.instructor_id}, Course: ${section.course_number}, Year: ${section.year}, Semester: ${section.semester}`
@@ -161,9 +171,7 @@ async function listSections() {
 
 async function listLearningObjectives() {
     try {
-        const response = await fetch('http://127.0.0.1:8000/learning-objectives/');
-        if (!response.ok) throw new Error('Failed to fetch objectives. Status: ' + response.status);
-        const objectives = await response.json();
+        const objectives = await fetchAllPages('http://127.0.0.1:8000/learning-objectives/');
         const objectivesDisplay = document.getElementById('objectivesDisplay');
         objectivesDisplay.innerHTML = '<h3>Objectives:</h3>' + objectives.map(obj => 
             `Code: ${obj.code}, Title: ${obj.title}, Description: ${obj.description}`
@@ -173,6 +181,31 @@ async function listLearningObjectives() {
     }
 }
 
+// Type-ahead: only the response to the latest keystroke is shown
+let searchSequence = 0;
+
+async function searchCatalog() {
+    const query = document.getElementById('searchQuery').value.trim();
+    const resultsDisplay = document.getElementById('searchResults');
+    const sequence = ++searchSequence;
+    if (!query) {
+        resultsDisplay.innerHTML = '';
+        return;
+    }
+    try {
+        const response = await fetch(`http://127.0.0.1:8000/search?q=${encodeURIComponent(query)}`);
+        if (!response.ok) throw new Error('Request failed. Status: ' + response.status);
+        const results = await response.json();
+        if (sequence !== searchSequence) return;
+        resultsDisplay.innerHTML = results.map(result => result.kind === 'course'
+            ? `Course ${result.course_number}: ${result.title}`
+            : `Objective ${result.objective_code}: ${result.title} - ${result.description}`
+        ).join('<br>');
+    } catch (error) {
+        console.error('Search failed:', error);
+    }
+}
+
 async function associateCourseWithObjective() {
     const course_number = document.getElementById('assocCourseNumber_Learning').value;
     const objective_code = document.getElementById('assocObjectiveCode').value;
@@ -220,11 +253,7 @@ async function getSectionsByCourse() {
     const endSemester = document.getElementById('endSemesterQuery').value;
 
     try {
-        const response = await fetch(`http://127.0.0.1:8000/sections-by-course/?course_number=${encodeURIComponent(courseNumber)}&start_year=${startYear}&start_semester=${encodeURIComponent(startSemester)}&end_year=${endYear}&end_semester=${encodeURIComponent(endSemester)}`, {
-            method: 'GET'
-        });
-        if (!response.ok) throw new Error('Failed to fetch sections. Status: ' + response.status);
-        const sections = await response.json();
+        const sections = await fetchAllPages(`http://127.0.0.1:8000/sections-by-course/?course_number=${encodeURIComponent(courseNumber)}&start_year=${startYear}&start_semester=${encodeURIComponent(startSemester)}&end_year=${endYear}&end_semester=${encodeURIComponent(endSemester)}`);
         const displayDiv = document.getElementById('sectionsByCourseDisplay');
         displayDiv.innerHTML = '<h3>Sections:</h3>' + sections.map(section =>
             `Section Number: ${section.section_number}, Students: ${section.number_of_students}, Instructor ID: ${section.instructor_id}, Course: ${section.course_number}, Year: ${section.year}, Semester: ${section.semester}`
@@ -248,11 +277,7 @@ async function getSectionsByInstructor() {
     }
 
     try {
-        const response = await fetch(`http://127.0.0.1:8000/sections-by-instructor/?instructor_id=${instructorId}&start_year=${startYear}&start_semester=${encodeURIComponent(startSemester)}&end_year=${endYear}&end_semester=${encodeURIComponent(endSemester)}`, {
-            method: 'GET'
-        });
-        if (!response.ok) throw new Error('Failed to fetch sections. Status: ' + response.status);
-        const sections = await response.json();
+        const sections = await fetchAllPages(`http://127.0.0.1:8000/sections-by-instructor/?instructor_id=${instructorId}&start_year=${startYear}&start_semester=${encodeURIComponent(startSemester)}&end_year=${endYear}&end_semester=${encodeURIComponent(endSemester)}`);
         const displayDiv = document.getElementById('sectionsByInstructorDisplay');
         displayDiv.innerHTML = '<h3>Sections:</h3>' + sections.map(section =>
             `Section Number: ${section.section_number}, Students: ${section.number_of_students}, Course Number: ${section.course_number}, Year: ${section.year}, Semester: ${section.semester}`
@@ -305,79 +330,88 @@ async function submitEvaluation() {
     }
 }
 
-window.onload = function() {
-    fetchInstructors();
-    fetchDegrees();
-};
-
-async function fetchInstructors() {
+// One request fills every drop-down and shows the current term's section status
+async function loadDashboard() {
     try {
-        const response = await fetch('http://127.0.0.1:8000/instructors/');
+        const response = await fetch('http://127.0.0.1:8000/bootstrap');
+        if (!response.ok) throw new Error('Request failed. Status: ' + response.status);
         const data = await response.json();
-        const selects = document.querySelectorAll('.instructor-select');
-        selects.forEach(select => {
-            data.forEach(instructor => {
-                let option = document.createElement('option');
-                option.value = instructor.id;
-                option.textContent = instructor.name;
-                select.appendChild(option);
-            });
-        });
+        fillInstructors(data.instructors);
+        fillDegrees(data.degrees);
+        fillLearningObjectives(data.learning_objectives);
+        if (data.current_term) {
+            document.getElementById('yearInput').value = data.current_term.year;
+            document.getElementById('semesterSelect').value = data.current_term.semester;
+            document.getElementById('queryYear').value = data.current_term.year;
+            document.getElementById('querySemester').value = data.current_term.semester;
+            displaySectionEvaluationStatus(data.sections);
+        }
     } catch (error) {
-        console.error('Failed to fetch instructors:', error);
+        console.error('Failed to load the dashboard:', error);
     }
 }
 
-async function fetchDegrees() {
-    try {
-        const response = await fetch('http://localhost:8000/degrees/');
-        const data = await response.json();
-        const degreeSelect = document.getElementById('degreeSelect');
-        const degreeLevelSelect = document.getElementById('degreeLevelSelect');
-
-        // Clear previous options
-        degreeSelect.innerHTML = '';
-        degreeLevelSelect.innerHTML = '';
+window.onload = loadDashboard;
 
-        // To store unique degree names and levels
-        const degrees = {};
-
-        data.forEach(degree => {
-            // Populate degree names
-            degrees[degree.name] = degrees[degree.name] || [];
-            degrees[degree.name].push(degree.level);
-        });
-
-        // Populate degree select with unique degrees
-        Object.keys(degrees).forEach(name => {
+function fillInstructors(data) {
+    const selects = document.querySelectorAll('.instructor-select');
+    selects.forEach(select => {
+        data.forEach(instructor => {
             let option = document.createElement('option');
-            option.value = name;
-            option.textContent = name;
-            degreeSelect.appendChild(option);
+            option.value = instructor.id;
+            option.textContent = instructor.name;
+            select.appendChild(option);
         });
+    });
+}
 
-        // Populate degree level select when a degree is selected
-        degreeSelect.addEventListener('change', function() {
-            const selectedDegree = this.value;
-            degreeLevelSelect.innerHTML = '';
-            degrees[selectedDegree].forEach(level => {
-                let levelOption = document.createElement('option');
-                levelOption.value = level;
-                levelOption.textContent = level;
-                degreeLevelSelect.appendChild(levelOption);
-            });
+function fillDegrees(data) {
+    const degreeSelect = document.getElementById('degreeSelect');
+    const degreeLevelSelect = document.getElementById('degreeLevelSelect');
+
+    // Clear previous options
+    degreeSelect.innerHTML = '';
+    degreeLevelSelect.innerHTML = '';
+
+    // To store unique degree names and levels
+    const degrees = {};
+
+    data.forEach(degree => {
+        // Populate degree names
+        degrees[degree.name] = degrees[degree.name] || [];
+        degrees[degree.name].push(degree.level);
+    });
+
+    // Populate degree select with unique degrees
+    Object.keys(degrees).forEach(name => {
+        let option = document.createElement('option');
+        option.value = name;
+        option.textContent = name;
+        degreeSelect.appendChild(option);
+    });
+
+    // Populate degree level select when a degree is selected
+    degreeSelect.addEventListener('change', function() {
+        const selectedDegree = this.value;
+        degreeLevelSelect.innerHTML = '';
+        degrees[selectedDegree].forEach(level => {
+            let levelOption = document.createElement('option');
+            levelOption.value = level;
+            levelOption.textContent = level;
+            degreeLevelSelect.appendChild(levelOption);
         });
+    });
 
-        // Trigger change event to populate degree level select initially
-        if (degreeSelect.value) {
-            degreeSelect.dispatchEvent(new Event('change'));
-        }
-    } catch (error) {
-        console.error('Failed to fetch degrees:', error);
+    // Trigger change event to populate degree level select initially
+    if (degreeSelect.value) {
+        degreeSelect.dispatchEvent(new Event('change'));
     }
 }
 
 
+// Evaluations of the listed sections, by section number; loaded in one request alongside the list
+let evaluationsBySection = {};
+
 async function fetchSections() {
     const instructorId = document.getElementById('instructorSelect').value;
     const degreeName = document.getElementById('degreeSelect').value;
@@ -386,11 +420,14 @@ async function fetchSections() {
     const year = document.getElementById('yearInput').value;
 
     try {
-        const response = await fetch(`http://127.0.0.1:8000/sections-evaluation-status/?year=${year}&semester=${semester}`);
-        if (!response.ok) {
-            throw new Error('Failed to fetch sections');
-        }
-        const sections = await response.json();
+        const [sections, evaluations] = await Promise.all([
+            fetchAllPages(`http://127.0.0.1:8000/sections-evaluation-status/?year=${year}&semester=${semester}`),
+            fetchAllPages(`http://127.0.0.1:8000/evaluations/?year=${year}&semester=${semester}`)
+        ]);
+        evaluationsBySection = {};
+        evaluations.forEach(section => {
+            evaluationsBySection[section.section_number] = section.evaluations;
+        });
         displaySections(sections);
     } catch (error) {
         console.error('Failed to load sections:', error);
@@ -440,10 +477,11 @@ function showEvaluationForm(sectionNumber, hasEvaluation) {
 }
 
 
-async function loadEvaluationData(sectionNumber) {
+function loadEvaluationData(sectionNumber) {
     try {
-        const response = await fetch(`http://127.0.0.1:8000/get-evaluation/${sectionNumber}`);
-        const data = await response.json();
+        const evaluations = evaluationsBySection[sectionNumber] || [];
+        const objectiveCode = document.getElementById('objectiveCode_EvalQuery').value;
+        const data = evaluations.find(evaluation => String(evaluation.objective_code) === objectiveCode) || evaluations[0];
         if (data) {
             // Populate form fields with fetched data
             document.getElementById('objectiveCode_EvalQuery').value = data.objective_code || '';
@@ -538,25 +576,17 @@ function hideEvaluationForm() {
 }
 
 
-async function fetchLearningObjectives() {
-    try {
-        const response = await fetch('http://127.0.0.1:8000/learning-objectives/');
-        const objectives = await response.json();
-        const select = document.getElementById('objectiveCode_EvalQuery'); // Assuming this is your select element ID
-        select.innerHTML = ''; // Clear existing options
-        objectives.forEach(objective => {
-            let option = document.createElement('option');
-            option.value = objective.code;
-            option.textContent = `${objective.title} (${objective.code})`;
-            select.appendChild(option);
-        });
-    } catch (error) {
-        console.error('Failed to load learning objectives:', error);
-    }
+function fillLearningObjectives(objectives) {
+    const select = document.getElementById('objectiveCode_EvalQuery'); // Assuming this is your select element ID
+    select.innerHTML = ''; // Clear existing options
+    objectives.forEach(objective => {
+        let option = document.createElement('option');
+        option.value = objective.code;
+        option.textContent = `${objective.title} (${objective.code})`;
+        select.appendChild(option);
+    });
 }
 
-document.addEventListener("DOMContentLoaded", fetchLearningObjectives);
-
 async function querySectionEvaluationStatus() {
     const year = document.getElementById('queryYear').value;
     const semester = document.getElementById('querySemester').value;
@@ -567,11 +597,7 @@ async function querySectionEvaluationStatus() {
     }
 
     try {
-        const response = await fetch(url);
-        if (!response.ok) {
-            throw new Error('Failed to fetch section evaluation status');
-        }
-        const data = await response.json();
+        const data = await fetchAllPages(url);
         displaySectionEvaluationStatus(data);
     } catch (error) {
         console.error('Failed to load section evaluation status:', error);
@@ -1,8 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import routes  # Import routes from routes.py
+import bulk
+import reports
+import curriculum
+import export
+import analytics
+import bootstrap
+import search
+import metrics
+import versions
+from database import db
+from pagination import NEXT_CURSOR_HEADER
+
+@asynccontextmanager
+async def lifespan(app):
+    # The versions are read first: that read reports every table as changed and would drop
+    # indexes loaded before it
+    versions_poll = await versions.start(db)
+    await curriculum.warm(db)
+    await search.warm(db)
+    try:
+        yield
+    finally:
+        versions_poll.cancel()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -10,7 +36,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Retry-After"],  # Lets the frontend follow paginated lists and see validators
 )
+app.add_middleware(metrics.MetricsMiddleware)  # Outermost, so the timings include every other layer
 
 app.include_router(routes.router)  # Include the router from routes.py
+app.include_router(bulk.router)
+app.include_router(reports.router)
+app.include_router(curriculum.router)
+app.include_router(export.router)
+app.include_router(analytics.router)
+app.include_router(bootstrap.router)
+app.include_router(search.router)
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
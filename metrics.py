@@ -0,0 +1,220 @@
+"""Request and database instrumentation, exposed in the Prometheus text format.
+
+``MetricsMiddleware`` times every request by route template and status code.
+``InstrumentedConnection`` wraps the pooled connections handed to data-access
+code and times every statement, labelled with its name in queries.py, and counts
+the rows it returns. ``ConnectionPool.acquire`` records how long callers wait for
+a connection. Statements slower than ``SLOW_QUERY_MS`` are logged on the
+``slow_query`` logger with their SQL template and the shape of their parameters
+(never the values).
+"""
+import bisect
+import logging
+import threading
+import time
+
+import queries
+from config import config
+
+SLOW_QUERY_MS = float(config.get('SLOW_QUERY_MS', 200))
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+slow_query_log = logging.getLogger("slow_query")
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}  # labels -> [count per bucket (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels((*self.labelnames, 'le'), (*labels, bound))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+def _labels(names, values):
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Time to handle a request, through the last body byte",
+                            ("method", "route", "status"))
+QUERY_LATENCY = Histogram("db_query_duration_seconds", "Time to execute a statement", ("statement",))
+QUERY_ROWS = Counter("db_query_rows_total", "Rows fetched from statements", ("statement",))
+POOL_WAIT = Histogram("db_pool_wait_seconds", "Time spent waiting for a pooled connection")
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Connection checkouts that gave up waiting")
+
+METRICS = [REQUEST_LATENCY, QUERY_LATENCY, QUERY_ROWS, POOL_WAIT, POOL_TIMEOUTS]
+# Callables returning extra exposition lines, for state other modules keep themselves
+collectors = []
+
+def render():
+    lines = [line for metric in METRICS for line in metric.render()]
+    for collect in collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+# Statement text -> name in queries.py. Templates filled in with str.format are matched on the text before the first field.
+_STATEMENTS = {value: name for name, value in vars(queries).items() if name.isupper() and isinstance(value, str)}
+_TEMPLATES = [(value.split("{")[0], name) for value, name in _STATEMENTS.items() if "{" in value]
+
+def statement_name(sql):
+    name = _STATEMENTS.get(sql)
+    if name:
+        return name
+    for prefix, name in _TEMPLATES:
+        if sql.startswith(prefix):
+            return name
+    # Statements built on the fly (bulk inserts): the verb and table are enough to tell them apart
+    return " ".join(sql.split()[:3])
+
+def parameter_shape(params):
+    """Describe ``params`` by type, run-length encoded: ``(int, str, int x 40)``."""
+    shape = []
+    for param in params if isinstance(params, (list, tuple)) else [params]:
+        kind = type(param).__name__
+        if shape and shape[-1][0] == kind:
+            shape[-1][1] += 1
+        else:
+            shape.append([kind, 1])
+    return "(" + ", ".join(kind if count == 1 else f"{kind} x {count}" for kind, count in shape) + ")"
+
+def _record(name, sql, params, started):
+    elapsed = time.perf_counter() - started
+    QUERY_LATENCY.observe(elapsed, (name,))
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        slow_query_log.warning("%s took %.1f ms; params %s; sql: %s", name, elapsed * 1000,
+                               parameter_shape(params), " ".join(sql.split()))
+
+class InstrumentedCursor:
+    """Cursor proxy timing ``execute``/``executemany`` and counting fetched rows."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._statement = None
+
+    def execute(self, sql, params=()):
+        self._statement = statement_name(sql)
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params)
+        finally:
+            _record(self._statement, sql, params, started)
+
+    def executemany(self, sql, seq_params):
+        self._statement = statement_name(sql)
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_params)
+        finally:
+            _record(self._statement, sql, seq_params[0] if seq_params else (), started)
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        QUERY_ROWS.inc((self._statement,), len(rows))
+        return rows
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        QUERY_ROWS.inc((self._statement,), len(rows))
+        return rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            QUERY_ROWS.inc((self._statement,))
+        return row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cursor.close()
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are ``InstrumentedCursor``s."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs))
+
+    @property
+    def wrapped(self):
+        """The pooled connection itself, for state kept per connection."""
+        return self._conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+class MetricsMiddleware:
+    """ASGI middleware recording ``http_request_duration_seconds`` per route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            REQUEST_LATENCY.observe(time.perf_counter() - started,
+                                    (scope["method"], getattr(route, "path", "unmatched"), str(status)))
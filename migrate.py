@@ -0,0 +1,416 @@
+"""Versioned, idempotent schema migrations.
+
+    python migrate.py            apply every pending migration
+    python migrate.py --status   list applied and pending migrations
+    python migrate.py --explain  print EXPLAIN for every statement in queries.py and flag full scans
+    python migrate.py --rebuild-rollup
+                                 recompute evaluation_rollup from the base tables
+
+Applied versions are recorded in ``schema_migrations``. MySQL commits DDL
+implicitly, so each migration checks information_schema before changing anything
+and can safely be re-run if it was interrupted half way.
+
+With ``DB_ENGINE=sqlite`` the database is created at the latest schema
+(``sqlite_engine.SCHEMA``) when it is first opened, so migrating only records
+every version as applied, and ``--explain`` prints ``EXPLAIN QUERY PLAN``.
+"""
+import argparse
+import re
+import sys
+
+import queries
+import rollup
+import versions
+from database import connect, DB_ERRORS, ENGINE
+from terms import term_index as resolve_term_index
+
+# year * 4 + semester_sort_order.sort_order; see terms.SEMESTER_SORT_ORDER
+TERM_INDEX_EXPR = "year * 4 + CASE semester WHEN 'Winter' THEN 1 WHEN 'Spring' THEN 2 WHEN 'Summer' THEN 3 WHEN 'Fall' THEN 4 END"
+
+def _column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchall() != []
+
+def _index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table, index))
+    return cursor.fetchall() != []
+
+def _add_index(cursor, table, index, columns):
+    if not _index_exists(cursor, table, index):
+        cursor.execute(f"ALTER TABLE {table} ADD INDEX {index} ({columns})")
+
+def initial_schema(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS degrees (
+            name VARCHAR(255),
+            level VARCHAR(255),
+            PRIMARY KEY (name, level)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS courses (
+            department_code VARCHAR(4) NOT NULL CHECK (LENGTH(department_code) BETWEEN 2 AND 4),
+            course_code INT NOT NULL CHECK (course_code BETWEEN 1000 AND 9999),
+            course_number VARCHAR(8) AS (CONCAT(department_code, LPAD(course_code, 4, '0'))) STORED PRIMARY KEY,
+            name VARCHAR(255) UNIQUE
+            )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS semester_sort_order (
+            semester VARCHAR(255) PRIMARY KEY,
+            sort_order INT
+        );
+    ''')
+
+    # Insert semester sorting order
+    cursor.execute('''
+    INSERT INTO semester_sort_order (semester, sort_order) VALUES
+        ('Winter', 1),
+        ('Spring', 2),
+        ('Summer', 3),
+        ('Fall', 4)
+        ON DUPLICATE KEY UPDATE sort_order=VALUES(sort_order);
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS semesters (
+            year INT,
+            semester VARCHAR(255),
+            PRIMARY KEY (year, semester),
+            FOREIGN KEY (semester) REFERENCES semester_sort_order(semester)
+        );
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS instructors (
+          instructor_id INT PRIMARY KEY,
+          name VARCHAR(255)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sections (
+          section_number INT PRIMARY KEY,
+          number_of_students INT,
+          instructor_id INT,
+          course_number VARCHAR(255),
+          year INT,
+          semester VARCHAR(255),
+          FOREIGN KEY (instructor_id) REFERENCES instructors (instructor_id),
+          FOREIGN KEY (course_number) REFERENCES courses (course_number),
+          FOREIGN KEY (year, semester) REFERENCES semesters (year, semester)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sections_courses (
+          course_number VARCHAR(255),
+          section_number INT,
+          PRIMARY KEY (course_number, section_number),
+          FOREIGN KEY (course_number) REFERENCES courses (course_number),
+          FOREIGN KEY (section_number) REFERENCES sections (section_number)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS degree_courses (
+            degree_name VARCHAR(255),
+            degree_level VARCHAR(255),
+            course_number VARCHAR(255),
+            core_course BOOLEAN,
+            PRIMARY KEY (degree_name, degree_level, course_number),
+            FOREIGN KEY (degree_name, degree_level) REFERENCES degrees (name, level),
+            FOREIGN KEY (course_number) REFERENCES courses (course_number)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS learning_objectives (
+          code INT PRIMARY KEY,
+          title VARCHAR(255),
+          description TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS course_evaluations (
+            eval_ID INT AUTO_INCREMENT PRIMARY KEY,
+            section_ID INT,
+            objective_code INT,
+            eval_criteria VARCHAR(255),
+            eval_A_count INT,
+            eval_B_count INT,
+            eval_C_count INT,
+            eval_F_count INT,
+            improvements TEXT,
+            FOREIGN KEY (section_ID) REFERENCES sections (section_number),
+            FOREIGN KEY (objective_code) REFERENCES learning_objectives (code),
+            UNIQUE KEY section_objective_unique (section_ID, objective_code)
+        )
+    ''')
+
+    cursor.execute('''
+      CREATE TABLE IF NOT EXISTS course_learning_objectives(
+        course_number VARCHAR(255),
+        objective_code INT,
+        PRIMARY KEY (course_number, objective_code),
+        FOREIGN KEY (course_number) REFERENCES courses (course_number),
+        FOREIGN KEY (objective_code) REFERENCES learning_objectives (code)
+        );
+    ''')
+
+def term_index(cursor):
+    # MySQL rejects ON UPDATE CASCADE on the base column of a stored generated column. Older
+    # deployments created semesters with one; it never took effect since sections does not cascade.
+    cursor.execute("""
+        SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = 'semesters' AND UPDATE_RULE = 'CASCADE'
+    """)
+    for (constraint,) in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE semesters DROP FOREIGN KEY {constraint}")
+        cursor.execute("ALTER TABLE semesters ADD FOREIGN KEY (semester) REFERENCES semester_sort_order(semester)")
+
+    for table in ("semesters", "sections"):
+        if not _column_exists(cursor, table, "term_index"):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN term_index INT AS ({TERM_INDEX_EXPR}) STORED")
+
+    _add_index(cursor, "semesters", "idx_semesters_term", "term_index")
+    _add_index(cursor, "sections", "idx_sections_term", "term_index")
+    _add_index(cursor, "sections", "idx_sections_course_term", "course_number, term_index")
+    _add_index(cursor, "sections", "idx_sections_instructor_term", "instructor_id, term_index")
+
+def secondary_indexes(cursor):
+    # /sections-evaluation-status/ filters on (year, semester); InnoDB appends the primary key,
+    # so the index also hands rows back in section_number order.
+    _add_index(cursor, "sections", "idx_sections_year_semester", "year, semester")
+    # Covers the degree joins (course_number -> degree, core flag) without touching the clustered index
+    _add_index(cursor, "degree_courses", "idx_degree_courses_course", "course_number, degree_name, degree_level, core_course")
+    # course_evaluations(section_ID) needs no index of its own: it is the leftmost column of
+    # section_objective_unique, which already serves the LEFT JOINs.
+
+def evaluation_rollup(cursor):
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS evaluation_rollup (
+            degree_name VARCHAR(255),
+            degree_level VARCHAR(255),
+            objective_code INT,
+            year INT,
+            semester VARCHAR(255),
+            term_index INT AS ({TERM_INDEX_EXPR}) STORED,
+            a_count BIGINT NOT NULL DEFAULT 0,
+            b_count BIGINT NOT NULL DEFAULT 0,
+            c_count BIGINT NOT NULL DEFAULT 0,
+            f_count BIGINT NOT NULL DEFAULT 0,
+            section_count INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (degree_name, degree_level, objective_code, year, semester),
+            INDEX idx_rollup_degree_term (degree_name, degree_level, term_index, objective_code),
+            INDEX idx_rollup_term (year, semester, degree_name, degree_level, objective_code)
+        )
+    ''')
+    rollup.rebuild(cursor)
+
+def table_versions(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name VARCHAR(64) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+    ''')
+
+MIGRATIONS = [
+    (1, "initial schema", initial_schema),
+    (2, "term_index ordinal on semesters and sections", term_index),
+    (3, "secondary indexes for the hot filters", secondary_indexes),
+    (4, "evaluation_rollup for program-level reports", evaluation_rollup),
+    (5, "table_versions shared by every worker's ETags", table_versions),
+]
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255),
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def applied_versions(cursor):
+    _ensure_migrations_table(cursor)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {version for (version,) in cursor.fetchall()}
+
+def migrate(conn):
+    with conn.cursor() as cursor:
+        applied = applied_versions(cursor)
+        for version, name, apply in MIGRATIONS:
+            if version in applied:
+                continue
+            if ENGINE != 'sqlite':
+                apply(cursor)
+            cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+            print(f"Applied migration {version}: {name}")
+    print("Schema is up to date.")
+
+def status(conn):
+    with conn.cursor() as cursor:
+        applied = applied_versions(cursor)
+    for version, name, _ in MIGRATIONS:
+        print(f"{version:>4}  {'applied' if version in applied else 'pending':<8} {name}")
+
+FALL_2023, FALL_2024 = resolve_term_index(2023, "Fall"), resolve_term_index(2024, "Fall")
+
+# Representative parameters for each statement in queries.py (first page, LIMIT 100)
+EXPLAIN_SAMPLES = {
+    "INSERT_SEMESTER_IGNORE": (2024, "Fall"),
+    "ASSOCIATE_COURSE_WITH_DEGREE": ("Computer Science", "BS", "CS1000", True),
+    "COURSES_BY_DEGREE": ("Computer Science", "BS", "", 100),
+    "LIST_SECTIONS": (FALL_2023, FALL_2024, 0, 0, 0, 100),
+    "LIST_LEARNING_OBJECTIVES": (0, 100),
+    "SECTIONS_BY_COURSE": ("CS1000", FALL_2023, FALL_2024, 0, 0, 0, 100),
+    "SECTIONS_BY_INSTRUCTOR": (1, FALL_2023, FALL_2024, 0, 0, 0, 100),
+    "INSTRUCTOR_SECTIONS": (1, 2024, "Fall", "Computer Science", "", "", 0, 100),
+    "LIST_DEGREES": ("", "", "", 100),
+    "LIST_INSTRUCTORS": (0, 100),
+    "LIST_SEMESTERS": (0, 100),
+    "SECTIONS_BY_INSTRUCTOR_DEGREE_SEMESTER": (1, "Computer Science", "BS", "Fall", 2024, 0, 0, -1, 100),
+    "SECTIONS_WITH_EVALUATIONS": (1, "Computer Science", "BS", 2024, "Fall", "", "", 0, 0, -1, 100),
+    "UPSERT_EVALUATION": (1, 1, "Exam", 1, 1, 1, 1, ""),
+    "EVALUATIONS_FOR_UPDATE": (1, 1, 1, 2),
+    "GET_EVALUATION": (1, None, None),
+    "EVALUATIONS_BY_SECTIONS": (1, 2, 3, 0, 100),
+    "EVALUATIONS_BY_TERM": (2024, "Fall", 0, 100),
+    "DEGREE_COURSES_FOR_UPDATE": ("Computer Science", "BS", "CS1000"),
+    "ROLLUP_APPLY_DELTAS": (1, 1, 10, 5, 2, 1, 1),
+    "ROLLUP_DELTA": (1, 1, 10, 5, 2, 1, 1),
+    "ROLLUP_ADD_COURSE": ("Computer Science", "BS", "CS1000"),
+    "ROLLUP_CLEAR": (),
+    "ROLLUP_REBUILD": (),
+    "REPORT_DEGREE_OBJECTIVES": ("Computer Science", "BS", FALL_2023, FALL_2024, 0, 0, 0, 100),
+    "REPORT_TERM_OBJECTIVES": (2024, "Fall", "", "", "", "", 0, 100),
+    "SECTIONS_EVALUATION_STATUS": (2024, "Fall", 0, 10.0, 10.0, "Entered", "Entered", 100),
+    "EXPORT_SECTIONS": (FALL_2023, FALL_2024, "Computer Science", "Computer Science", "BS"),
+    "ANALYTICS_EVALUATIONS": (FALL_2023, FALL_2024, None, None, None, None, None, None),
+    "CURRICULUM_COURSES": (),
+    "CURRICULUM_OBJECTIVES": (),
+    "SEARCH_OBJECTIVES": (),
+    "CURRICULUM_DEGREES": (),
+    "CURRICULUM_COURSE_OBJECTIVES": (),
+    "CURRICULUM_DEGREE_COURSES": (),
+    "BUMP_TABLE_VERSIONS": ("sections",),
+    "TABLE_VERSIONS_OF": ("sections",),
+    "TABLE_VERSIONS": (),
+}
+
+# Reference lists that return the whole table by design
+FULL_SCAN_EXPECTED = {"LIST_LEARNING_OBJECTIVES", "LIST_DEGREES", "LIST_INSTRUCTORS", "LIST_SEMESTERS",
+                      # and the rollup rebuild, which reads every evaluation by design
+                      "ROLLUP_CLEAR", "ROLLUP_REBUILD",
+                      # and the tables the curriculum index loads whole
+                      "CURRICULUM_COURSES", "CURRICULUM_OBJECTIVES", "CURRICULUM_DEGREES",
+                      "CURRICULUM_COURSE_OBJECTIVES", "CURRICULUM_DEGREE_COURSES",
+                      # and the one the search index loads whole
+                      "SEARCH_OBJECTIVES",
+                      # and the version of every table, a few rows
+                      "TABLE_VERSIONS"}
+
+def _sql(name, params):
+    sql = getattr(queries, name)
+    if name == "EVALUATIONS_FOR_UPDATE":
+        sql = sql.format(keys=",".join(["(%s, %s)"] * (len(params) // 2)))
+    elif name == "DEGREE_COURSES_FOR_UPDATE":
+        sql = sql.format(keys=",".join(["(%s, %s, %s)"] * (len(params) // 3)))
+    elif name == "ROLLUP_APPLY_DELTAS":
+        sql = sql.format(deltas=" UNION ALL ".join([queries.ROLLUP_DELTA] * (len(params) // 7)))
+    elif name == "EVALUATIONS_BY_SECTIONS":
+        sql = sql.format(section_ids=",".join(["%s"] * (len(params) - 2)))
+    elif name == "BUMP_TABLE_VERSIONS":
+        sql = sql.format(tables=",".join(["(%s, 1)"] * len(params)))
+    elif name == "TABLE_VERSIONS_OF":
+        sql = sql.format(tables=",".join(["%s"] * len(params)))
+    return sql
+
+# SQLite plan steps: "SCAN t" reads all of t; subqueries it builds first are named by CO-ROUTINE/MATERIALIZE
+_SQLITE_SCAN = re.compile(r"^SCAN (?!\d+ CONSTANT ROWS|CONSTANT ROW)(\w+)")
+_SQLITE_SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)")
+
+def _explain_sqlite(cursor, name, sql, params):
+    cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+    subqueries, full_scan = set(), False
+    for row in cursor.fetchall():
+        print(f"   {row['detail']}")
+        subqueries.update(_SQLITE_SUBQUERY.findall(row['detail']))
+        scan = _SQLITE_SCAN.match(row['detail'])
+        full_scan = full_scan or bool(scan and scan.group(1) not in subqueries)
+    return full_scan
+
+def explain(conn):
+    """Print the plan of every statement in queries.py; returns the names that scan a whole table."""
+    names = [name for name, value in vars(queries).items() if name.isupper() and isinstance(value, str)]
+    full_scans = []
+    with conn.cursor(dictionary=True) as cursor:
+        for name in names:
+            print(f"\n== {name}")
+            if name not in EXPLAIN_SAMPLES:
+                print("   no sample parameters; add it to EXPLAIN_SAMPLES")
+                full_scans.append(name)
+                continue
+            params = EXPLAIN_SAMPLES[name]
+            sql = _sql(name, params).strip().rstrip(";")
+            if ENGINE == 'sqlite':
+                if _explain_sqlite(cursor, name, sql, params) and name not in FULL_SCAN_EXPECTED:
+                    full_scans.append(name)
+                continue
+            cursor.execute("EXPLAIN " + sql, params)
+            for row in cursor.fetchall():
+                print(f"   {row['table'] or '-':<22} type={row['type'] or '-':<7} key={row['key'] or '-':<30} "
+                      f"rows={row['rows'] or '-':<8} {row['Extra'] or ''}")
+                if row['type'] == 'ALL' and name not in FULL_SCAN_EXPECTED:
+                    full_scans.append(name)
+    if full_scans:
+        print(f"\nFull table scans: {', '.join(sorted(set(full_scans)))}")
+    return full_scans
+
+def rebuild_rollup(conn):
+    with conn.cursor() as cursor:
+        rollup.rebuild(cursor)
+        # So running servers drop their cached reports
+        versions.record(cursor, ["evaluation_rollup"])
+        conn.commit()
+        cursor.execute("SELECT COUNT(*) FROM evaluation_rollup")
+        print(f"Rebuilt evaluation_rollup: {cursor.fetchall()[0][0]} rows.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply schema migrations")
+    parser.add_argument("--status", action="store_true", help="List applied and pending migrations")
+    parser.add_argument("--explain", action="store_true", help="EXPLAIN every statement in queries.py")
+    parser.add_argument("--rebuild-rollup", action="store_true", help="Recompute evaluation_rollup from the base tables")
+    args = parser.parse_args(argv)
+
+    conn = connect()
+    try:
+        if args.status:
+            status(conn)
+        elif args.explain:
+            return 1 if explain(conn) else 0
+        elif args.rebuild_rollup:
+            rebuild_rollup(conn)
+        else:
+            migrate(conn)
+    except DB_ERRORS as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
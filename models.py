@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, constr
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 
 class Degree(BaseModel):
     name: str
@@ -46,6 +46,21 @@ class EvaluationData(BaseModel):
     eval_F_count: int
     improvements: str
 
+class SectionEvaluations(BaseModel):
+    section_number: int
+    evaluations: List[EvaluationData]
+
+class EvaluationUpsertResult(BaseModel):
+    section_ID: int
+    objective_code: int
+    status: Literal['inserted', 'updated', 'unchanged']
+
+class EvaluationUpsertReport(BaseModel):
+    inserted: int
+    updated: int
+    unchanged: int
+    results: List[EvaluationUpsertResult]
+
 class DegreeOption(BaseModel):
     name: str
     level: str
@@ -118,3 +133,74 @@ class SectionEvaluationStatus(BaseModel):
     instructor_id: int
     evaluation_status: str
     percent_no_f_grade: Optional[float]
+
+class BulkImportError(BaseModel):
+    row: int
+    error: str
+
+class BulkImportReport(BaseModel):
+    received: int
+    imported: int
+    errors: List[BulkImportError]
+
+class ObjectiveCoverage(BaseModel):
+    code: int
+    title: str
+    course_count: int
+
+class CoverageGap(BaseModel):
+    degree_name: str
+    degree_level: str
+    missing_objectives: List[int]
+
+class ObjectiveOutcome(BaseModel):
+    degree_name: str
+    degree_level: str
+    objective_code: int
+    objective_title: str
+    year: int
+    semester: str
+    section_count: int
+    a_count: int
+    b_count: int
+    c_count: int
+    f_count: int
+    percent_no_f_grade: Optional[float]
+
+class GradeTrendPoint(BaseModel):
+    key: Union[int, str]  # course_number, instructor_id or objective_code, by dimension
+    year: int
+    semester: str
+    evaluations: int
+    a_count: int
+    b_count: int
+    c_count: int
+    f_count: int
+    percent_a: Optional[float]
+    percent_b: Optional[float]
+    percent_c: Optional[float]
+    percent_f: Optional[float]
+    moving_percent_a: Optional[float]
+    moving_percent_b: Optional[float]
+    moving_percent_c: Optional[float]
+    moving_percent_f: Optional[float]
+    change_percent_a: Optional[float]
+    change_percent_b: Optional[float]
+    change_percent_c: Optional[float]
+    change_percent_f: Optional[float]
+
+class DashboardBootstrap(BaseModel):
+    instructors: List[InstructorOption]
+    degrees: List[DegreeOption]
+    learning_objectives: List[LearningObjective]
+    semesters: List[Semester]
+    current_term: Optional[Semester]  # None until a semester has started
+    sections: List[SectionEvaluationStatus]  # evaluation status of every section of current_term
+
+class SearchResult(BaseModel):
+    kind: Literal['course', 'objective']
+    course_number: Optional[str]  # set for courses
+    objective_code: Optional[int]  # set for objectives
+    title: str  # course name or objective title
+    description: Optional[str]
+    score: float
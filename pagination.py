@@ -0,0 +1,143 @@
+"""Cursor-based pagination shared by every list route.
+
+A page is requested with ``limit`` and ``after``. ``after`` is an opaque token:
+URL-safe base64 of the JSON keyset values of the last row already seen. When
+more rows exist, the response carries the token for the next page in the
+``X-Next-Cursor`` header, so response bodies keep their plain list shape.
+``stream=true`` skips paging and writes every remaining row as NDJSON,
+straight from a server-side cursor.
+
+Each paginated statement in queries.py takes its keyset values followed by a
+final ``LIMIT %s``.
+"""
+import base64
+import binascii
+import itertools
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from serialization import dumps, json_default, projector, rows_response
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 5000
+# Stands in for "no limit" when streaming; MySQL has no LIMIT ALL
+STREAM_LIMIT = 2**62
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Lower bounds for keysets on the first page
+MIN_INT = -2**31
+MIN_STR = ""
+
+class Page:
+    """Dependency carrying the pagination parameters of a list route."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Maximum number of rows to return"),
+        after: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+        stream: bool = Query(False, description="Stream every remaining row as NDJSON instead of returning one page")):
+        self.limit = limit
+        self.after = after
+        self.stream = stream
+
+    @property
+    def first(self):
+        return self.after is None
+
+    def keyset(self, *lower_bounds):
+        """Keyset values to resume after, or ``lower_bounds`` on the first page.
+
+        Each value must have its bound's type: a cursor taken from another route, or from another
+        dimension of the same one, would otherwise compare a string with a number.
+        """
+        if self.after is None:
+            return lower_bounds
+        values = decode_cursor(self.after)
+        if len(values) != len(lower_bounds) or any(type(value) is not type(bound)
+                                                   for value, bound in zip(values, lower_bounds)):
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+        return tuple(values)
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(list(values), default=json_default).encode()).decode().rstrip("=")
+
+def decode_cursor(token):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+async def paginate(db, query, params, page, response, key, model=None, shape=None):
+    """Run a keyset ``query`` and return one page of rows, or an NDJSON stream when ``page.stream``.
+
+    ``key`` maps a database row to the keyset values a following page resumes after.
+    ``shape`` optionally turns each database row into the response item, and ``model``
+    names the fields each item is projected onto before encoding (see serialization.py).
+    """
+    if page.stream:
+        # A returned Response skips FastAPI's merge of headers set on ``response`` (ETag and the like)
+        return StreamingResponse(_ndjson(db.stream(query, (*params, STREAM_LIMIT)), model, shape),
+                                 media_type="application/x-ndjson", headers=dict(response.headers))
+    rows = await db.fetch_all(query, (*params, page.limit + 1))
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+    return rows_response([shape(row) for row in rows] if shape else rows, response, model)
+
+async def paginate_groups(db, query, params, page, response, key, group, model=None):
+    """``paginate`` for statements whose ``LIMIT`` counts groups of consecutive rows rather than rows.
+
+    Rows with equal ``key`` form one group, and ``key`` is also the keyset a following page
+    resumes after. ``group`` turns the list of rows of a group into one response item.
+    """
+    if page.stream:
+        return StreamingResponse(_ndjson(_grouped(db.stream(query, (*params, STREAM_LIMIT)), key, group), model, None),
+                                 media_type="application/x-ndjson", headers=dict(response.headers))
+    rows = await db.fetch_all(query, (*params, page.limit + 1))
+    groups = [(values, group(list(rows))) for values, rows in itertools.groupby(rows, key)]
+    if len(groups) > page.limit:
+        groups = groups[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(groups[-1][0])
+    return rows_response([item for _, item in groups], response, model)
+
+def paginate_items(items, after, page, response, key, model=None):
+    """``paginate`` for results already in memory, sorted by ``key``; ``after`` is ``page.keyset(...)``."""
+    items = [item for item in items if key(item) > tuple(after)]
+    if page.stream:
+        return StreamingResponse(_ndjson(_aiter(items), model, None),
+                                 media_type="application/x-ndjson", headers=dict(response.headers))
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(items[-1]))
+    return rows_response(items, response, model)
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+async def _grouped(rows, key, group):
+    current, members = None, []
+    async for row in rows:
+        values = key(row)
+        if members and values != current:
+            yield group(members)
+            members = []
+        current = values
+        members.append(row)
+    if members:
+        yield group(members)
+
+async def _ndjson(rows, model, shape):
+    project = projector(model) if model is not None else None
+    async for row in rows:
+        if shape is not None:
+            row = shape(row)
+        if project is not None:
+            row = project(row)
+        yield dumps(row) + b"\n"
@@ -0,0 +1,365 @@
+"""Every SQL statement the routes run, by name.
+
+Keeping them here lets ``python migrate.py --explain`` check each one against the
+live schema. Statements use the mysql.connector ``%s`` paramstyle. List statements
+page by keyset (see pagination.py): their filters come first, then the keyset
+values, then a final ``LIMIT %s``, and they order by a unique key.
+"""
+
+INSERT_SEMESTER_IGNORE = "INSERT IGNORE INTO semesters (year, semester) VALUES (%s, %s)"
+
+ASSOCIATE_COURSE_WITH_DEGREE = """
+INSERT INTO degree_courses (degree_name, degree_level, course_number, core_course)
+VALUES (%s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    core_course = VALUES(core_course);
+"""
+
+COURSES_BY_DEGREE = """
+SELECT c.course_number, c.name AS course_name, dc.core_course AS is_core_course
+FROM courses c
+JOIN degree_courses dc ON c.course_number = dc.course_number
+WHERE dc.degree_name = %s AND dc.degree_level = %s AND dc.course_number > %s
+ORDER BY dc.course_number
+LIMIT %s;
+"""
+
+# Keyset (term_index, section_number)
+LIST_SECTIONS = """
+SELECT s.section_number, s.number_of_students, s.instructor_id, s.course_number, s.year, s.semester, s.term_index
+FROM sections s
+WHERE s.term_index BETWEEN %s AND %s
+  AND (s.term_index > %s OR (s.term_index = %s AND s.section_number > %s))
+ORDER BY s.term_index, s.section_number
+LIMIT %s
+"""
+
+LIST_LEARNING_OBJECTIVES = """
+SELECT code, title, description FROM learning_objectives
+WHERE code > %s
+ORDER BY code
+LIMIT %s
+"""
+
+# Keyset (term_index, section_number)
+SECTIONS_BY_COURSE = """
+SELECT s.section_number, s.number_of_students, s.instructor_id, s.course_number, s.year, s.semester, s.term_index
+FROM sections s
+WHERE s.course_number = %s AND s.term_index BETWEEN %s AND %s
+  AND (s.term_index > %s OR (s.term_index = %s AND s.section_number > %s))
+ORDER BY s.term_index, s.section_number
+LIMIT %s;
+"""
+
+# Keyset (term_index, section_number)
+SECTIONS_BY_INSTRUCTOR = """
+SELECT s.section_number, s.number_of_students, s.instructor_id, s.course_number, s.year, s.semester, s.term_index
+FROM sections s
+WHERE s.instructor_id = %s AND s.term_index BETWEEN %s AND %s
+  AND (s.term_index > %s OR (s.term_index = %s AND s.section_number > %s))
+ORDER BY s.term_index, s.section_number
+LIMIT %s;
+"""
+
+# Keyset (course_number, section_number); EXISTS keeps one row per section however many
+# degree levels or evaluations match
+INSTRUCTOR_SECTIONS = """
+SELECT s.section_number, s.course_number, s.number_of_students, s.year, s.semester,
+       EXISTS (SELECT 1 FROM course_evaluations e WHERE e.section_ID = s.section_number) AS has_evaluation
+FROM sections s
+WHERE s.instructor_id = %s AND s.year = %s AND s.semester = %s
+  AND EXISTS (SELECT 1 FROM degree_courses dc WHERE dc.course_number = s.course_number AND dc.degree_name = %s)
+  AND (s.course_number > %s OR (s.course_number = %s AND s.section_number > %s))
+ORDER BY s.course_number, s.section_number
+LIMIT %s;
+"""
+
+LIST_DEGREES = """
+SELECT name, level FROM degrees
+WHERE name > %s OR (name = %s AND level > %s)
+ORDER BY name, level
+LIMIT %s
+"""
+
+LIST_INSTRUCTORS = """
+SELECT instructor_id AS id, name FROM instructors
+WHERE instructor_id > %s
+ORDER BY instructor_id
+LIMIT %s
+"""
+
+LIST_SEMESTERS = """
+SELECT year, semester, term_index FROM semesters
+WHERE term_index > %s
+ORDER BY term_index
+LIMIT %s
+"""
+
+# One row per (section, evaluation); keyset (section_number, eval_ID or 0)
+SECTIONS_BY_INSTRUCTOR_DEGREE_SEMESTER = """
+SELECT s.section_number, s.course_number, c.name AS course_name, s.number_of_students, s.year, s.semester, s.instructor_id,
+       e.eval_ID, e.objective_code, e.eval_criteria, e.eval_A_count, e.eval_B_count, e.eval_C_count, e.eval_F_count, e.improvements
+FROM sections s
+JOIN courses c ON s.course_number = c.course_number
+JOIN degree_courses dc ON c.course_number = dc.course_number
+LEFT JOIN course_evaluations e ON s.section_number = e.section_ID
+WHERE s.instructor_id = %s AND dc.degree_name = %s AND dc.degree_level = %s AND s.semester = %s AND s.year = %s
+  AND (s.section_number > %s OR (s.section_number = %s AND COALESCE(e.eval_ID, 0) > %s))
+ORDER BY s.section_number, COALESCE(e.eval_ID, 0)
+LIMIT %s;
+"""
+
+# Keyset (course_number, section_number, eval_ID or 0)
+SECTIONS_WITH_EVALUATIONS = """
+SELECT s.section_number, s.course_number, s.number_of_students, s.year, s.semester,
+       s.instructor_id, e.eval_ID, e.section_ID, e.objective_code, e.eval_criteria, e.eval_A_count, e.eval_B_count,
+       e.eval_C_count, e.eval_F_count, e.improvements
+FROM sections s
+LEFT JOIN course_evaluations e ON s.section_number = e.section_ID
+JOIN degree_courses dc ON s.course_number = dc.course_number
+WHERE s.instructor_id = %s AND dc.degree_name = %s AND dc.degree_level = %s
+      AND s.year = %s AND s.semester = %s
+      AND (s.course_number > %s OR (s.course_number = %s AND (s.section_number > %s
+           OR (s.section_number = %s AND COALESCE(e.eval_ID, 0) > %s))))
+ORDER BY s.course_number, s.section_number, COALESCE(e.eval_ID, 0)
+LIMIT %s;
+"""
+
+UPSERT_EVALUATION = """
+INSERT INTO course_evaluations (
+    section_ID, objective_code, eval_criteria, eval_A_count, eval_B_count, eval_C_count, eval_F_count, improvements)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    objective_code=VALUES(objective_code), eval_criteria=VALUES(eval_criteria), eval_A_count=VALUES(eval_A_count),
+    eval_B_count=VALUES(eval_B_count), eval_C_count=VALUES(eval_C_count), eval_F_count=VALUES(eval_F_count),
+    improvements=VALUES(improvements);
+"""
+
+# Locks the existing rows among a batch of (section, objective) keys before they are upserted.
+# One "(%s, %s)" per key: EVALUATIONS_FOR_UPDATE.format(keys="(%s, %s),(%s, %s)")
+EVALUATIONS_FOR_UPDATE = """
+SELECT section_ID, objective_code, eval_criteria, eval_A_count, eval_B_count, eval_C_count, eval_F_count, improvements
+FROM course_evaluations
+WHERE (section_ID, objective_code) IN ({keys})
+FOR UPDATE
+"""
+
+# A section can hold one evaluation per objective; a NULL objective_code picks the lowest
+GET_EVALUATION = """
+SELECT section_ID, objective_code, eval_criteria, eval_A_count, eval_B_count, eval_C_count, eval_F_count, improvements
+FROM course_evaluations
+WHERE section_ID = %s AND (%s IS NULL OR objective_code = %s)
+ORDER BY objective_code
+LIMIT 1;
+"""
+
+# One row per (section, evaluation) for a page of sections, keyset section_number; the LIMIT counts
+# sections, not rows. Sections without evaluations come back once with NULL evaluation columns.
+# The IN list takes one placeholder per section: EVALUATIONS_BY_SECTIONS.format(section_ids="%s,%s"), sized by
+# statements.bucketed
+EVALUATIONS_BY_SECTIONS = """
+SELECT s.section_number, e.section_ID, e.objective_code, e.eval_criteria, e.eval_A_count, e.eval_B_count,
+       e.eval_C_count, e.eval_F_count, e.improvements
+FROM (SELECT section_number FROM sections
+      WHERE section_number IN ({section_ids}) AND section_number > %s
+      ORDER BY section_number
+      LIMIT %s) s
+LEFT JOIN course_evaluations e ON e.section_ID = s.section_number
+ORDER BY s.section_number, e.objective_code
+"""
+
+# As EVALUATIONS_BY_SECTIONS, for every section of a term: year, semester, section_number to resume after, limit
+EVALUATIONS_BY_TERM = """
+SELECT s.section_number, e.section_ID, e.objective_code, e.eval_criteria, e.eval_A_count, e.eval_B_count,
+       e.eval_C_count, e.eval_F_count, e.improvements
+FROM (SELECT section_number FROM sections
+      WHERE year = %s AND semester = %s AND section_number > %s
+      ORDER BY section_number
+      LIMIT %s) s
+LEFT JOIN course_evaluations e ON e.section_ID = s.section_number
+ORDER BY s.section_number, e.objective_code
+"""
+
+# One row per section, aggregated over all of its objectives; keyset section_number. Parameters:
+# year, semester, section_number to resume after, f_grade_percentage twice, status twice, limit. A NULL f_grade_percentage or status
+# disables that filter; sections without any counts are never dropped by the F-grade filter.
+SECTIONS_EVALUATION_STATUS = """
+SELECT s.section_number, s.course_number, s.number_of_students, s.year, s.semester,
+       s.instructor_id,
+       CASE
+            WHEN COUNT(e.eval_ID) = 0 THEN 'Not Entered'
+            WHEN SUM(e.improvements IS NOT NULL AND e.improvements <> '') = COUNT(e.eval_ID) THEN 'Entered'
+            ELSE 'Partially Entered'
+       END AS evaluation_status,
+       COALESCE(100.0 * SUM(e.eval_A_count + e.eval_B_count + e.eval_C_count)
+                / NULLIF(SUM(e.eval_A_count + e.eval_B_count + e.eval_C_count + e.eval_F_count), 0), 0) AS percent_no_f_grade
+FROM sections s
+LEFT JOIN course_evaluations e ON s.section_number = e.section_ID
+WHERE s.year = %s AND s.semester = %s AND s.section_number > %s
+GROUP BY s.section_number
+HAVING (%s IS NULL OR COALESCE(100 * SUM(e.eval_F_count) <= %s * SUM(e.eval_A_count + e.eval_B_count + e.eval_C_count + e.eval_F_count), TRUE))
+   AND (%s IS NULL OR evaluation_status = %s)
+ORDER BY s.section_number
+LIMIT %s;
+"""
+
+# Locks the existing associations among a batch of (degree, level, course) keys before they are upserted.
+# One "(%s, %s, %s)" per key: DEGREE_COURSES_FOR_UPDATE.format(keys="(%s, %s, %s),(%s, %s, %s)")
+DEGREE_COURSES_FOR_UPDATE = """
+SELECT degree_name, degree_level, course_number
+FROM degree_courses
+WHERE (degree_name, degree_level, course_number) IN ({keys})
+FOR UPDATE
+"""
+
+# evaluation_rollup holds, per (degree, level, objective, term), the summed grade counts of every
+# evaluation of a section whose course belongs to the degree, and how many such evaluations there are.
+
+# Adds count deltas to every degree of each section's course. {deltas} is ROLLUP_DELTA once per
+# (section, objective), joined by UNION ALL.
+ROLLUP_APPLY_DELTAS = """
+INSERT INTO evaluation_rollup (degree_name, degree_level, objective_code, year, semester,
+                               a_count, b_count, c_count, f_count, section_count)
+SELECT dc.degree_name, dc.degree_level, d.objective_code, s.year, s.semester,
+       SUM(d.a_count), SUM(d.b_count), SUM(d.c_count), SUM(d.f_count), SUM(d.section_count)
+FROM ({deltas}) d
+JOIN sections s ON s.section_number = d.section_number
+JOIN degree_courses dc ON dc.course_number = s.course_number
+GROUP BY dc.degree_name, dc.degree_level, d.objective_code, s.year, s.semester
+ON DUPLICATE KEY UPDATE
+    a_count = evaluation_rollup.a_count + VALUES(a_count), b_count = evaluation_rollup.b_count + VALUES(b_count),
+    c_count = evaluation_rollup.c_count + VALUES(c_count), f_count = evaluation_rollup.f_count + VALUES(f_count),
+    section_count = evaluation_rollup.section_count + VALUES(section_count)
+"""
+
+# section_number, objective_code, then the A, B, C, F and section count deltas
+ROLLUP_DELTA = "SELECT %s AS section_number, %s AS objective_code, %s AS a_count, %s AS b_count, %s AS c_count, %s AS f_count, %s AS section_count"
+
+# Folds every evaluation of a course into a degree the course was just added to: degree_name, degree_level, course_number
+ROLLUP_ADD_COURSE = """
+INSERT INTO evaluation_rollup (degree_name, degree_level, objective_code, year, semester,
+                               a_count, b_count, c_count, f_count, section_count)
+SELECT %s, %s, e.objective_code, s.year, s.semester,
+       COALESCE(SUM(e.eval_A_count), 0), COALESCE(SUM(e.eval_B_count), 0), COALESCE(SUM(e.eval_C_count), 0),
+       COALESCE(SUM(e.eval_F_count), 0), COUNT(*)
+FROM sections s
+JOIN course_evaluations e ON e.section_ID = s.section_number
+WHERE s.course_number = %s
+GROUP BY e.objective_code, s.year, s.semester
+ON DUPLICATE KEY UPDATE
+    a_count = evaluation_rollup.a_count + VALUES(a_count), b_count = evaluation_rollup.b_count + VALUES(b_count),
+    c_count = evaluation_rollup.c_count + VALUES(c_count), f_count = evaluation_rollup.f_count + VALUES(f_count),
+    section_count = evaluation_rollup.section_count + VALUES(section_count)
+"""
+
+ROLLUP_CLEAR = "DELETE FROM evaluation_rollup"
+
+ROLLUP_REBUILD = """
+INSERT INTO evaluation_rollup (degree_name, degree_level, objective_code, year, semester,
+                               a_count, b_count, c_count, f_count, section_count)
+SELECT dc.degree_name, dc.degree_level, e.objective_code, s.year, s.semester,
+       COALESCE(SUM(e.eval_A_count), 0), COALESCE(SUM(e.eval_B_count), 0), COALESCE(SUM(e.eval_C_count), 0),
+       COALESCE(SUM(e.eval_F_count), 0), COUNT(*)
+FROM course_evaluations e
+JOIN sections s ON s.section_number = e.section_ID
+JOIN degree_courses dc ON dc.course_number = s.course_number
+GROUP BY dc.degree_name, dc.degree_level, e.objective_code, s.year, s.semester
+"""
+
+# Keyset (term_index, objective_code). Parameters: degree_name, degree_level, first and last term_index,
+# term_index twice and objective_code to resume after, limit
+REPORT_DEGREE_OBJECTIVES = """
+SELECT r.degree_name, r.degree_level, r.objective_code, lo.title AS objective_title, r.year, r.semester, r.term_index,
+       r.section_count, r.a_count, r.b_count, r.c_count, r.f_count,
+       100.0 * (r.a_count + r.b_count + r.c_count) / NULLIF(r.a_count + r.b_count + r.c_count + r.f_count, 0) AS percent_no_f_grade
+FROM evaluation_rollup r
+JOIN learning_objectives lo ON lo.code = r.objective_code
+WHERE r.degree_name = %s AND r.degree_level = %s AND r.term_index BETWEEN %s AND %s
+  AND (r.term_index > %s OR (r.term_index = %s AND r.objective_code > %s))
+ORDER BY r.term_index, r.objective_code
+LIMIT %s
+"""
+
+# Keyset (degree_name, degree_level, objective_code). Parameters: year, semester, degree_name twice,
+# degree_level twice and objective_code to resume after, limit
+REPORT_TERM_OBJECTIVES = """
+SELECT r.degree_name, r.degree_level, r.objective_code, lo.title AS objective_title, r.year, r.semester, r.term_index,
+       r.section_count, r.a_count, r.b_count, r.c_count, r.f_count,
+       100.0 * (r.a_count + r.b_count + r.c_count) / NULLIF(r.a_count + r.b_count + r.c_count + r.f_count, 0) AS percent_no_f_grade
+FROM evaluation_rollup r
+JOIN learning_objectives lo ON lo.code = r.objective_code
+WHERE r.year = %s AND r.semester = %s
+  AND (r.degree_name > %s OR (r.degree_name = %s AND (r.degree_level > %s OR (r.degree_level = %s AND r.objective_code > %s))))
+ORDER BY r.degree_name, r.degree_level, r.objective_code
+LIMIT %s
+"""
+
+# Every section of a term range with its course, instructor and evaluations, optionally only the courses of one
+# degree. Streamed whole by /export; ordered by (term_index, section_number) only, which idx_sections_term already
+# yields, so MySQL can send rows as it reads them instead of sorting first.
+EXPORT_SECTIONS = """
+SELECT s.year, s.semester, s.section_number, s.course_number, c.name AS course_name,
+       s.instructor_id, i.name AS instructor_name, s.number_of_students,
+       e.objective_code, e.eval_criteria, e.eval_A_count, e.eval_B_count, e.eval_C_count, e.eval_F_count, e.improvements
+FROM sections s
+JOIN courses c ON s.course_number = c.course_number
+LEFT JOIN instructors i ON s.instructor_id = i.instructor_id
+LEFT JOIN course_evaluations e ON s.section_number = e.section_ID
+WHERE s.term_index BETWEEN %s AND %s
+  AND (%s IS NULL OR EXISTS (SELECT 1 FROM degree_courses dc
+                             WHERE dc.course_number = s.course_number AND dc.degree_name = %s AND dc.degree_level = %s))
+ORDER BY s.term_index, s.section_number
+"""
+
+# Grade counts of every evaluation in a term range, narrowed by any of course, instructor and objective; analytics.py
+# reads the rows in batches into NumPy columns. A section without an instructor counts as instructor 0.
+ANALYTICS_EVALUATIONS = """
+SELECT s.term_index, s.course_number, COALESCE(s.instructor_id, 0), e.objective_code,
+       COALESCE(e.eval_A_count, 0), COALESCE(e.eval_B_count, 0), COALESCE(e.eval_C_count, 0), COALESCE(e.eval_F_count, 0)
+FROM sections s
+JOIN course_evaluations e ON s.section_number = e.section_ID
+WHERE s.term_index BETWEEN %s AND %s
+  AND (%s IS NULL OR s.course_number = %s)
+  AND (%s IS NULL OR s.instructor_id = %s)
+  AND (%s IS NULL OR e.objective_code = %s)
+"""
+
+# Whole tables behind the in-memory curriculum index (curriculum.py)
+CURRICULUM_COURSES = """
+SELECT course_number, name FROM courses ORDER BY course_number
+"""
+
+CURRICULUM_OBJECTIVES = """
+SELECT code, title FROM learning_objectives ORDER BY code
+"""
+
+# Behind the in-memory search index (see search.py)
+SEARCH_OBJECTIVES = """
+SELECT code, title, description FROM learning_objectives ORDER BY code
+"""
+
+CURRICULUM_DEGREES = """
+SELECT name, level FROM degrees
+"""
+
+CURRICULUM_COURSE_OBJECTIVES = """
+SELECT course_number, objective_code FROM course_learning_objectives
+"""
+
+CURRICULUM_DEGREE_COURSES = """
+SELECT degree_name, degree_level, course_number, core_course FROM degree_courses
+"""
+
+# Shared per-table versions behind the ETags (see versions.py); {tables} is one (%s, 1) per table
+BUMP_TABLE_VERSIONS = """
+INSERT INTO table_versions (table_name, version) VALUES {tables}
+ON DUPLICATE KEY UPDATE version = version + 1
+"""
+
+TABLE_VERSIONS_OF = """
+SELECT table_name, version FROM table_versions WHERE table_name IN ({tables})
+"""
+
+TABLE_VERSIONS = """
+SELECT table_name, version FROM table_versions
+"""
@@ -0,0 +1,52 @@
+"""Program-level accreditation reports.
+
+Both reports read ``evaluation_rollup`` (see rollup.py), so their cost follows
+the size of the report rather than the number of evaluations behind it.
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+import queries
+import rollup
+from database import get_db, DB_ERRORS
+from models import ObjectiveOutcome
+from pagination import Page, paginate, MIN_INT, MIN_STR
+from terms import term_range
+from versions import conditional, record, table_changed
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+@router.get("/degree-objectives/", response_model=List[ObjectiveOutcome],
+            dependencies=[Depends(conditional("evaluation_rollup", "learning_objectives"))],
+            summary="Grade outcomes per learning objective and term for one degree")
+async def degree_objectives(response: Response, degree_name: str = Query(..., description="The name of the degree"),
+                            degree_level: str = Query(..., description="The level of the degree (e.g., Bachelor, Master)"),
+                            terms=Depends(term_range), page: Page = Depends(), db=Depends(get_db)):
+    term, objective = page.keyset(MIN_INT, MIN_INT)
+    return await paginate(db, queries.REPORT_DEGREE_OBJECTIVES, (degree_name, degree_level, *terms, term, term, objective), page, response,
+                          key=lambda row: (row['term_index'], row['objective_code']), model=ObjectiveOutcome)
+
+@router.get("/term-objectives/", response_model=List[ObjectiveOutcome],
+            dependencies=[Depends(conditional("evaluation_rollup", "learning_objectives"))],
+            summary="Grade outcomes per degree and learning objective for one term")
+async def term_objectives(response: Response, year: int, semester: str, page: Page = Depends(), db=Depends(get_db)):
+    name, level, objective = page.keyset(MIN_STR, MIN_STR, MIN_INT)
+    return await paginate(db, queries.REPORT_TERM_OBJECTIVES, (year, semester, name, name, level, level, objective), page, response,
+                          key=lambda row: (row['degree_name'], row['degree_level'], row['objective_code']), model=ObjectiveOutcome)
+
+def _rebuild(conn):
+    try:
+        with conn.cursor() as cursor:
+            rollup.rebuild(cursor)
+            versions = record(cursor, ["evaluation_rollup"])
+            conn.commit()
+            return versions
+    except DB_ERRORS as error:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=str(error))
+
+@router.post("/rebuild-rollup/", summary="Recompute the report rollup from the base tables")
+async def rebuild_rollup(db=Depends(get_db)):
+    table_changed(await db.run(_rebuild))
+    return {"status": "Rollup rebuilt"}
@@ -0,0 +1,72 @@
+"""Incremental maintenance of ``evaluation_rollup``.
+
+The program-level reports read ``evaluation_rollup`` instead of summing every
+evaluation. Each write path that can change a report upserts through the helpers
+here. The helpers fold the difference into the rollup in the same transaction as
+the write:
+
+* evaluation upserts add the change in each row's grade counts, and one section
+  for a new row, to every degree of the section's course;
+* a new degree/course association adds all of the course's evaluations to the degree.
+
+``rebuild`` recomputes the whole table from scratch (``python migrate.py --rebuild-rollup``).
+"""
+import queries
+
+# Rows are (section_ID, objective_code, eval_criteria, A, B, C, F, improvements); the counts sit here
+COUNTS = slice(3, 7)
+# Deltas per ROLLUP_APPLY_DELTAS statement
+DELTA_BATCH_SIZE = 500
+
+def upsert_evaluations(cursor, rows):
+    """Upsert evaluation ``rows`` inside the caller's transaction and fold the changes into the rollup.
+
+    Returns 'inserted', 'updated' or 'unchanged' for each row. Keys must be unique within ``rows``.
+    """
+    keys = [row[:2] for row in rows]
+    cursor.execute(queries.EVALUATIONS_FOR_UPDATE.format(keys=','.join(['(%s, %s)'] * len(keys))),
+                   [value for key in keys for value in key])
+    existing = {tuple(row[:2]): tuple(row) for row in cursor.fetchall()}
+    cursor.executemany(queries.UPSERT_EVALUATION, rows)
+
+    statuses, deltas = [], []
+    for key, row in zip(keys, rows):
+        old = existing.get(key)
+        if old is None:
+            statuses.append('inserted')
+            deltas.append((*key, *(count or 0 for count in row[COUNTS]), 1))
+        elif old == row:
+            statuses.append('unchanged')
+        else:
+            statuses.append('updated')
+            change = tuple((new or 0) - (was or 0) for new, was in zip(row[COUNTS], old[COUNTS]))
+            if any(change):
+                deltas.append((*key, *change, 0))
+    apply_deltas(cursor, deltas)
+    return statuses
+
+def apply_deltas(cursor, deltas):
+    """Add ``(section, objective, dA, dB, dC, dF, dSections)`` deltas to every degree of each section's course."""
+    for start in range(0, len(deltas), DELTA_BATCH_SIZE):
+        batch = deltas[start:start + DELTA_BATCH_SIZE]
+        cursor.execute(queries.ROLLUP_APPLY_DELTAS.format(deltas=' UNION ALL '.join([queries.ROLLUP_DELTA] * len(batch))),
+                       [value for delta in batch for value in delta])
+
+def associate_courses_with_degrees(cursor, rows):
+    """Upsert ``(degree_name, degree_level, course_number, core_course)`` rows and add new courses' evaluations to their degrees."""
+    keys = [tuple(row[:3]) for row in rows]
+    cursor.execute(queries.DEGREE_COURSES_FOR_UPDATE.format(keys=','.join(['(%s, %s, %s)'] * len(keys))),
+                   [value for key in keys for value in key])
+    existing = {tuple(row) for row in cursor.fetchall()}
+    cursor.executemany(queries.ASSOCIATE_COURSE_WITH_DEGREE, rows)
+    added = list(dict.fromkeys(key for key in keys if key not in existing))
+    if added:
+        # One execute per new association: mysql.connector's executemany rewrites an INSERT into one
+        # multi-row VALUES statement and rejects this INSERT ... SELECT
+        for key in added:
+            cursor.execute(queries.ROLLUP_ADD_COURSE, key)
+
+def rebuild(cursor):
+    """Recompute ``evaluation_rollup`` from the base tables, inside the caller's transaction."""
+    cursor.execute(queries.ROLLUP_CLEAR)
+    cursor.execute(queries.ROLLUP_REBUILD)
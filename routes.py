@@ -1,482 +1,278 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from models import (Degree, Course, Instructor, Section, LearningObjective, 
-                    CourseObjectiveAssociation, CourseSectionAssociation, EvaluationData, 
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from models import (Degree, Course, Instructor, Section, LearningObjective,
+                    CourseObjectiveAssociation, CourseSectionAssociation, EvaluationData,
                     SectionDetails, DegreeOption, InstructorOption, Semester, CourseResponse,
-                    SectionEvaluation, SectionEvaluationDetail, AssociateCourseWithDegree, SectionEvaluationStatus)
-from database import get_db_connection, add_entity
-from typing import List, Optional
+                    SectionEvaluation, SectionEvaluationDetail, AssociateCourseWithDegree, SectionEvaluationStatus,
+                    SectionEvaluations, EvaluationUpsertReport)
+from database import get_db, DB_ERRORS
+from cache import reference_cache
+from curriculum import curriculum_index
+from search import search_index
+from versions import conditional
+from unit_of_work import UnitOfWork
+from statements import bucketed
+from pagination import Page, paginate, paginate_groups, paginate_items, MIN_INT, MIN_STR, MAX_LIMIT
+from terms import term_range
+from typing import List, Literal, Optional
+from operator import itemgetter
+import queries
+import rollup
 
 router = APIRouter()
 
+EVALUATION_COLUMNS = ("section_ID", "objective_code", "eval_criteria", "eval_A_count", "eval_B_count",
+                      "eval_C_count", "eval_F_count", "improvements")
+_evaluation_fields = itemgetter(*EVALUATION_COLUMNS)
+# Written by an evaluation upsert, unless every row came back unchanged
+EVALUATION_TABLES = ("course_evaluations", "evaluation_rollup")
+
+def _any_changed(statuses):
+    return any(status != 'unchanged' for status in statuses)
+
+def _term_section_key(row):
+    return row['term_index'], row['section_number']
+
 @router.post("/add-degree/", status_code=201, summary="Add a new degree", response_description="Degree added successfully")
-async def add_degree(degree: Degree):
-    return await add_entity(degree, "degrees", ("name", "level"))
+async def add_degree(degree: Degree, db=Depends(get_db)):
+    response = await add_entity(db, degree, "degrees", ("name", "level"))
+    curriculum_index.add_degree(degree.name, degree.level)
+    return response
 
 @router.post("/add-course/", status_code=201, summary="Add a new course", response_description="Course added successfully")
-async def add_course(course: Course):
+async def add_course(course: Course, db=Depends(get_db)):
     # Validate course_code range
     if not (1000 <= course.course_code <= 9999):
         raise HTTPException(status_code=400, detail="Course code must be between 1000 and 9999.")
 
     # Use add_entity to insert the course into the database
     try:
-        response = await add_entity(course, "courses", ("name", "department_code", "course_code"))
+        response = await add_entity(db, course, "courses", ("name", "department_code", "course_code"))
+        curriculum_index.add_course(f"{course.department_code}{course.course_code:04d}", course.name)
+        search_index.add_course(f"{course.department_code}{course.course_code:04d}", course.name)
         return response
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/add-instructor/", status_code=201, summary="Add a new instructor", response_description="Instructor added successfully")
-async def add_instructor(instructor: Instructor):
-    return await add_entity(instructor, "instructors", ("instructor_id", "name"))
+async def add_instructor(instructor: Instructor, db=Depends(get_db)):
+    return await add_entity(db, instructor, "instructors", ("instructor_id", "name"))
 
 @router.post("/add-section/", status_code=201, summary="Add a new section", response_description="Section added successfully")
-async def add_section(section: Section):
-    conn = get_db_connection()
-    if conn is None:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-    
-    try:
-        # Check if the semester exists
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT * FROM semesters WHERE year = %s AND semester = %s", (section.year, section.semester))
-            result = cursor.fetchone()
-            if not result:
-                # Add the semester if it does not exist
-                await add_entity(Semester(year=section.year, semester=section.semester), "semesters", ("year", "semester"))
-        
-        # Now add the section
-        return await add_entity(section, "sections", ("section_number", "number_of_students", "instructor_id", "course_number", "year", "semester"))
-    finally:
-        if conn.is_connected():
-            conn.close()
+async def add_section(section: Section, db=Depends(get_db)):
+    # Add the semester unless it exists, in the same transaction as the section
+    await (UnitOfWork()
+           .execute(queries.INSERT_SEMESTER_IGNORE, (section.year, section.semester), "semesters")
+           .insert("sections", ("section_number", "number_of_students", "instructor_id", "course_number", "year", "semester"), section)
+           .commit(db))
+    return {"status": "section added"}
 
 @router.post("/add-learning-objective/", status_code=201, summary="Add a new learning objective", response_description="Learning objective added successfully")
-async def add_learning_objective(learning_objective: LearningObjective):
-    return await add_entity(learning_objective, "learning_objectives", ("code", "title", "description"))
+async def add_learning_objective(learning_objective: LearningObjective, db=Depends(get_db)):
+    response = await add_entity(db, learning_objective, "learning_objectives", ("code", "title", "description"))
+    curriculum_index.add_objective(learning_objective.code, learning_objective.title)
+    search_index.add_objective(learning_objective.code, learning_objective.title, learning_objective.description)
+    return response
 
 @router.post("/associate-course-section/", status_code=201, summary="Associate a course with a section for a specific semester", response_description="Association created successfully")
-async def associate_course_section(association: CourseSectionAssociation):
-    return await add_entity(association, "sections_courses", ("course_number", "section_number", "semester_year"))
+async def associate_course_section(association: CourseSectionAssociation, db=Depends(get_db)):
+    return await add_entity(db, association, "sections_courses", ("course_number", "section_number", "semester_year"))
 
-async def add_entity(entity, table, columns):
-    conn = get_db_connection()
-    if conn is None:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-
-    try:
-        with conn.cursor() as cursor:
-            column_names = ", ".join(columns)
-            placeholders = ", ".join(["%s"] * len(columns))
-            values = tuple(getattr(entity, col) for col in columns)
-            query = f"INSERT INTO {table} ({column_names}) VALUES ({placeholders})"
-            cursor.execute(query, values)
-            conn.commit()
-            return {"status": f"{table[:-1]} added"}  # Removes 's' from table name for the status message
-    except mysql.connector.Error as error:
-        conn.rollback()
-        raise HTTPException(status_code=400, detail=str(error))
-    finally:
-        conn.close()
+async def add_entity(db, entity, table, columns):
+    await UnitOfWork().insert(table, columns, entity).commit(db)
+    return {"status": f"{table[:-1]} added"}  # Removes 's' from table name for the status message
 
 @router.post("/associate-course-with-degree/", status_code=201, summary="Associate a course with a degree", response_description="Course associated with degree successfully")
-async def associate_course_with_degree(association: AssociateCourseWithDegree):
+async def associate_course_with_degree(association: AssociateCourseWithDegree, db=Depends(get_db)):
     """Associates a course with a degree in the database."""
-    # Connect to the database
-    conn = get_db_connection()
-    if conn is None:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-
-    try:
-        with conn.cursor() as cursor:
-            # Prepare the SQL query to insert the new association
-            query = """
-            INSERT INTO degree_courses (degree_name, degree_level, course_number, core_course)
-            VALUES (%s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                core_course = VALUES(core_course);
-            """
-            values = (association.degree_name, association.degree_level, association.course_number, association.core_course)
-
-            # Execute the query
-            cursor.execute(query, values)
-            conn.commit()
-            return {"message": "Course associated with degree successfully."}
-
-    except mysql.connector.Error as error:
-        conn.rollback()
-        raise HTTPException(status_code=400, detail=str(error))
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@router.get("/courses-by-degree/", response_model=List[CourseResponse], status_code=200, summary="Get courses by degree", response_description="List of courses for a specific degree")
-async def get_courses_by_degree(degree_name: str = Query(..., description="The name of the degree"), degree_level: str = Query(..., description="The level of the degree (e.g., Bachelor, Master)")):
+    values = (association.degree_name, association.degree_level, association.course_number, association.core_course)
+    await (UnitOfWork()
+           .call(rollup.associate_courses_with_degrees, [values], tables=("degree_courses", "evaluation_rollup"))
+           .commit(db))
+    curriculum_index.link_degree_course(*values)
+    return {"message": "Course associated with degree successfully."}
+
+@router.get("/courses-by-degree/", response_model=List[CourseResponse], status_code=200, dependencies=[Depends(conditional("courses", "degree_courses"))], summary="Get courses by degree", response_description="List of courses for a specific degree")
+async def get_courses_by_degree(response: Response, degree_name: str = Query(..., description="The name of the degree"), degree_level: str = Query(..., description="The level of the degree (e.g., Bachelor, Master)"), page: Page = Depends(), db=Depends(get_db)):
     """Fetches courses associated with a specific degree from the database."""
-    conn = get_db_connection()
-    if conn is None:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-
     try:
-        with conn.cursor(dictionary=True) as cursor:
-            # Query to fetch courses associated with a specific degree
-            query = """
-            SELECT c.course_number, c.name AS course_name, dc.core_course AS is_core_course
-            FROM courses c
-            JOIN degree_courses dc ON c.course_number = dc.course_number
-            WHERE dc.degree_name = %s AND dc.degree_level = %s;
-            """
-            cursor.execute(query, (degree_name, degree_level))
-            courses = cursor.fetchall()
-            if not courses:
-                raise HTTPException(status_code=404, detail="No courses found for the specified degree")
-            return [CourseResponse(**course) for course in courses]
-
-    except mysql.connector.Error as error:
+        courses = await paginate(db, queries.COURSES_BY_DEGREE, (degree_name, degree_level, *page.keyset(MIN_STR)), page, response,
+                                 key=lambda row: (row['course_number'],), model=CourseResponse)
+    except DB_ERRORS as error:
         raise HTTPException(status_code=400, detail=f"Database query error: {str(error)}")
-    finally:
-        if conn and conn.is_connected():
-            conn.close()
-
-@router.get("/list-sections/", response_model=List[Section])
-async def list_sections(
-    start_year: int = Query(..., description="Start year of the query range"),
-    start_semester: str = Query(..., description="Start semester of the query range"),
-    end_year: int = Query(..., description="End year of the query range"),
-    end_semester: str = Query(..., description="End semester of the query range")):
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT s.section_number, s.number_of_students, s.instructor_id, s.course_number, sem.year, sem.semester
-            FROM sections s
-            JOIN semesters sem ON s.year = sem.year AND s.semester = sem.semester
-            JOIN semester_sort_order so ON sem.semester = so.semester
-            WHERE (sem.year > %s OR (sem.year = %s AND so.sort_order >= (SELECT sort_order FROM semester_sort_order WHERE semester = %s)))
-              AND (sem.year < %s OR (sem.year = %s AND so.sort_order <= (SELECT sort_order FROM semester_sort_order WHERE semester = %s)))
-            ORDER BY sem.year, so.sort_order
-        """, (start_year, start_year, start_semester, end_year, end_year, end_semester))
-        sections = cursor.fetchall()
-        return [Section(**section) for section in sections]
-    except mysql.connector.Error as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
-
-@router.get("/learning-objectives/", response_model=List[LearningObjective])
-async def list_learning_objectives():
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT code, title, description FROM learning_objectives")
-        objectives = cursor.fetchall()
-        return [LearningObjective(**obj) for obj in objectives]
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@router.get("/courses-by-objective/", response_model=List[CourseResponse])
-async def get_courses_by_objective(objective_codes: List[int] = Query(..., description="List of objective codes")):
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-    
-    try:
-        with conn.cursor(dictionary=True) as cursor:
-            format_strings = ','.join(['%s'] * len(objective_codes))
-            query = """
-            SELECT c.course_number, c.name AS course_name, COALESCE(dc.core_course, False) AS is_core_course
-            FROM courses c
-            LEFT JOIN degree_courses dc ON c.course_number = dc.course_number
-            JOIN course_learning_objectives clo ON c.course_number = clo.course_number
-            WHERE clo.objective_code IN (%s)
-            """
-            cursor.execute(query % format_strings, tuple(objective_codes))
-            courses = cursor.fetchall()
-            if not courses:
-                raise HTTPException(status_code=404, detail="No courses found for the specified objectives")
-            return [CourseResponse(**course) for course in courses]
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@router.get("/sections-by-course/", response_model=List[Section])
-async def get_sections_by_course(course_number: str, start_year: int, start_semester: str, end_year: int, end_semester: str):
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
+    if page.first and not courses:
+        raise HTTPException(status_code=404, detail="No courses found for the specified degree")
+    return courses
 
+@router.get("/list-sections/", response_model=List[Section], dependencies=[Depends(conditional("sections"))])
+async def list_sections(response: Response, terms=Depends(term_range), page: Page = Depends(), db=Depends(get_db)):
+    term, section = page.keyset(MIN_INT, MIN_INT)
     try:
-        with conn.cursor(dictionary=True) as cursor:
-            query = """
-            SELECT s.section_number, s.number_of_students, s.instructor_id, s.course_number, s.year, s.semester
-            FROM sections s
-            WHERE s.course_number = %s AND
-            ((s.year > %s) OR (s.year = %s AND s.semester >= %s)) AND
-            ((s.year < %s) OR (s.year = %s AND s.semester <= %s))
-            ORDER BY s.year, s.semester;
-            """
-            cursor.execute(query, (course_number, start_year, start_year, start_semester, end_year, end_year, end_semester))
-            sections = cursor.fetchall()
-            return sections
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@router.get("/sections-by-instructor/", response_model=List[Section])
-async def get_sections_by_instructor(instructor_id: int, start_year: int, start_semester: str, end_year: int, end_semester: str):
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
+        return await paginate(db, queries.LIST_SECTIONS, (*terms, term, term, section), page, response,
+                              key=_term_section_key, model=Section)
+    except DB_ERRORS as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-    try:
-        with conn.cursor(dictionary=True) as cursor:
-            query = """
-            SELECT s.section_number, s.number_of_students, s.instructor_id, s.course_number, s.year, s.semester
-            FROM sections s
-            JOIN semesters sem ON s.year = sem.year AND s.semester = sem.semester
-            WHERE s.instructor_id = %s AND
-            ((s.year > %s) OR (s.year = %s AND s.semester >= %s)) AND
-            ((s.year < %s) OR (s.year = %s AND s.semester <= %s))
-            ORDER BY s.year, s.semester;
-            """
-            cursor.execute(query, (instructor_id, start_year, start_year, start_semester, end_year, end_year, end_semester))
-            sections = cursor.fetchall()
-            return sections
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@router.get("/instructor-sections/", response_model=List[SectionEvaluation])
-async def get_instructor_sections(instructor_id: int, degree_name: str, year: int, semester: str):
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-    
-    try:
-        cursor = conn.cursor(dictionary=True)
-        query = """
-        SELECT s.section_number, s.course_number, s.number_of_students, s.year, s.semester,
-               e.eval_ID is not null as has_evaluation
-        FROM sections s
-        JOIN degree_courses dc ON s.course_number = dc.course_number
-        LEFT JOIN course_evaluations e ON s.section_number = e.section_ID
-        WHERE s.instructor_id = %s AND dc.degree_name = %s AND s.year = %s AND s.semester = %s
-        ORDER BY s.course_number;
-        """
-        cursor.execute(query, (instructor_id, degree_name, year, semester))
-        sections = cursor.fetchall()
-        return sections
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@router.get("/degrees/", response_model=List[DegreeOption])
-async def list_degrees():
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT DISTINCT name, level FROM degrees")
-        degree_rows = cursor.fetchall()
-        return [DegreeOption(name=row['name'], level=row['level']) for row in degree_rows]
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@router.get("/instructors/", response_model=List[InstructorOption])
-async def list_instructors():
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT DISTINCT instructor_id, name FROM instructors")
-        instructor_rows = cursor.fetchall()
-        return [InstructorOption(id=row['instructor_id'], name=row['name']) for row in instructor_rows]
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@router.get("/semesters/", response_model=List[Semester])
-async def list_semesters():
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT DISTINCT CONCAT(year, ' ', semester) AS semester_year FROM semesters ORDER BY year, semester")
-        semester_rows = cursor.fetchall()
-        return [SemesterOption(semester_year=row['semester_year']) for row in semester_rows]
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-
-@router.get("/sections-by-instructor-degree-semester/", response_model=List[SectionEvaluationDetail])
-async def get_sections_by_instructor_degree_semester(instructor_id: int, degree_name: str, degree_level: str, semester: str, year: int):
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-    
-    try:
-        cursor = conn.cursor(dictionary=True)
-        query = """
-            SELECT s.section_number, s.course_number, c.name AS course_name, s.number_of_students, s.year, s.semester, s.instructor_id,
-                   e.eval_ID, e.objective_code, e.eval_criteria, e.eval_A_count, e.eval_B_count, e.eval_C_count, e.eval_F_count, e.improvements
-            FROM sections s
-            JOIN courses c ON s.course_number = c.course_number
-            JOIN degree_courses dc ON c.course_number = dc.course_number
-            LEFT JOIN course_evaluations e ON s.section_number = e.section_ID
-            WHERE s.instructor_id = %s AND dc.degree_name = %s AND dc.degree_level = %s AND s.semester = %s AND s.year = %s
-            ORDER BY s.section_number;
-        """
-        cursor.execute(query, (instructor_id, degree_name, degree_level, semester, year))
-        sections = cursor.fetchall()
-        return [SectionEvaluationDetail(**section) for section in sections]
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@router.get("/sections-with-evaluations/", response_model=List[SectionEvaluation])
-async def get_sections_with_evaluations(instructor_id: int, degree_name: str, degree_level: str, year: int, semester: str):
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-    
-    try:
-        with conn.cursor(dictionary=True) as cursor:
-            query = """
-            SELECT s.section_number, s.course_number, s.number_of_students, s.year, s.semester,
-                   s.instructor_id, e.eval_ID, e.eval_criteria, e.eval_A_count, e.eval_B_count, 
-                   e.eval_C_count, e.eval_F_count, e.improvements
-            FROM sections s
-            LEFT JOIN course_evaluations e ON s.section_number = e.section_ID
-            JOIN degree_courses dc ON s.course_number = dc.course_number
-            WHERE s.instructor_id = %s AND dc.degree_name = %s AND dc.degree_level = %s 
-                  AND s.year = %s AND s.semester = %s
-            ORDER BY s.course_number;
-            """
-            cursor.execute(query, (instructor_id, degree_name, degree_level, year, semester))
-            sections = []
-            for row in cursor.fetchall():
-                evaluation = {
-                    'objective_code': row['eval_ID'],
-                    'eval_criteria': row['eval_criteria'],
-                    'eval_A_count': row['eval_A_count'],
-                    'eval_B_count': row['eval_B_count'],
-                    'eval_C_count': row['eval_C_count'],
-                    'eval_F_count': row['eval_F_count'],
-                    'improvements': row['improvements']
-                } if row['eval_ID'] else None
-                sections.append({
-                    'section_number': row['section_number'],
-                    'course_number': row['course_number'],
-                    'number_of_students': row['number_of_students'],
-                    'year': row['year'],
-                    'semester': row['semester'],
-                    'instructor_id': row['instructor_id'],
-                    'evaluation': evaluation
-                })
-            return sections
-    finally:
-        if conn.is_connected():
-            conn.close()
+@router.get("/learning-objectives/", response_model=List[LearningObjective], dependencies=[Depends(conditional("learning_objectives"))])
+async def list_learning_objectives(response: Response, page: Page = Depends(), db=Depends(get_db)):
+    return await paginate(reference_cache.reader(db, "learning_objectives"), queries.LIST_LEARNING_OBJECTIVES, page.keyset(MIN_INT), page, response,
+                          key=lambda row: (row['code'],), model=LearningObjective)
+
+@router.get("/courses-by-objective/", response_model=List[CourseResponse], dependencies=[Depends(conditional("courses", "course_learning_objectives", "degree_courses"))])
+async def get_courses_by_objective(response: Response, objective_codes: List[int] = Query(..., description="List of objective codes"),
+                                   match: Literal['any', 'all'] = Query('any', description="Courses covering any of the objectives, or all of them"),
+                                   page: Page = Depends(), db=Depends(get_db)):
+    # Answered from the in-memory curriculum index (see curriculum.py); one row per course
+    await curriculum_index.ensure_loaded(db)
+    courses = paginate_items(curriculum_index.courses_covering(objective_codes, match), page.keyset(MIN_STR), page, response,
+                             key=lambda row: (row['course_number'],), model=CourseResponse)
+    if page.first and not courses:
+        raise HTTPException(status_code=404, detail="No courses found for the specified objectives")
+    return courses
+
+@router.get("/sections-by-course/", response_model=List[Section], dependencies=[Depends(conditional("sections"))])
+async def get_sections_by_course(response: Response, course_number: str, terms=Depends(term_range), page: Page = Depends(), db=Depends(get_db)):
+    term, section = page.keyset(MIN_INT, MIN_INT)
+    return await paginate(db, queries.SECTIONS_BY_COURSE, (course_number, *terms, term, term, section), page, response,
+                          key=_term_section_key, model=Section)
+
+@router.get("/sections-by-instructor/", response_model=List[Section], dependencies=[Depends(conditional("sections"))])
+async def get_sections_by_instructor(response: Response, instructor_id: int, terms=Depends(term_range), page: Page = Depends(), db=Depends(get_db)):
+    term, section = page.keyset(MIN_INT, MIN_INT)
+    return await paginate(db, queries.SECTIONS_BY_INSTRUCTOR, (instructor_id, *terms, term, term, section), page, response,
+                          key=_term_section_key, model=Section)
+
+@router.get("/instructor-sections/", response_model=List[SectionEvaluation], dependencies=[Depends(conditional("sections", "degree_courses", "course_evaluations"))])
+async def get_instructor_sections(response: Response, instructor_id: int, degree_name: str, year: int, semester: str, page: Page = Depends(), db=Depends(get_db)):
+    course, section = page.keyset(MIN_STR, MIN_INT)
+    return await paginate(db, queries.INSTRUCTOR_SECTIONS, (instructor_id, year, semester, degree_name, course, course, section), page, response,
+                          key=lambda row: (row['course_number'], row['section_number']), model=SectionEvaluation)
+
+@router.get("/degrees/", response_model=List[DegreeOption], dependencies=[Depends(conditional("degrees"))])
+async def list_degrees(response: Response, page: Page = Depends(), db=Depends(get_db)):
+    name, level = page.keyset(MIN_STR, MIN_STR)
+    return await paginate(reference_cache.reader(db, "degrees"), queries.LIST_DEGREES, (name, name, level), page, response,
+                          key=lambda row: (row['name'], row['level']), model=DegreeOption)
+
+@router.get("/instructors/", response_model=List[InstructorOption], dependencies=[Depends(conditional("instructors"))])
+async def list_instructors(response: Response, page: Page = Depends(), db=Depends(get_db)):
+    return await paginate(reference_cache.reader(db, "instructors"), queries.LIST_INSTRUCTORS, page.keyset(MIN_INT), page, response,
+                          key=lambda row: (row['id'],), model=InstructorOption)
+
+@router.get("/semesters/", response_model=List[Semester], dependencies=[Depends(conditional("semesters"))])
+async def list_semesters(response: Response, page: Page = Depends(), db=Depends(get_db)):
+    return await paginate(reference_cache.reader(db, "semesters"), queries.LIST_SEMESTERS, page.keyset(MIN_INT), page, response,
+                          key=lambda row: (row['term_index'],), model=Semester)
+
+@router.get("/cache-stats/", summary="Reference data cache counters")
+async def cache_stats():
+    return reference_cache.stats()
+
+
+def _section_evaluation_key(row):
+    return row['section_number'], row['eval_ID'] or 0
+
+@router.get("/sections-by-instructor-degree-semester/", response_model=List[SectionEvaluationDetail], dependencies=[Depends(conditional("sections", "courses", "degree_courses", "course_evaluations"))])
+async def get_sections_by_instructor_degree_semester(response: Response, instructor_id: int, degree_name: str, degree_level: str, semester: str, year: int, page: Page = Depends(), db=Depends(get_db)):
+    section, evaluation = page.keyset(MIN_INT, -1)
+    return await paginate(db, queries.SECTIONS_BY_INSTRUCTOR_DEGREE_SEMESTER,
+                          (instructor_id, degree_name, degree_level, semester, year, section, section, evaluation), page, response,
+                          key=_section_evaluation_key, model=SectionEvaluationDetail)
+
+_section_fields = itemgetter('section_number', 'course_number', 'number_of_students', 'year', 'semester', 'instructor_id')
+def _nest_evaluation(row):
+    section = dict(zip(('section_number', 'course_number', 'number_of_students', 'year', 'semester', 'instructor_id'),
+                       _section_fields(row)))
+    section['evaluation'] = dict(zip(EVALUATION_COLUMNS, _evaluation_fields(row))) if row['eval_ID'] else None
+    return section
+
+@router.get("/sections-with-evaluations/", response_model=List[SectionEvaluation], dependencies=[Depends(conditional("sections", "degree_courses", "course_evaluations"))])
+async def get_sections_with_evaluations(response: Response, instructor_id: int, degree_name: str, degree_level: str, year: int, semester: str, page: Page = Depends(), db=Depends(get_db)):
+    course, section, evaluation = page.keyset(MIN_STR, MIN_INT, -1)
+    return await paginate(db, queries.SECTIONS_WITH_EVALUATIONS,
+                          (instructor_id, degree_name, degree_level, year, semester, course, course, section, section, evaluation), page, response,
+                          key=lambda row: (row['course_number'], *_section_evaluation_key(row)), model=SectionEvaluation, shape=_nest_evaluation)
 
 @router.post("/associate-course-objective/", status_code=201, summary="Associate a course with a learning objective", response_description="Association created successfully")
-async def associate_course_objective(association: CourseObjectiveAssociation):
-    return await add_entity(association, "course_learning_objectives", ("course_number", "objective_code"))
+async def associate_course_objective(association: CourseObjectiveAssociation, db=Depends(get_db)):
+    response = await add_entity(db, association, "course_learning_objectives", ("course_number", "objective_code"))
+    curriculum_index.link_course_objective(association.course_number, association.objective_code)
+    return response
 
 @router.post("/update-evaluation/", response_model=dict)
-async def update_evaluation(eval_data: EvaluationData):
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-    
-    try:
-        with conn.cursor() as cursor:
-            # Update or insert evaluation
-            cursor.execute("""
-            INSERT INTO course_evaluations (
-                section_ID, objective_code, eval_criteria, eval_A_count, eval_B_count, eval_C_count, eval_F_count, improvements)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                objective_code=VALUES(objective_code), eval_criteria=VALUES(eval_criteria), eval_A_count=VALUES(eval_A_count), 
-                eval_B_count=VALUES(eval_B_count), eval_C_count=VALUES(eval_C_count), eval_F_count=VALUES(eval_F_count), 
-                improvements=VALUES(improvements);
-            """, (eval_data.section_ID, eval_data.objective_code, eval_data.eval_criteria, eval_data.eval_A_count, eval_data.eval_B_count, 
-                  eval_data.eval_C_count, eval_data.eval_F_count, eval_data.improvements))
-            conn.commit()
-            return {"status": "Evaluation updated successfully"}
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@router.get("/get-evaluation/{section_id}", response_model=EvaluationData)
-async def get_evaluation(section_id: int):
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-    
-    try:
-        cursor = conn.cursor(dictionary=True)
-        query = """
-        SELECT section_ID, objective_code, eval_criteria, eval_A_count, eval_B_count, eval_C_count, eval_F_count, improvements
-        FROM course_evaluations
-        WHERE section_ID = %s;
-        """
-        cursor.execute(query, (section_id,))
-        evaluation = cursor.fetchone()
-        if evaluation:
-            return evaluation
-        else:
-            raise HTTPException(status_code=404, detail="Evaluation not found")
-    finally:
-        conn.close()
-
-
-@router.get("/sections-evaluation-status/", response_model=List[SectionEvaluationStatus])
-async def get_sections_evaluation_status(year: int, semester: str, f_grade_percentage: Optional[float] = None):
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-    
-    try:
-        with conn.cursor(dictionary=True) as cursor:
-            query = """
-            SELECT s.section_number, s.course_number, s.number_of_students, s.year, s.semester,
-                   s.instructor_id, 
-                   CASE
-                        WHEN e.eval_ID IS NOT NULL AND (e.improvements IS NOT NULL AND e.improvements <> '') THEN 'Entered'
-                        WHEN e.eval_ID IS NOT NULL THEN 'Partially Entered'
-                        ELSE 'Not Entered'
-                   END AS evaluation_status,
-                   COALESCE(e.eval_A_count, 0) AS eval_A_count,
-                   COALESCE(e.eval_B_count, 0) AS eval_B_count,
-                   COALESCE(e.eval_C_count, 0) AS eval_C_count,
-                   COALESCE(e.eval_F_count, 0) AS eval_F_count
-            FROM sections s
-            LEFT JOIN course_evaluations e ON s.section_number = e.section_ID
-            WHERE s.year = %s AND s.semester = %s
-            ORDER BY s.section_number;
-            """
-            cursor.execute(query, (year, semester))
-            sections = []
-            for row in cursor.fetchall():
-                total_students = row['eval_A_count'] + row['eval_B_count'] + row['eval_C_count'] + row['eval_F_count']
-                if f_grade_percentage is not None and total_students > 0:
-                    if (row['eval_F_count'] / total_students) * 100 > f_grade_percentage:
-                        continue
-                sections.append({
-                    'section_number': row['section_number'],
-                    'course_number': row['course_number'],
-                    'number_of_students': row['number_of_students'],
-                    'year': row['year'],
-                    'semester': row['semester'],
-                    'instructor_id': row['instructor_id'],
-                    'evaluation_status': row['evaluation_status'],
-                    'percent_no_f_grade': ((total_students - row['eval_F_count']) / total_students) * 100 if total_students > 0 else 0
-                })
-            return sections
-    finally:
-        if conn.is_connected():
-            conn.close()
-
+async def update_evaluation(eval_data: EvaluationData, db=Depends(get_db)):
+    # Update or insert evaluation, and the program-level rollup with it
+    row = tuple(getattr(eval_data, column) for column in EVALUATION_COLUMNS)
+    await UnitOfWork().call(rollup.upsert_evaluations, [row], tables=EVALUATION_TABLES, changed=_any_changed).commit(db)
+    return {"status": "Evaluation updated successfully"}
+
+@router.post("/update-evaluations/", response_model=EvaluationUpsertReport, summary="Insert or update many evaluations in one transaction")
+async def update_evaluations(evaluations: List[EvaluationData], db=Depends(get_db)):
+    if not evaluations:
+        raise HTTPException(status_code=400, detail="No evaluations submitted")
+    if len(evaluations) > MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_LIMIT} evaluations per request")
+    keys = [(evaluation.section_ID, evaluation.objective_code) for evaluation in evaluations]
+    if len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail="Each (section_ID, objective_code) may appear only once")
+    # One multi-row INSERT ... ON DUPLICATE KEY UPDATE; the existing rows are locked and read first to classify each row
+    rows = [tuple(getattr(evaluation, column) for column in EVALUATION_COLUMNS) for evaluation in evaluations]
+    statuses, = await UnitOfWork().call(rollup.upsert_evaluations, rows, tables=EVALUATION_TABLES, changed=_any_changed).commit(db)
+    return {
+        'inserted': statuses.count('inserted'),
+        'updated': statuses.count('updated'),
+        'unchanged': statuses.count('unchanged'),
+        'results': [{'section_ID': section, 'objective_code': objective, 'status': status}
+                    for (section, objective), status in zip(keys, statuses)]
+    }
+
+@router.get("/get-evaluation/{section_id}", response_model=EvaluationData, dependencies=[Depends(conditional("course_evaluations"))])
+async def get_evaluation(section_id: int, objective_code: Optional[int] = Query(None, description="Objective to fetch; defaults to the section's lowest objective code"), db=Depends(get_db)):
+    evaluation = await db.fetch_one(queries.GET_EVALUATION, (section_id, objective_code, objective_code))
+    if evaluation:
+        return evaluation
+    else:
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+
+def _group_evaluations(rows):
+    return {
+        'section_number': rows[0]['section_number'],
+        'evaluations': [dict(zip(EVALUATION_COLUMNS, _evaluation_fields(row))) for row in rows if row['section_ID'] is not None]
+    }
+
+@router.get("/evaluations/", response_model=List[SectionEvaluations], dependencies=[Depends(conditional("sections", "course_evaluations"))])
+async def get_evaluations(
+    response: Response,
+    section_ids: Optional[List[int]] = Query(None, description="Sections to fetch; alternatively pass year and semester"),
+    year: Optional[int] = Query(None, description="Fetch every section of this year (with semester)"),
+    semester: Optional[str] = Query(None, description="Fetch every section of this semester (with year)"),
+    page: Page = Depends(),
+    db=Depends(get_db)):
+    """Every evaluation, for every objective, of a batch of sections, grouped by section. ``limit`` counts sections."""
+    section, = page.keyset(MIN_INT)
+    if section_ids:
+        if len(section_ids) > MAX_LIMIT:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_LIMIT} section IDs per request")
+        query, section_ids = bucketed("EVALUATIONS_BY_SECTIONS", section_ids)
+        params = (*section_ids, section)
+    elif year is not None and semester:
+        query, params = queries.EVALUATIONS_BY_TERM, (year, semester, section)
+    else:
+        raise HTTPException(status_code=400, detail="Pass section_ids, or year and semester")
+    return await paginate_groups(db, query, params, page, response,
+                                 key=lambda row: (row['section_number'],), group=_group_evaluations, model=SectionEvaluations)
+
+
+@router.get("/sections-evaluation-status/", response_model=List[SectionEvaluationStatus], dependencies=[Depends(conditional("sections", "course_evaluations"))])
+async def get_sections_evaluation_status(
+    response: Response,
+    year: int,
+    semester: str,
+    f_grade_percentage: Optional[float] = Query(None, description="Drop sections where more than this percentage of students received an F"),
+    status: Optional[Literal['Entered', 'Partially Entered', 'Not Entered']] = Query(None, description="Only return sections with this evaluation status"),
+    page: Page = Depends(),
+    db=Depends(get_db)):
+    section, = page.keyset(MIN_INT)
+    return await paginate(db, queries.SECTIONS_EVALUATION_STATUS,
+                          (year, semester, section, f_grade_percentage, f_grade_percentage, status, status), page, response,
+                          key=lambda row: (row['section_number'],), model=SectionEvaluationStatus)
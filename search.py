@@ -0,0 +1,234 @@
+"""In-memory full-text search over courses and learning objectives.
+
+``SearchIndex`` is an inverted index: every word of a course's number and name,
+and of an objective's title and description, maps to the documents containing
+it with the word's count in each (title words count ``TITLE_WEIGHT`` times).
+Postings live in compact ``array`` buffers, so a query turns them into NumPy
+arrays and ranks with BM25 (rare words, and words repeated in a short title,
+score highest) without a Python loop over documents. Every query word must
+match; the last one also matches as a prefix, for type-ahead, with words that
+only extend it scoring ``PREFIX_WEIGHT`` of an exact match (of a prefix with
+many completions, the ``MAX_PREFIX_WORDS`` most frequent).
+
+Like the curriculum index, it loads on first use (``main`` warms it at startup),
+the add routes apply their rows to it once committed, and bulk imports drop it
+via ``tables_changed`` so the next search reloads. So do other worker processes'
+writes, through ``versions.on_change``.
+"""
+import asyncio
+import heapq
+import logging
+import math
+import re
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import List, Literal, Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, Query
+
+import queries
+from database import get_db, DB_ERRORS
+from models import SearchResult
+from versions import conditional, on_change
+
+TABLES = {"courses", "learning_objectives"}
+KINDS = ("course", "objective")
+TITLE_WEIGHT = 2
+PREFIX_WEIGHT = 0.5
+# Completions of a type-ahead prefix searched at most, the most frequent first
+MAX_PREFIX_WORDS = 64
+# BM25 term-frequency saturation and length normalization
+K1 = 1.2
+B = 0.75
+
+log = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[^\W_]+")
+
+def tokenize(text):
+    return _WORD.findall(text.casefold()) if text else []
+
+def _load(conn):
+    with conn.cursor() as cursor:
+        tables = []
+        for query in (queries.CURRICULUM_COURSES, queries.SEARCH_OBJECTIVES):
+            cursor.execute(query)
+            tables.append(cursor.fetchall())
+        return tables
+
+class SearchIndex:
+    """Inverted index over course and learning objective text. Event-loop only."""
+
+    def __init__(self):
+        self._loaded = False
+        self._generation = 0  # bumped by every change, so a load that overlapped one is retried
+        self._lock = asyncio.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._postings = {}  # word -> (array of document ids, array of weighted counts)
+        self._words = []  # every word with postings, sorted, for prefix lookups
+        self._documents = {}  # (kind, key) -> document id
+        self._results = []  # document id -> result item
+        self._lengths = array("f")  # document id -> sum of its weighted word counts
+        self._kinds = array("b")  # document id -> index into KINDS
+        self._arrays = None  # NumPy copies of _lengths and _kinds, rebuilt after a change
+        self._compiled = {}  # word -> NumPy copies of its postings, dropped when they change
+
+    async def ensure_loaded(self, db):
+        while not self._loaded:
+            async with self._lock:
+                if self._loaded:
+                    return
+                generation = self._generation
+                tables = await db.run(_load, read=True)
+                if generation == self._generation:
+                    self._install(*tables)
+
+    def _install(self, courses, objectives):
+        self._clear()
+        for course_number, name in courses:
+            self.add_course(course_number, name)
+        for code, title, description in objectives:
+            self.add_objective(code, title, description)
+        self._loaded = True
+
+    def tables_changed(self, tables):
+        """Drop the index if ``tables`` overlap the ones it mirrors; the next search reloads it."""
+        if TABLES.intersection(tables):
+            self._generation += 1
+            self._loaded = False
+            self._clear()
+
+    # Incremental updates, applied by the write routes after their transaction commits
+
+    def add_course(self, course_number, name):
+        self._add("course", course_number, (course_number, name), (),
+                  {"kind": "course", "course_number": course_number, "objective_code": None, "title": name,
+                   "description": None})
+
+    def add_objective(self, code, title, description):
+        self._add("objective", code, (title,), (description,),
+                  {"kind": "objective", "course_number": None, "objective_code": code, "title": title,
+                   "description": description})
+
+    def _add(self, kind, key, titles, texts, result):
+        self._generation += 1
+        self._arrays = None
+        terms = Counter()
+        for text in titles:
+            for word in tokenize(text):
+                terms[word] += TITLE_WEIGHT
+        terms.update(word for text in texts for word in tokenize(text))
+        document = self._documents.get((kind, key))
+        if document is None:
+            document = self._documents[kind, key] = len(self._results)
+            self._results.append(result)
+            self._lengths.append(sum(terms.values()))
+            self._kinds.append(KINDS.index(kind))
+        else:
+            # Re-added under the same key (rare: the add routes reject duplicates), so drop its old postings
+            for word, (ids, counts) in list(self._postings.items()):
+                if document in ids:
+                    keep = [i for i, posting in enumerate(ids) if posting != document]
+                    self._postings[word] = (array("i", [ids[i] for i in keep]), array("f", [counts[i] for i in keep]))
+                    self._compiled.pop(word, None)
+            self._results[document] = result
+            self._lengths[document] = sum(terms.values())
+        for word, count in terms.items():
+            if word not in self._postings:
+                self._postings[word] = (array("i"), array("f"))
+                insort(self._words, word)
+            ids, counts = self._postings[word]
+            ids.append(document)
+            counts.append(count)
+            self._compiled.pop(word, None)
+
+    # Queries
+
+    def search(self, text, kind=None, limit=10):
+        """The ``limit`` best-ranked documents matching every word of ``text``, the last one as a prefix."""
+        words = tokenize(text)
+        if not words or not self._results:
+            return []
+        if self._arrays is None:
+            self._arrays = (np.array(self._lengths, dtype=np.float64), np.array(self._kinds, dtype=np.int8))
+        lengths, kinds = self._arrays
+        # BM25's length normalization, per document
+        norms = K1 * (1 - B + B * lengths / lengths.mean())
+
+        scores = np.zeros(len(self._results))
+        matched = np.zeros(len(self._results), dtype=np.int32)
+        for word in dict.fromkeys(words[:-1]):
+            ids, weights = self._weights(word, norms)
+            scores[ids] += weights
+            matched[ids] += 1
+        ids, weights = self._prefix_weights(words[-1], norms)
+        scores[ids] += weights
+        matched[ids] += 1
+
+        candidates = np.flatnonzero(matched == len(dict.fromkeys(words[:-1])) + 1)
+        if kind is not None:
+            candidates = candidates[kinds[candidates] == KINDS.index(kind)]
+        if len(candidates) > limit:
+            # Only documents scoring at least the limit-th best can make the page
+            cutoff = np.partition(scores[candidates], len(candidates) - limit)[len(candidates) - limit]
+            candidates = candidates[scores[candidates] >= cutoff]
+        # Best score first; ties in the order the documents were added
+        ranked = candidates[np.lexsort((candidates, -scores[candidates]))][:limit]
+        return [{**self._results[document], "score": round(float(scores[document]), 4)} for document in ranked.tolist()]
+
+    def _weights(self, word, norms):
+        """Document ids containing ``word`` and its BM25 weight in each."""
+        if word not in self._postings:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        if word not in self._compiled:
+            ids, counts = self._postings[word]
+            self._compiled[word] = (np.array(ids, dtype=np.int32), np.array(counts, dtype=np.float64))
+        ids, counts = self._compiled[word]
+        idf = math.log(1 + (len(self._results) - len(ids) + 0.5) / (len(ids) + 0.5))
+        return ids, idf * counts * (K1 + 1) / (counts + norms[ids])
+
+    def _prefix_weights(self, prefix, norms):
+        """``_weights`` over every word starting with ``prefix``, keeping each document's best match."""
+        start = bisect_left(self._words, prefix)
+        end = bisect_left(self._words, prefix + "\U0010ffff", start)
+        words = self._words[start:end]
+        if len(words) > MAX_PREFIX_WORDS:
+            # A short prefix completes to many words; the ones in the most documents stand for it
+            words = heapq.nlargest(MAX_PREFIX_WORDS, words, key=lambda word: len(self._postings[word][0]))
+        if len(words) == 1:
+            ids, weights = self._weights(words[0], norms)
+            return ids, weights if words[0] == prefix else weights * PREFIX_WEIGHT
+        best = np.zeros(len(self._results))
+        if words:
+            matches = [self._weights(word, norms) for word in words]
+            np.maximum.at(best, np.concatenate([ids for ids, _ in matches]),
+                          np.concatenate([weights if word == prefix else weights * PREFIX_WEIGHT
+                                          for word, (_, weights) in zip(words, matches)]))
+        ids = np.flatnonzero(best)
+        return ids, best[ids]
+
+search_index = SearchIndex()
+on_change(search_index.tables_changed)
+
+async def warm(db):
+    """Load the index ahead of the first request; a database that is not up yet only defers it."""
+    try:
+        await search_index.ensure_loaded(db)
+    except DB_ERRORS as error:
+        log.warning("Search index not loaded at startup: %s", error)
+
+router = APIRouter(tags=["search"])
+
+@router.get("/search", response_model=List[SearchResult],
+            dependencies=[Depends(conditional("courses", "learning_objectives"))],
+            summary="Ranked full-text search over course numbers and names and objective titles and descriptions")
+async def search(q: str = Query(..., min_length=1, description="Words to find; the last one also matches as a prefix"),
+                 kind: Optional[Literal["course", "objective"]] = Query(None, description="Only courses, or only objectives"),
+                 limit: int = Query(10, ge=1, le=100, description="Maximum number of results"),
+                 db=Depends(get_db)):
+    await search_index.ensure_loaded(db)
+    return search_index.search(q, kind, limit)
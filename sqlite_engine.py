@@ -0,0 +1,292 @@
+"""Embedded SQLite storage engine.
+
+Selected with ``DB_ENGINE=sqlite`` in config.txt; the database lives in the file
+named by ``SQLITE_PATH``. ``connect`` returns a connection that speaks the subset
+of the mysql.connector API the data-access code uses (dictionary cursors usable
+as context managers, ``start_transaction``, ``in_transaction``, ``ping``), so the
+pool, ``Database`` and every statement in queries.py run unchanged. Statements
+are translated from the MySQL dialect once and cached (see ``translate``).
+
+``SCHEMA`` mirrors the tables and indexes the MySQL migrations build, including
+the stored ``term_index`` columns. The database runs in WAL mode, so readers
+never wait for the single writer.
+"""
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+
+# Keep in step with migrate.TERM_INDEX_EXPR
+TERM_INDEX_EXPR = "year * 4 + CASE semester WHEN 'Winter' THEN 1 WHEN 'Spring' THEN 2 WHEN 'Summer' THEN 3 WHEN 'Fall' THEN 4 END"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS degrees (
+    name VARCHAR(255),
+    level VARCHAR(255),
+    PRIMARY KEY (name, level)
+);
+
+CREATE TABLE IF NOT EXISTS courses (
+    department_code VARCHAR(4) NOT NULL CHECK (LENGTH(department_code) BETWEEN 2 AND 4),
+    course_code INT NOT NULL CHECK (course_code BETWEEN 1000 AND 9999),
+    course_number VARCHAR(8) GENERATED ALWAYS AS (department_code || substr('0000' || course_code, -4)) STORED,
+    name VARCHAR(255) UNIQUE
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_courses_course_number ON courses (course_number);
+
+CREATE TABLE IF NOT EXISTS semester_sort_order (
+    semester VARCHAR(255) PRIMARY KEY,
+    sort_order INT
+);
+INSERT INTO semester_sort_order (semester, sort_order) VALUES ('Winter', 1), ('Spring', 2), ('Summer', 3), ('Fall', 4)
+    ON CONFLICT (semester) DO UPDATE SET sort_order = excluded.sort_order;
+
+CREATE TABLE IF NOT EXISTS semesters (
+    year INT,
+    semester VARCHAR(255),
+    term_index INT GENERATED ALWAYS AS ({TERM_INDEX_EXPR}) STORED,
+    PRIMARY KEY (year, semester),
+    FOREIGN KEY (semester) REFERENCES semester_sort_order (semester)
+);
+CREATE INDEX IF NOT EXISTS idx_semesters_term ON semesters (term_index);
+
+CREATE TABLE IF NOT EXISTS instructors (
+    instructor_id INT PRIMARY KEY,
+    name VARCHAR(255)
+);
+
+CREATE TABLE IF NOT EXISTS sections (
+    section_number INT PRIMARY KEY,
+    number_of_students INT,
+    instructor_id INT,
+    course_number VARCHAR(255),
+    year INT,
+    semester VARCHAR(255),
+    term_index INT GENERATED ALWAYS AS ({TERM_INDEX_EXPR}) STORED,
+    FOREIGN KEY (instructor_id) REFERENCES instructors (instructor_id),
+    FOREIGN KEY (course_number) REFERENCES courses (course_number),
+    FOREIGN KEY (year, semester) REFERENCES semesters (year, semester)
+);
+CREATE INDEX IF NOT EXISTS idx_sections_term ON sections (term_index);
+CREATE INDEX IF NOT EXISTS idx_sections_course_term ON sections (course_number, term_index);
+CREATE INDEX IF NOT EXISTS idx_sections_instructor_term ON sections (instructor_id, term_index);
+CREATE INDEX IF NOT EXISTS idx_sections_year_semester ON sections (year, semester, section_number);
+
+CREATE TABLE IF NOT EXISTS sections_courses (
+    course_number VARCHAR(255),
+    section_number INT,
+    PRIMARY KEY (course_number, section_number),
+    FOREIGN KEY (course_number) REFERENCES courses (course_number),
+    FOREIGN KEY (section_number) REFERENCES sections (section_number)
+);
+
+CREATE TABLE IF NOT EXISTS degree_courses (
+    degree_name VARCHAR(255),
+    degree_level VARCHAR(255),
+    course_number VARCHAR(255),
+    core_course BOOLEAN,
+    PRIMARY KEY (degree_name, degree_level, course_number),
+    FOREIGN KEY (degree_name, degree_level) REFERENCES degrees (name, level),
+    FOREIGN KEY (course_number) REFERENCES courses (course_number)
+);
+CREATE INDEX IF NOT EXISTS idx_degree_courses_course ON degree_courses (course_number, degree_name, degree_level, core_course);
+
+CREATE TABLE IF NOT EXISTS learning_objectives (
+    code INT PRIMARY KEY,
+    title VARCHAR(255),
+    description TEXT
+);
+
+CREATE TABLE IF NOT EXISTS course_evaluations (
+    eval_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    section_ID INT,
+    objective_code INT,
+    eval_criteria VARCHAR(255),
+    eval_A_count INT,
+    eval_B_count INT,
+    eval_C_count INT,
+    eval_F_count INT,
+    improvements TEXT,
+    FOREIGN KEY (section_ID) REFERENCES sections (section_number),
+    FOREIGN KEY (objective_code) REFERENCES learning_objectives (code),
+    CONSTRAINT section_objective_unique UNIQUE (section_ID, objective_code)
+);
+
+CREATE TABLE IF NOT EXISTS course_learning_objectives (
+    course_number VARCHAR(255),
+    objective_code INT,
+    PRIMARY KEY (course_number, objective_code),
+    FOREIGN KEY (course_number) REFERENCES courses (course_number),
+    FOREIGN KEY (objective_code) REFERENCES learning_objectives (code)
+);
+
+CREATE TABLE IF NOT EXISTS evaluation_rollup (
+    degree_name VARCHAR(255),
+    degree_level VARCHAR(255),
+    objective_code INT,
+    year INT,
+    semester VARCHAR(255),
+    term_index INT GENERATED ALWAYS AS ({TERM_INDEX_EXPR}) STORED,
+    a_count BIGINT NOT NULL DEFAULT 0,
+    b_count BIGINT NOT NULL DEFAULT 0,
+    c_count BIGINT NOT NULL DEFAULT 0,
+    f_count BIGINT NOT NULL DEFAULT 0,
+    section_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (degree_name, degree_level, objective_code, year, semester)
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_degree_term ON evaluation_rollup (degree_name, degree_level, term_index, objective_code);
+CREATE INDEX IF NOT EXISTS idx_rollup_term ON evaluation_rollup (year, semester, degree_name, degree_level, objective_code);
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+"""
+
+# Conflict target of each table written with ON DUPLICATE KEY UPDATE
+UPSERT_KEYS = {
+    "degree_courses": "degree_name, degree_level, course_number",
+    "course_evaluations": "section_ID, objective_code",
+    "evaluation_rollup": "degree_name, degree_level, objective_code, year, semester",
+    "table_versions": "table_name",
+}
+
+_INSERT_TABLE = re.compile(r"INSERT\s+INTO\s+(\w+)", re.I)
+_DUPLICATE_KEY = re.compile(r"ON\s+DUPLICATE\s+KEY\s+UPDATE", re.I)
+_VALUES_REF = re.compile(r"VALUES\((\w+)\)", re.I)
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\b", re.I)
+_ROW_IN_LIST = re.compile(r"\(([\w\s,.]+)\)\s+IN\s+\(((?:\s*\([^()]*\)\s*,?)+)\)", re.I)
+_WRITE = re.compile(r"\s*(INSERT|UPDATE|DELETE|REPLACE)\b", re.I)
+
+def _row_in_list(match):
+    width = len(match.group(1).split(","))
+    columns = ", ".join(f"column{i}" for i in range(1, width + 1))
+    return f"({match.group(1)}) IN (SELECT {columns} FROM (VALUES {match.group(2).strip()}))"
+
+@lru_cache(maxsize=1024)
+def translate(sql):
+    """Rewrite a MySQL statement from queries.py for SQLite.
+
+    * ``%s`` placeholders become ``?``;
+    * ``INSERT IGNORE`` becomes ``INSERT OR IGNORE``;
+    * ``ON DUPLICATE KEY UPDATE col = VALUES(col)`` becomes ``ON CONFLICT (key) DO UPDATE SET col = excluded.col``;
+    * ``(a, b) IN ((?, ?), (?, ?))`` becomes ``(a, b) IN (SELECT column1, column2 FROM (VALUES (?, ?), (?, ?)))``:
+      SQLite only takes a row-value list as a subquery, and only a SELECT over it lets the planner use an index;
+    * ``FOR UPDATE`` is dropped: ``start_transaction`` already takes SQLite's single write lock.
+    """
+    sql = sql.replace("%s", "?")
+    sql = re.sub(r"INSERT\s+IGNORE\s+INTO", "INSERT OR IGNORE INTO", sql, flags=re.I)
+    if _DUPLICATE_KEY.search(sql):
+        table = _INSERT_TABLE.search(sql).group(1)
+        head, update = _DUPLICATE_KEY.split(sql, maxsplit=1)
+        # An INSERT ... SELECT needs a WHERE before ON CONFLICT, or the parser reads ON as a join constraint
+        if re.search(r"\bSELECT\b", head, re.I) and not re.search(r"\bWHERE\b", head, re.I):
+            head = re.sub(r"(\s+GROUP\s+BY\b)", r"\nWHERE TRUE\1", head, count=1, flags=re.I)
+        update = _VALUES_REF.sub(r"excluded.\1", update)
+        sql = f"{head}ON CONFLICT ({UPSERT_KEYS[table]}) DO UPDATE SET{update}"
+    sql = _ROW_IN_LIST.sub(_row_in_list, sql)
+    return _FOR_UPDATE.sub("", sql)
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+class SQLiteCursor:
+    def __init__(self, conn, dictionary=False):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+        if dictionary:
+            self._cursor.row_factory = _dict_row
+
+    def execute(self, sql, params=()):
+        self._conn.begin_if_writing(sql)
+        self._cursor.execute(translate(sql), tuple(params))
+
+    def executemany(self, sql, seq_params):
+        self._conn.begin_if_writing(sql)
+        self._cursor.executemany(translate(sql), [tuple(params) for params in seq_params])
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SQLiteConnection:
+    """mysql.connector-shaped wrapper around an autocommit ``sqlite3`` connection.
+
+    Like MySQL with autocommit off, a write opens a transaction that lasts until
+    ``commit`` or ``rollback``; plain reads run in autocommit mode so they never
+    pin an old snapshot.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, dictionary=False, prepared=False):
+        # ``prepared`` needs nothing extra: sqlite3 keeps compiled statements per connection, keyed by their text
+        return SQLiteCursor(self, dictionary)
+
+    def begin_if_writing(self, sql):
+        if not self.raw.in_transaction and _WRITE.match(sql):
+            self.raw.execute("BEGIN")
+
+    def start_transaction(self):
+        # IMMEDIATE takes the write lock now, which is what the SELECT ... FOR UPDATE that follows relies on
+        self.raw.execute("BEGIN IMMEDIATE")
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def ping(self, reconnect=False):
+        self.raw.execute("SELECT 1").fetchall()
+
+    def close(self):
+        self.raw.close()
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+def connect(path, busy_timeout=5.0):
+    """Open ``path``, creating the file and its schema the first time this process opens it."""
+    # check_same_thread is off because the pool hands a connection to one worker thread at a time
+    raw = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+    raw.execute("PRAGMA journal_mode = WAL")
+    raw.execute("PRAGMA synchronous = NORMAL")
+    raw.execute("PRAGMA foreign_keys = ON")
+    conn = SQLiteConnection(raw)
+    with _init_lock:
+        if path not in _initialized:
+            create_schema(conn)
+            _initialized.add(path)
+    return conn
+
+def create_schema(conn):
+    """Create every table and index that is missing; safe to run on every start."""
+    conn.raw.executescript(SCHEMA)
@@ -0,0 +1,84 @@
+"""Server-side prepared statements for the reads the routes run.
+
+Off unless config.txt sets ``DB_PREPARED_STATEMENTS=on``: the reuse below is only
+exercised against SQLite so far, so until it is verified on MySQL the reads run on
+plain cursors (``prepared_cursor`` returns None). The ``IN``-list bucketing applies
+either way.
+
+``PREPARED`` names the statements of queries.py that routes.py reads with, and
+``BUCKETED`` the ``IN``-list templates among them, whose sizes are built at import.
+``Database.fetch_all``/``fetch_one`` recognise their text and run them on a
+prepared cursor kept per pooled connection, so MySQL parses and plans each one
+once per connection and afterwards receives only its parameters. mysql.connector
+re-prepares when a cursor is handed a different statement object, hence one
+cursor per statement, and the statement texts below are built once and reused.
+The pool closes a connection's cursors (``close_cursors``) before the connection,
+which releases its statements on the server.
+
+A variable-length ``IN`` list would make a new statement for every length.
+``bucketed`` pads the list to the next of ``IN_BUCKETS`` sizes by repeating its
+last value, which does not change the result, so a few texts cover every length.
+
+On SQLite, the ``sqlite3`` module caches compiled statements per connection by
+text, so the same registry gives the same reuse there. ``/metrics`` counts
+prepares and executions per statement.
+"""
+import weakref
+
+import metrics
+import queries
+from config import config
+from pagination import MAX_LIMIT
+
+ENABLED = config.get('DB_PREPARED_STATEMENTS', 'off').lower() in ('on', 'true', '1', 'yes')
+
+PREPARED = ("LIST_SECTIONS", "LIST_LEARNING_OBJECTIVES", "LIST_DEGREES", "LIST_INSTRUCTORS", "LIST_SEMESTERS",
+            "COURSES_BY_DEGREE", "SECTIONS_BY_COURSE", "SECTIONS_BY_INSTRUCTOR", "INSTRUCTOR_SECTIONS",
+            "SECTIONS_BY_INSTRUCTOR_DEGREE_SEMESTER", "SECTIONS_WITH_EVALUATIONS", "GET_EVALUATION",
+            "EVALUATIONS_BY_TERM", "SECTIONS_EVALUATION_STATUS")
+# IN-list template -> its placeholder field
+BUCKETED = {"EVALUATIONS_BY_SECTIONS": "section_ids"}
+IN_BUCKETS = (8, 32, 128, 512, 2048, MAX_LIMIT)
+
+PREPARES = metrics.Counter("db_statement_prepares_total", "Statements prepared on a pooled connection", ("statement",))
+EXECUTIONS = metrics.Counter("db_statement_executions_total", "Executions of prepared statements", ("statement",))
+metrics.METRICS.extend([PREPARES, EXECUTIONS])
+
+_registry = {getattr(queries, name): name for name in PREPARED}  # statement text -> name
+# (template name, size) -> statement text, every size of every template built up front
+_variants = {(name, size): getattr(queries, name).format(**{field: ",".join(["%s"] * size)})
+             for name, field in BUCKETED.items() for size in IN_BUCKETS}
+_registry.update({sql: name for (name, _), sql in _variants.items()})
+_cursors = weakref.WeakKeyDictionary()  # pooled connection -> {statement text: prepared cursor}
+
+def bucketed(name, values):
+    """``(statement, values)`` for template ``name`` with its IN list sized for ``values``, padded to match.
+
+    Callers cap ``values`` at ``IN_BUCKETS[-1]``.
+    """
+    size = next(size for size in IN_BUCKETS if size >= len(values))
+    return _variants[name, size], [*values, *[values[-1]] * (size - len(values))]
+
+def prepared_cursor(conn, sql):
+    """The prepared dictionary cursor for ``sql`` on ``conn``, or None if ``sql`` is not registered or not ``ENABLED``.
+
+    The cursor stays open with the connection; do not close it, the pool does (``close_cursors``).
+    """
+    name = _registry.get(sql) if ENABLED else None
+    if name is None:
+        return None
+    cursors = _cursors.setdefault(conn.wrapped, {})
+    cursor = cursors.get(sql)
+    if cursor is None:
+        cursor = cursors[sql] = conn.cursor(prepared=True, dictionary=True)
+        PREPARES.inc((name,))
+    EXECUTIONS.inc((name,))
+    return cursor
+
+def close_cursors(conn):
+    """Close the prepared cursors of pooled connection ``conn``, ahead of closing the connection itself."""
+    for cursor in _cursors.pop(conn, {}).values():
+        try:
+            cursor.close()
+        except Exception:
+            pass
@@ -0,0 +1,29 @@
+from datetime import date
+
+from fastapi import HTTPException, Query
+
+# Mirrors the rows create_tables.py seeds into semester_sort_order
+SEMESTER_SORT_ORDER = {'Winter': 1, 'Spring': 2, 'Summer': 3, 'Fall': 4}
+
+def term_index(year: int, semester: str) -> int:
+    """Turn (year, semester) into the ordinal stored in sections.term_index and semesters.term_index."""
+    sort_order = SEMESTER_SORT_ORDER.get(semester.strip().capitalize())
+    if sort_order is None:
+        raise HTTPException(status_code=400, detail=f"Unknown semester '{semester}'. Expected one of: {', '.join(SEMESTER_SORT_ORDER)}")
+    return year * 4 + sort_order
+
+# First month of each semester, for placing a date in its term
+SEMESTER_START_MONTHS = {'Winter': 1, 'Spring': 2, 'Summer': 6, 'Fall': 9}
+
+def term_index_on(day: date) -> int:
+    """The term_index of the semester ``day`` falls in."""
+    semester = max((month, name) for name, month in SEMESTER_START_MONTHS.items() if month <= day.month)[1]
+    return term_index(day.year, semester)
+
+def term_range(
+    start_year: int = Query(..., description="Start year of the query range"),
+    start_semester: str = Query(..., description="Start semester of the query range"),
+    end_year: int = Query(..., description="End year of the query range"),
+    end_semester: str = Query(..., description="End semester of the query range")):
+    """Dependency resolving a start/end term pair into an inclusive (start, end) term_index range."""
+    return term_index(start_year, start_semester), term_index(end_year, end_semester)
@@ -0,0 +1,96 @@
+"""Shared fixtures: the app on the embedded SQLite engine, with a fresh database file per test."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config  # noqa: E402
+
+# Read by database.py at import, so set before anything imports it
+config["DB_ENGINE"] = "sqlite"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import curriculum  # noqa: E402
+import database  # noqa: E402
+import main  # noqa: E402
+import search  # noqa: E402
+import versions  # noqa: E402
+from cache import reference_cache  # noqa: E402
+from coalesce import read_flights  # noqa: E402
+
+COURSES = (("Intro to Programming", "CS", 1000), ("Data Structures", "CS", 2000), ("Calculus", "MATH", 1100))
+OBJECTIVES = ((1, "Programming", "Write small programs"), (2, "Analysis", "Analyze algorithms"),
+              (3, "Proofs", "Write proofs"))
+# (section_number, course_number, year, semester)
+SECTIONS = ((101, "CS1000", 2023, "Fall"), (102, "CS1000", 2024, "Spring"), (103, "CS2000", 2024, "Spring"),
+            (104, "CS2000", 2024, "Fall"), (105, "MATH1100", 2024, "Fall"), (106, "CS1000", 2024, "Fall"),
+            (107, "MATH1100", 2025, "Winter"))
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "SQLITE_PATH", str(tmp_path / "test.db"))
+    # Process-wide state that would otherwise carry rows over from the previous test's database
+    reference_cache.invalidate()
+    read_flights.invalidate()
+    curriculum.curriculum_index.tables_changed(curriculum.TABLES)
+    search.search_index.tables_changed(search.TABLES)
+    monkeypatch.setattr(versions, "_versions", {})
+    # Tests re-read the versions themselves (poll_versions), so the background poll never interleaves
+    monkeypatch.setattr(versions, "VERSIONS_POLL_INTERVAL", 3600)
+    with TestClient(main.app) as client:
+        yield client
+    database.pool.close()
+
+def post(client, path, body, status=201):
+    response = client.post(path, json=body)
+    assert response.status_code == status, response.text
+    return response.json()
+
+@pytest.fixture
+def seeded(client):
+    """One degree with the two CS courses, an instructor, three objectives and sections over five terms."""
+    post(client, "/add-degree/", {"name": "Computer Science", "level": "BS"})
+    for name, department, code in COURSES:
+        post(client, "/add-course/", {"name": name, "department_code": department, "course_code": code})
+    post(client, "/add-instructor/", {"instructor_id": 1, "name": "Ada"})
+    for code, title, description in OBJECTIVES:
+        post(client, "/add-learning-objective/", {"code": code, "title": title, "description": description})
+    for number, course, year, semester in SECTIONS:
+        post(client, "/add-section/", {"section_number": number, "number_of_students": 30, "instructor_id": 1,
+                                       "course_number": course, "year": year, "semester": semester})
+    for course in ("CS1000", "CS2000"):
+        post(client, "/associate-course-with-degree/", {"degree_name": "Computer Science", "degree_level": "BS",
+                                                        "course_number": course, "core_course": True})
+    return client
+
+def evaluation(section, objective, a=10, b=5, c=2, f=1, criteria="Exam", improvements=""):
+    return {"section_ID": section, "objective_code": objective, "eval_criteria": criteria, "eval_A_count": a,
+            "eval_B_count": b, "eval_C_count": c, "eval_F_count": f, "improvements": improvements}
+
+def query(sql, params=()):
+    """Rows of ``sql`` read on a connection of its own, bypassing every cache."""
+    conn = database.connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+def poll_versions(client):
+    """Run the background re-read of the table versions now."""
+    client.portal.call(versions.sync, database.db)
+
+def write_elsewhere(sql, params, *tables):
+    """Commit ``sql`` the way another worker process would: on its own connection, bumping the versions of ``tables``."""
+    conn = database.connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            versions.record(cursor, tables)
+            conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import database
+from admission import Limiter
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+async def hold(limiter, release):
+    async with limiter:
+        await release.wait()
+
+def test_calls_over_the_limit_wait_for_a_slot():
+    async def main():
+        limiter, release = Limiter("read", limit=2, queue_size=5, timeout=1), asyncio.Event()
+        holders = [asyncio.ensure_future(hold(limiter, release)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert (limiter.active, limiter.queued) == (2, 1)
+        release.set()
+        await asyncio.gather(*holders)
+        assert (limiter.active, limiter.queued) == (0, 0)
+    run(main())
+
+def test_full_queue_is_turned_away_with_retry_after():
+    async def main():
+        limiter, release = Limiter("write", limit=1, queue_size=1, timeout=1), asyncio.Event()
+        holders = [asyncio.ensure_future(hold(limiter, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as error:
+            await limiter.acquire()
+        assert error.value.status_code == 503
+        assert "Retry-After" in error.value.headers
+        release.set()
+        await asyncio.gather(*holders)
+    run(main())
+
+def test_queued_call_times_out_and_frees_its_place():
+    async def main():
+        limiter, release = Limiter("read", limit=1, queue_size=5, timeout=0.01), asyncio.Event()
+        holder = asyncio.ensure_future(hold(limiter, release))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException):
+            await limiter.acquire()
+        assert (limiter.active, limiter.queued) == (1, 0)
+        release.set()
+        await holder
+        assert limiter.active == 0
+    run(main())
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def main():
+        limiter, release = Limiter("read", limit=1, queue_size=5, timeout=1), asyncio.Event()
+        holder = asyncio.ensure_future(hold(limiter, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert (limiter.active, limiter.queued) == (0, 0)
+    run(main())
+
+def test_route_over_budget_answers_503(seeded, monkeypatch):
+    monkeypatch.setattr(database.db, "readers", Limiter("read", limit=0, queue_size=0))
+    response = seeded.get("/sections-evaluation-status/", params={"year": 2024, "semester": "Fall"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
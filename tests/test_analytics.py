@@ -0,0 +1,28 @@
+from conftest import evaluation, post
+from pagination import NEXT_CURSOR_HEADER, encode_cursor
+
+TERMS = {"start_year": 2023, "start_semester": "Fall", "end_year": 2024, "end_semester": "Fall"}
+
+def test_course_trends_per_term(seeded):
+    post(seeded, "/update-evaluations/", [evaluation(101, 1, a=6, b=2, c=1, f=1), evaluation(102, 1, a=2, b=2, c=0, f=0),
+                                          evaluation(106, 1, a=0, b=0, c=0, f=0)], status=200)
+    points = seeded.get("/analytics/grade-trends/course", params={**TERMS, "window": 2}).json()
+    assert [(point["key"], point["year"], point["semester"]) for point in points] == \
+        [("CS1000", 2023, "Fall"), ("CS1000", 2024, "Spring"), ("CS1000", 2024, "Fall")]
+    fall, spring, empty = points
+    assert (fall["percent_a"], spring["percent_a"]) == (60.0, 50.0)
+    # Over both terms' grades: 8 A of 14
+    assert spring["moving_percent_a"] == 57.14
+    assert spring["change_percent_a"] == -10.0
+    assert empty["percent_a"] is None
+
+def test_cursor_from_another_dimension_is_a_400(seeded):
+    post(seeded, "/update-evaluations/", [evaluation(101, 1), evaluation(103, 2)], status=200)
+    first = seeded.get("/analytics/grade-trends/course", params={**TERMS, "limit": 1})
+    after = first.headers[NEXT_CURSOR_HEADER]
+    assert seeded.get("/analytics/grade-trends/course", params={**TERMS, "after": after}).status_code == 200
+    for dimension in ("instructor", "objective"):
+        response = seeded.get(f"/analytics/grade-trends/{dimension}", params={**TERMS, "after": after})
+        assert response.status_code == 400
+    response = seeded.get("/analytics/grade-trends/course", params={**TERMS, "after": encode_cursor([1, 8097])})
+    assert response.status_code == 400
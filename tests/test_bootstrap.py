@@ -0,0 +1,64 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+import bootstrap
+from conftest import evaluation, post
+
+def test_lists_and_the_terms_sections(seeded):
+    post(seeded, "/update-evaluation/", evaluation(104, 1), status=200)
+    body = seeded.get("/bootstrap", params={"year": 2024, "semester": "Fall"}).json()
+    assert [row["name"] for row in body["instructors"]] == ["Ada"]
+    assert len(body["semesters"]) == 4
+    assert body["current_term"] == {"year": 2024, "semester": "Fall"}
+    assert [row["section_number"] for row in body["sections"]] == [104, 105, 106]
+
+def test_tag_changes_when_a_new_term_starts(seeded, monkeypatch):
+    class Today(date):
+        day = date(2024, 12, 15)
+
+        @classmethod
+        def today(cls):
+            return cls.day
+
+    monkeypatch.setattr(bootstrap, "date", Today)
+    fall = seeded.get("/bootstrap")
+    assert fall.json()["current_term"] == {"year": 2024, "semester": "Fall"}
+    assert seeded.get("/bootstrap", headers={"If-None-Match": fall.headers["etag"]}).status_code == 304
+
+    Today.day = date(2025, 1, 6)
+    winter = seeded.get("/bootstrap", headers={"If-None-Match": fall.headers["etag"]})
+    assert winter.status_code == 200
+    assert winter.json()["current_term"] == {"year": 2025, "semester": "Winter"}
+    # An explicit term does not depend on the date
+    explicit = seeded.get("/bootstrap", params={"year": 2024, "semester": "Fall"})
+    Today.day = date(2024, 12, 15)
+    assert seeded.get("/bootstrap", params={"year": 2024, "semester": "Fall"},
+                      headers={"If-None-Match": explicit.headers["etag"]}).status_code == 304
+
+def test_failed_read_stops_the_others(seeded, monkeypatch):
+    cancelled = []
+    reference = bootstrap._reference
+
+    async def failing():
+        raise RuntimeError("instructors unavailable")
+
+    async def never_done():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append("semesters")
+            raise
+
+    def fake_reference(db, table, query, params):
+        if table == "instructors":
+            return failing()
+        if table == "semesters":
+            return never_done()
+        return reference(db, table, query, params)
+
+    monkeypatch.setattr(bootstrap, "_reference", fake_reference)
+    with pytest.raises(RuntimeError):
+        seeded.get("/bootstrap")
+    assert cancelled == ["semesters"]
@@ -0,0 +1,124 @@
+import sqlite3
+
+import bulk
+import queries
+import rollup
+from conftest import post, query
+
+CSV = {"Content-Type": "text/csv"}
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+def test_csv_report_numbers_rejected_rows(client):
+    body = ("name,department_code,course_code\n"
+            "Intro,CS,1000\n"
+            "Too Short,C,1001\n"  # department_code under two characters
+            "Out Of Range,CS,99\n"  # course_code below 1000
+            "Intro Again,CS,1000\n"  # same course_number as row 1
+            "Algorithms,CS,3000\n")
+    report = client.post("/bulk/courses", content=body, headers=CSV).json()
+    assert report["received"] == 5
+    assert report["imported"] == 2
+    assert [error["row"] for error in report["errors"]] == [2, 3, 4]
+    assert "department_code" in report["errors"][0]["error"]
+    assert "between 1000 and 9999" in report["errors"][1]["error"]
+    assert query("SELECT course_number FROM courses ORDER BY course_number") == [("CS1000",), ("CS3000",)]
+
+def test_ndjson_report_includes_unreadable_lines(client):
+    body = "\n".join(['{"instructor_id": 1, "name": "Ada"}', 'not json', '[1, 2]', '{"instructor_id": "x", "name": "Bob"}',
+                      '{"instructor_id": 2, "name": "Grace"}'])
+    report = client.post("/bulk/instructors", content=body, headers=NDJSON).json()
+    assert report["received"] == 5
+    assert report["imported"] == 2
+    assert [error["row"] for error in report["errors"]] == [2, 3, 4]
+    assert report["errors"][0]["error"].startswith("Invalid JSON")
+    assert report["errors"][1]["error"] == "Expected a JSON object"
+
+def test_database_rejections_fall_back_to_row_by_row(seeded, monkeypatch):
+    monkeypatch.setattr(bulk, "BATCH_SIZE", 2)
+    body = ("section_number,number_of_students,instructor_id,course_number,year,semester\n"
+            "201,20,1,CS1000,2025,Fall\n"
+            "202,20,99,CS1000,2025,Fall\n"  # no instructor 99
+            "203,20,1,CS2000,2025,Fall\n"
+            "101,20,1,CS2000,2025,Fall\n")  # section 101 exists
+    report = seeded.post("/bulk/sections", content=body, headers=CSV).json()
+    assert report["imported"] == 2
+    assert [error["row"] for error in report["errors"]] == [2, 4]
+    assert query("SELECT section_number FROM sections WHERE section_number > 200 ORDER BY section_number") == [(201,), (203,)]
+
+def test_duplicate_evaluations_in_upload_are_rejected(seeded):
+    row = "101,1,Exam,1,2,3,4,"
+    body = "section_ID,objective_code,eval_criteria,eval_A_count,eval_B_count,eval_C_count,eval_F_count,improvements\n"
+    report = seeded.post("/bulk/evaluations", content=body + f"{row}\n{row}\n", headers=CSV).json()
+    assert report["imported"] == 1
+    assert report["errors"] == [{"row": 2, "error": "Duplicate (section_ID, objective_code) in upload"}]
+
+def test_unsupported_content_type(client):
+    response = client.post("/bulk/degrees", content="name,level\n", headers={"Content-Type": "text/plain"})
+    assert response.status_code == 415
+
+def test_bulk_import_is_visible_to_reads(client):
+    post(client, "/add-degree/", {"name": "Physics", "level": "BS"})
+    assert [row["name"] for row in client.get("/degrees/").json()] == ["Physics"]
+    client.post("/bulk/degrees", content="name,level\nMathematics,BS\n", headers=CSV)
+    assert [row["name"] for row in client.get("/degrees/").json()] == ["Mathematics", "Physics"]
+
+def test_rejected_section_leaves_no_semester_behind(seeded):
+    body = ("section_number,number_of_students,instructor_id,course_number,year,semester\n"
+            "201,20,99,CS1000,2034,Spring\n"  # no instructor 99
+            "202,20,1,CS1000,2035,Spring\n")
+    report = seeded.post("/bulk/sections", content=body, headers=CSV).json()
+    assert report["imported"] == 1
+    assert [error["row"] for error in report["errors"]] == [1]
+    assert query("SELECT year, semester FROM semesters WHERE year > 2030 ORDER BY year") == [(2035, "Spring")]
+
+def test_replayed_row_keeps_none_of_its_writes(seeded, monkeypatch):
+    # The association is written, then the rollup statement after it fails
+    monkeypatch.setattr(queries, "ROLLUP_ADD_COURSE", "INSERT INTO no_such_table VALUES (%s, %s, %s)")
+    body = "degree_name,degree_level,course_number,core_course\nComputer Science,BS,MATH1100,true\n"
+    report = seeded.post("/bulk/degree-courses", content=body, headers=CSV).json()
+    assert report["imported"] == 0
+    assert [error["row"] for error in report["errors"]] == [1]
+    assert query("SELECT COUNT(*) FROM degree_courses WHERE course_number = 'MATH1100'") == [(0,)]
+
+DEGREE_COURSES = "degree_name,degree_level,course_number,core_course\n"
+
+def aborting(monkeypatch, course, times):
+    """Make every write that includes ``course`` fail, the first ``times`` of them as a deadlock that aborts the transaction."""
+    associate, aborts = rollup.associate_courses_with_degrees, []
+
+    def write(cursor, rows):
+        if any(row[2] == course for row in rows):
+            if len(rows) == 1 and len(aborts) < times:
+                aborts.append(course)
+                cursor.execute("ROLLBACK")  # what MySQL does to the deadlock victim's transaction
+            raise sqlite3.OperationalError("Deadlock found when trying to get lock")
+        associate(cursor, rows)
+
+    monkeypatch.setattr(rollup, "associate_courses_with_degrees", write)
+    return aborts
+
+def test_aborted_replay_starts_over(seeded, monkeypatch):
+    aborts = aborting(monkeypatch, "MATH1100", times=1)
+    seeded.post("/add-degree/", json={"name": "Mathematics", "level": "BS"})
+    body = DEGREE_COURSES + "Mathematics,BS,CS1000,true\nMathematics,BS,CS2000,true\nMathematics,BS,MATH1100,true\n"
+    report = seeded.post("/bulk/degree-courses", content=body, headers=CSV).json()
+    assert aborts == ["MATH1100"]
+    # The retried replay rejects the row as an ordinary error
+    assert report["imported"] == 2
+    assert [error["row"] for error in report["errors"]] == [3]
+
+def test_replay_aborted_every_time_reports_its_rows(seeded, monkeypatch):
+    monkeypatch.setattr(bulk, "BATCH_SIZE", 2)
+    aborts = aborting(monkeypatch, "MATH1100", times=100)
+    seeded.post("/add-degree/", json={"name": "Mathematics", "level": "BS"})
+    body = DEGREE_COURSES + "Mathematics,BS,CS1000,true\nMathematics,BS,CS2000,true\nMathematics,BS,MATH1100,true\n"
+    response = seeded.post("/bulk/degree-courses", content=body, headers=CSV)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 2
+    # The chunk's own attempt, then every replay
+    assert len(aborts) == 1 + bulk.REPLAY_ATTEMPTS
+    assert [error["row"] for error in report["errors"]] == [3]
+    assert report["errors"][0]["error"].startswith("Not written")
+    assert query("SELECT course_number FROM degree_courses WHERE degree_name = 'Mathematics' ORDER BY course_number") \
+        == [("CS1000",), ("CS2000",)]
@@ -0,0 +1,60 @@
+import types
+
+import pytest
+
+import cache
+import database
+from cache import TTLCache, reference_cache
+
+@pytest.fixture
+def clock(monkeypatch):
+    """The cache's clock, moved by hand."""
+    now = [1000.0]
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+def test_entries_expire_after_ttl(clock):
+    entries = TTLCache(ttl=10)
+    entries.set("key", ["row"])
+    clock[0] += 9
+    assert entries.get("key") == (True, ["row"])
+    clock[0] += 2
+    assert entries.get("key") == (False, None)
+    assert entries.stats()["entries"] == 0
+    assert (entries.hits, entries.misses) == (1, 1)
+
+def test_least_recently_used_entry_is_evicted(clock):
+    entries = TTLCache(maxsize=2, ttl=10)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.get("a")
+    entries.set("c", 3)
+    assert [entries.get(key)[0] for key in ("a", "b", "c")] == [True, False, True]
+    assert entries.evictions == 1
+
+def test_invalidation_drops_only_its_tag_and_stale_reads(clock):
+    entries = TTLCache(ttl=10)
+    entries.set("degrees", 1, tag="degrees")
+    entries.set("instructors", 2, tag="instructors")
+    generation = entries.generation("degrees")
+    entries.invalidate("degrees")
+    assert entries.get("degrees") == (False, None)
+    assert entries.get("instructors") == (True, 2)
+    # A read that started before the write does not cache what it saw
+    entries.set("degrees", 1, tag="degrees", generation=generation)
+    assert entries.get("degrees") == (False, None)
+
+def test_change_behind_the_apis_back_shows_once_the_entry_expires(seeded, clock, monkeypatch):
+    monkeypatch.setattr(reference_cache, "ttl", 60)
+    reference_cache.invalidate()
+    assert [row["name"] for row in seeded.get("/instructors/").json()] == ["Ada"]
+    conn = database.connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("UPDATE instructors SET name = %s WHERE instructor_id = %s", ("Ada L.", 1))
+            conn.commit()
+    finally:
+        conn.close()
+    assert [row["name"] for row in seeded.get("/instructors/").json()] == ["Ada"]
+    clock[0] += 61
+    assert [row["name"] for row in seeded.get("/instructors/").json()] == ["Ada L."]
@@ -0,0 +1,77 @@
+import asyncio
+
+from coalesce import SingleFlight, read_flights
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_identical_concurrent_calls_share_one_query():
+    flights, calls = SingleFlight(ttl=0), []
+
+    async def query():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["row"]
+
+    async def main():
+        return await asyncio.gather(*[flights.do("key", query) for _ in range(5)], flights.do("other", query))
+
+    results = run(main())
+    assert results == [["row"]] * 6
+    assert len(calls) == 2
+    assert (flights.executed, flights.coalesced) == (2, 4)
+    assert flights.stats()["in_flight"] == 0
+
+def test_call_after_a_write_does_not_join_an_earlier_flight():
+    flights, calls = SingleFlight(ttl=0), []
+
+    async def query():
+        calls.append(1)
+        number = len(calls)
+        await asyncio.sleep(0.01)
+        return number
+
+    async def main():
+        before = asyncio.ensure_future(flights.do("key", query))
+        await asyncio.sleep(0)
+        flights.invalidate()
+        return await asyncio.gather(before, flights.do("key", query))
+
+    assert run(main()) == [1, 2]
+
+def test_finished_result_is_reused_within_ttl_only():
+    flights, calls = SingleFlight(ttl=60), []
+
+    async def query():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        first = await flights.do("key", query)
+        again = await flights.do("key", query)
+        flights.invalidate()
+        return first, again, await flights.do("key", query)
+
+    assert run(main()) == (1, 1, 2)
+    assert flights.recent_hits == 1
+
+def test_cancelled_caller_leaves_the_flight_to_the_others():
+    flights = SingleFlight(ttl=0)
+
+    async def query():
+        await asyncio.sleep(0.01)
+        return "rows"
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("key", query))
+        second = asyncio.ensure_future(flights.do("key", query))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert run(main()) == "rows"
+
+def test_route_reads_go_through_the_flights(seeded):
+    executed = read_flights.executed
+    seeded.get("/sections-evaluation-status/", params={"year": 2024, "semester": "Fall"})
+    assert read_flights.executed == executed + 1
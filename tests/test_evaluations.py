@@ -0,0 +1,45 @@
+from conftest import evaluation, post, query
+
+def test_update_evaluations_reports_each_row(seeded):
+    first = post(seeded, "/update-evaluations/", [evaluation(101, 1), evaluation(101, 2)], status=200)
+    assert (first["inserted"], first["updated"], first["unchanged"]) == (2, 0, 0)
+
+    second = post(seeded, "/update-evaluations/", [evaluation(101, 1), evaluation(101, 2, a=11), evaluation(102, 1)],
+                  status=200)
+    assert (second["inserted"], second["updated"], second["unchanged"]) == (1, 1, 1)
+    assert [(row["section_ID"], row["objective_code"], row["status"]) for row in second["results"]] == [
+        (101, 1, "unchanged"), (101, 2, "updated"), (102, 1, "inserted")]
+    assert query("SELECT eval_A_count FROM course_evaluations WHERE section_ID = 101 AND objective_code = 2") == [(11,)]
+
+def test_update_evaluations_rejects_repeated_keys(seeded):
+    response = seeded.post("/update-evaluations/", json=[evaluation(101, 1), evaluation(101, 1, a=3)])
+    assert response.status_code == 400
+    assert query("SELECT COUNT(*) FROM course_evaluations") == [(0,)]
+
+def test_update_evaluations_is_all_or_nothing(seeded):
+    # Section 999 does not exist, so the foreign key rejects the second row and the first is rolled back with it
+    response = seeded.post("/update-evaluations/", json=[evaluation(101, 1), evaluation(999, 1)])
+    assert response.status_code == 400
+    assert query("SELECT COUNT(*) FROM course_evaluations") == [(0,)]
+
+def test_update_evaluation_reads_back(seeded):
+    post(seeded, "/update-evaluation/", evaluation(103, 3, improvements="More practice"), status=200)
+    body = seeded.get("/get-evaluation/103").json()
+    assert body == evaluation(103, 3, improvements="More practice")
+
+def test_evaluation_status_and_filters_computed_in_sql(seeded):
+    post(seeded, "/update-evaluations/", [evaluation(104, 1, improvements="More labs"),
+                                          evaluation(105, 1, a=1, b=0, c=0, f=9),
+                                          evaluation(105, 2, a=1, b=0, c=0, f=9, improvements="Office hours")],
+         status=200)
+    term = {"year": 2024, "semester": "Fall"}
+
+    def statuses(**params):
+        rows = seeded.get("/sections-evaluation-status/", params={**term, **params}).json()
+        return {row["section_number"]: (row["evaluation_status"], round(row["percent_no_f_grade"], 2)) for row in rows}
+
+    assert statuses() == {104: ("Entered", 94.44), 105: ("Partially Entered", 10.0), 106: ("Not Entered", 0)}
+    assert statuses(status="Entered") == {104: ("Entered", 94.44)}
+    # 105 has 90% F grades; a section without evaluations is never dropped
+    assert list(statuses(f_grade_percentage=10)) == [104, 106]
+    assert list(statuses(f_grade_percentage=90, status="Partially Entered")) == [105]
@@ -0,0 +1,38 @@
+import json
+
+from conftest import evaluation, post
+
+TERMS = {"start_year": 2024, "start_semester": "Spring", "end_year": 2024, "end_semester": "Fall"}
+IDENTITY = {"Accept-Encoding": "identity"}
+GZIP = {"Accept-Encoding": "gzip"}
+
+def test_ndjson_lines_hold_every_column(seeded):
+    post(seeded, "/update-evaluation/", evaluation(104, 2, improvements="Más práctica"), status=200)
+    response = seeded.get("/export", params={**TERMS, "format": "ndjson"}, headers=IDENTITY)
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["section_number"] for row in rows] == [102, 103, 104, 105, 106]
+    assert rows[2]["improvements"] == "Más práctica"
+    assert rows[0]["objective_code"] is None
+
+def test_each_encoding_has_its_own_tag(seeded):
+    plain = seeded.get("/export", params=TERMS, headers=IDENTITY)
+    compressed = seeded.get("/export", params=TERMS, headers=GZIP)
+    assert plain.headers["Vary"] == compressed.headers["Vary"] == "Accept-Encoding"
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert plain.headers["ETag"] != compressed.headers["ETag"]
+    assert compressed.text == plain.text
+
+    for headers, tag, other in ((IDENTITY, plain.headers["ETag"], compressed.headers["ETag"]),
+                                (GZIP, compressed.headers["ETag"], plain.headers["ETag"])):
+        assert seeded.get("/export", params=TERMS, headers={**headers, "If-None-Match": tag}).status_code == 304
+        assert seeded.get("/export", params=TERMS, headers={**headers, "If-None-Match": other}).status_code == 200
+
+def test_filename_is_ascii_with_the_exact_name_alongside(seeded):
+    post(seeded, "/add-degree/", {"name": 'Ingeniería "Civil"\r\nX-Injected: 1', "level": "BS"})
+    response = seeded.get("/export", params={**TERMS, "degree_name": 'Ingeniería "Civil"\r\nX-Injected: 1',
+                                             "degree_level": "BS"}, headers=IDENTITY)
+    disposition = response.headers["Content-Disposition"]
+    assert disposition.isascii()
+    assert "X-Injected" not in response.headers
+    assert 'filename="export-2024-Spring-2024-Fall-Ingenieria_Civil_X-Injected_1-BS.csv"' in disposition
+    assert "filename*=UTF-8''export-2024-Spring-2024-Fall-Ingenier%C3%ADa_%22Civil%22%0D%0AX-Injected%3A_1-BS.csv" in disposition
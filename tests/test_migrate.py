@@ -0,0 +1,42 @@
+import pytest
+
+import database
+import migrate
+from conftest import query
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "SQLITE_PATH", str(tmp_path / "fresh.db"))
+
+def test_migrate_records_every_version_once(fresh_db, capsys):
+    assert migrate.main([]) == 0
+    versions = [version for version, _, _ in migrate.MIGRATIONS]
+    assert query("SELECT version FROM schema_migrations ORDER BY version") == [(version,) for version in versions]
+    assert f"Applied migration {versions[-1]}" in capsys.readouterr().out
+
+    assert migrate.main([]) == 0
+    assert "Applied" not in capsys.readouterr().out
+    assert query("SELECT COUNT(*) FROM schema_migrations") == [(len(versions),)]
+
+def test_status_lists_pending_then_applied(fresh_db, capsys):
+    assert migrate.main(["--status"]) == 0
+    assert capsys.readouterr().out.count("pending") == len(migrate.MIGRATIONS)
+    migrate.main([])
+    capsys.readouterr()
+    migrate.main(["--status"])
+    assert capsys.readouterr().out.count("applied") == len(migrate.MIGRATIONS)
+
+def test_every_statement_has_a_plan_without_unexpected_full_scans(fresh_db, capsys):
+    assert migrate.main(["--explain"]) == 0
+    out = capsys.readouterr().out
+    assert "no sample parameters" not in out
+    assert "== SECTIONS_EVALUATION_STATUS" in out
+
+def test_rebuild_rollup_bumps_its_version(fresh_db):
+    assert migrate.main(["--rebuild-rollup"]) == 0
+    assert query("SELECT version FROM table_versions WHERE table_name = 'evaluation_rollup'") == [(1,)]
+
+def test_explain_fails_on_a_statement_without_sample(fresh_db, monkeypatch, capsys):
+    monkeypatch.setattr(migrate.queries, "UNSAMPLED", "SELECT * FROM sections", raising=False)
+    assert migrate.main(["--explain"]) == 1
+    assert "Full table scans: UNSAMPLED" in capsys.readouterr().out
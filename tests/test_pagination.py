@@ -0,0 +1,55 @@
+from conftest import SECTIONS, evaluation, post
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+ALL_TERMS = {"start_year": 2020, "start_semester": "Winter", "end_year": 2030, "end_semester": "Fall"}
+
+def pages(client, path, params, limit):
+    """Follow ``X-Next-Cursor`` from the first page to the last; returns the pages."""
+    result, after = [], None
+    while True:
+        response = client.get(path, params={**params, "limit": limit, **({"after": after} if after else {})})
+        assert response.status_code == 200, response.text
+        result.append(response.json())
+        after = response.headers.get(NEXT_CURSOR_HEADER)
+        if after is None:
+            return result
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(["CS1000", 7, None])) == ["CS1000", 7, None]
+
+def test_pages_cover_every_row_once_in_order(seeded):
+    everything = seeded.get("/list-sections/", params=ALL_TERMS).json()
+    assert [row["section_number"] for row in everything] == [101, 102, 103, 104, 105, 106, 107]
+    assert NEXT_CURSOR_HEADER not in seeded.get("/list-sections/", params=ALL_TERMS).headers
+    for limit in (1, 2, 3, len(SECTIONS)):
+        result = pages(seeded, "/list-sections/", ALL_TERMS, limit)
+        assert all(len(page) <= limit for page in result)
+        assert [row for page in result for row in page] == everything
+
+def test_pages_with_a_string_keyset(seeded):
+    post(seeded, "/associate-course-with-degree/", {"degree_name": "Computer Science", "degree_level": "BS",
+                                                    "course_number": "MATH1100", "core_course": False})
+    params = {"degree_name": "Computer Science", "degree_level": "BS"}
+    result = pages(seeded, "/courses-by-degree/", params, 1)
+    assert [page[0]["course_number"] for page in result] == ["CS1000", "CS2000", "MATH1100"]
+
+def test_grouped_pages_never_split_a_section(seeded):
+    post(seeded, "/update-evaluations/", [evaluation(section, objective) for section in (101, 102, 103)
+                                          for objective in (1, 2, 3)], status=200)
+    result = pages(seeded, "/evaluations/", {"section_ids": [101, 102, 103]}, 2)
+    sections = [section for page in result for section in page]
+    assert [section["section_number"] for section in sections] == [101, 102, 103]
+    assert all(len(section["evaluations"]) == 3 for section in sections)
+
+def test_stream_returns_every_remaining_row(seeded):
+    first = seeded.get("/list-sections/", params={**ALL_TERMS, "limit": 2})
+    response = seeded.get("/list-sections/", params={**ALL_TERMS, "after": first.headers[NEXT_CURSOR_HEADER],
+                                                     "stream": "true"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert len(lines) == len(SECTIONS) - 2
+
+def test_malformed_cursor_is_a_400(seeded):
+    for after in ("%%%", encode_cursor([1])):
+        response = seeded.get("/list-sections/", params={**ALL_TERMS, "after": after})
+        assert response.status_code == 400
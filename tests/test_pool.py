@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+from fastapi import HTTPException
+
+import database
+
+@pytest.fixture
+def connect(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "SQLITE_PATH", str(tmp_path / "pool.db"))
+    return database.connect
+
+def is_closed(conn):
+    try:
+        conn.ping()
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+def test_released_connection_is_checked_out_again(connect):
+    pool = database.ConnectionPool(size=2, connect=connect)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+def test_open_transaction_is_rolled_back_on_release(connect):
+    pool = database.ConnectionPool(size=1, connect=connect)
+    conn = pool.acquire()
+    with conn.cursor() as cursor:
+        cursor.execute("INSERT INTO instructors (instructor_id, name) VALUES (%s, %s)", (1, "Ada"))
+    assert conn.in_transaction
+    pool.release(conn)
+    assert not conn.in_transaction
+    with pool.acquire().cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM instructors")
+        assert cursor.fetchall() == [(0,)]
+
+def test_old_connection_is_recycled(connect):
+    pool = database.ConnectionPool(size=1, recycle=0, connect=connect)
+    conn = pool.acquire()
+    pool.release(conn)
+    fresh = pool.acquire()
+    assert fresh is not conn
+    assert is_closed(conn)
+
+def test_broken_connection_is_discarded(connect):
+    pool = database.ConnectionPool(size=1, ping_after=0, connect=connect)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.raw.close()  # as if the server dropped it while idle
+    assert pool.acquire() is not conn
+
+def test_release_without_reuse_closes_the_connection(connect):
+    pool = database.ConnectionPool(size=1, connect=connect)
+    conn = pool.acquire()
+    pool.release(conn, reuse=False)
+    assert is_closed(conn)
+    assert pool.acquire() is not conn
+
+def test_full_pool_times_out_with_503(connect):
+    pool = database.ConnectionPool(size=1, timeout=0.01, connect=connect)
+    pool.acquire()
+    with pytest.raises(HTTPException) as error:
+        pool.acquire()
+    assert error.value.status_code == 503
@@ -0,0 +1,71 @@
+import re
+
+from mysql.connector.cursor import RE_SQL_INSERT_STMT, RE_SQL_INSERT_VALUES, RE_SQL_ON_DUPLICATE
+from mysql.connector.errors import InterfaceError
+
+import database
+import rollup
+import sqlite_engine
+from conftest import evaluation, post, query
+
+ROLLUP = "SELECT * FROM evaluation_rollup ORDER BY degree_name, degree_level, objective_code, year, semester"
+
+def rebuilt():
+    """The rollup as ``rollup.rebuild`` computes it from the base tables (rolled back afterwards)."""
+    conn = database.connect()
+    try:
+        with conn.cursor() as cursor:
+            conn.start_transaction()
+            rollup.rebuild(cursor)
+            cursor.execute(ROLLUP)
+            return cursor.fetchall()
+    finally:
+        conn.rollback()
+        conn.close()
+
+def test_rollup_matches_rebuild_after_writes(seeded):
+    post(seeded, "/update-evaluations/", [evaluation(101, 1), evaluation(102, 1), evaluation(103, 2),
+                                          evaluation(105, 3, a=4)], status=200)
+    # Changed counts, an unchanged row and a new one
+    post(seeded, "/update-evaluations/", [evaluation(101, 1, a=20, f=0), evaluation(102, 1), evaluation(106, 1)],
+         status=200)
+    post(seeded, "/update-evaluation/", evaluation(104, 2, c=7), status=200)
+    # MATH1100 already has evaluations, so associating it folds them into the degree
+    post(seeded, "/associate-course-with-degree/", {"degree_name": "Computer Science", "degree_level": "BS",
+                                                    "course_number": "MATH1100", "core_course": False})
+    # Re-associating only changes the core flag
+    post(seeded, "/associate-course-with-degree/", {"degree_name": "Computer Science", "degree_level": "BS",
+                                                    "course_number": "MATH1100", "core_course": True})
+    response = seeded.post("/bulk/evaluations", content="\n".join([
+        '{"section_ID": 107, "objective_code": 1, "eval_criteria": "Exam", "eval_A_count": 1, "eval_B_count": 2, '
+        '"eval_C_count": 3, "eval_F_count": 4, "improvements": ""}',
+        '{"section_ID": 101, "objective_code": 1, "eval_criteria": "Exam", "eval_A_count": 2, "eval_B_count": 2, '
+        '"eval_C_count": 2, "eval_F_count": 2, "improvements": ""}',
+    ]), headers={"Content-Type": "application/x-ndjson"})
+    assert response.json()["imported"] == 2
+
+    rows = query(ROLLUP)
+    assert rows
+    assert rows == rebuilt()
+
+def test_report_reads_the_rollup(seeded):
+    post(seeded, "/update-evaluations/", [evaluation(104, 1, a=6, b=2, c=1, f=1), evaluation(106, 1, a=4, b=0, c=0, f=0)],
+         status=200)
+    report = seeded.get("/reports/term-objectives/", params={"year": 2024, "semester": "Fall"}).json()
+    assert [(row["degree_name"], row["objective_code"], row["section_count"], row["a_count"], row["f_count"])
+            for row in report] == [("Computer Science", 1, 2, 10, 1)]
+
+def test_association_runs_on_mysql_connector(seeded, monkeypatch):
+    # mysql.connector's executemany rewrites an INSERT into one multi-row VALUES statement and fails if it cannot
+    executemany = sqlite_engine.SQLiteCursor.executemany
+
+    def rewriting_executemany(self, sql, seq_params):
+        if re.match(RE_SQL_INSERT_STMT, sql) and not re.search(RE_SQL_INSERT_VALUES, re.sub(RE_SQL_ON_DUPLICATE, "", sql)):
+            raise InterfaceError("Failed rewriting statement for multi-row INSERT. Check SQL syntax")
+        return executemany(self, sql, seq_params)
+
+    monkeypatch.setattr(sqlite_engine.SQLiteCursor, "executemany", rewriting_executemany)
+    post(seeded, "/update-evaluation/", evaluation(105, 1), status=200)
+    post(seeded, "/associate-course-with-degree/", {"degree_name": "Computer Science", "degree_level": "BS",
+                                                    "course_number": "MATH1100", "core_course": False})
+    assert query(ROLLUP) == rebuilt()
@@ -0,0 +1,54 @@
+import pytest
+
+from search import MAX_PREFIX_WORDS, SearchIndex
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.add_objective(1, "Graph algorithms", "Shortest paths and sorting")
+    index.add_objective(2, "Sorting", "Comparison sorts, with graph examples")
+    index.add_objective(3, "Sort stability", "Stable and unstable orders")
+    index.add_course("CS3000", "Graph theory")
+    return index
+
+def keys(results):
+    return [row["course_number"] if row["kind"] == "course" else row["objective_code"] for row in results]
+
+def test_title_match_outranks_description_match(index):
+    assert keys(index.search("sorting", kind="objective")) == [2, 1]
+    assert keys(index.search("paths")) == [1]
+
+def test_every_word_must_match(index):
+    assert keys(index.search("graph shortest")) == [1]
+    assert index.search("graph topology") == []
+
+def test_last_word_matches_as_prefix(index):
+    # "sort" is a word of objective 3 and a prefix of objective 2's title: the exact match ranks first
+    assert keys(index.search("sort", kind="objective"))[:2] == [3, 2]
+    assert keys(index.search("algo")) == [1]
+    # Only the last word is a prefix
+    assert index.search("algo graph") == []
+
+def test_kind_filter_and_limit(index):
+    assert keys(index.search("graph", kind="course")) == ["CS3000"]
+    assert set(keys(index.search("graph", kind="objective"))) == {1, 2}
+    assert len(index.search("graph", limit=2)) == 2
+    assert keys(index.search("graph", limit=1)) == keys(index.search("graph"))[:1]
+
+def test_short_prefix_keeps_the_most_frequent_completions():
+    index = SearchIndex()
+    for code in range(MAX_PREFIX_WORDS + 1):
+        index.add_objective(code, f"x{code:03d}", None)
+    index.add_objective(999, "x000 again", None)
+    results = index.search("x", limit=MAX_PREFIX_WORDS + 2)
+    # One of the words in a single document is left out; x000, in two, is kept
+    assert len(results) == MAX_PREFIX_WORDS + 1
+    assert 999 in keys(results) and 0 in keys(results)
+
+def test_route_ranks_seeded_rows(seeded):
+    body = seeded.get("/search", params={"q": "write"}).json()
+    # Both match in the description; the shorter document ranks first
+    assert [(row["kind"], row["objective_code"]) for row in body] == [("objective", 3), ("objective", 1)]
+    assert all(row["score"] > 0 for row in body)
+    body = seeded.get("/search", params={"q": "intro prog", "kind": "course"}).json()
+    assert [row["course_number"] for row in body] == ["CS1000"]
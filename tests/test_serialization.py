@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from conftest import post
+from models import CourseResponse, SectionEvaluation
+from serialization import projector
+
+def test_projector_keeps_model_fields_and_coerces_booleans():
+    row = {"is_core_course": 1, "course_name": "Intro", "course_number": "CS1000", "extra": 1}
+    item = projector(CourseResponse)(row)
+    assert list(item.items()) == [("course_number", "CS1000"), ("course_name", "Intro"), ("is_core_course", True)]
+
+def test_projector_fills_missing_defaulted_fields():
+    row = {"section_number": 101, "course_number": "CS1000", "number_of_students": 30, "year": 2024,
+           "semester": "Fall", "has_evaluation": 0}
+    assert projector(SectionEvaluation)(row) == {**{key: value for key, value in row.items() if key != "has_evaluation"},
+                                                 "instructor_id": None, "evaluation": None}
+    with pytest.raises(KeyError):
+        projector(SectionEvaluation)({"section_number": 101})
+
+def test_instructor_sections_page_and_stream(seeded):
+    post(seeded, "/update-evaluation/", {"section_ID": 104, "objective_code": 1, "eval_criteria": "Exam", "eval_A_count": 1,
+                                         "eval_B_count": 1, "eval_C_count": 1, "eval_F_count": 1, "improvements": ""},
+         status=200)
+    params = {"instructor_id": 1, "degree_name": "Computer Science", "year": 2024, "semester": "Fall"}
+    response = seeded.get("/instructor-sections/", params=params)
+    assert response.status_code == 200, response.text
+    assert [(row["section_number"], row["instructor_id"], row["evaluation"]) for row in response.json()] == \
+        [(106, None, None), (104, None, None)]
+    streamed = seeded.get("/instructor-sections/", params={**params, "stream": "true"})
+    assert streamed.status_code == 200
+    assert [json.loads(line)["section_number"] for line in streamed.text.splitlines()] == [106, 104]
@@ -0,0 +1,64 @@
+import pytest
+
+import database
+import queries
+import sqlite_engine
+import statements
+from conftest import query
+
+ALL_TERMS = {"start_year": 2020, "start_semester": "Winter", "end_year": 2030, "end_semester": "Fall"}
+
+def test_every_in_list_size_is_registered_at_import():
+    registered = dict(statements._registry)
+    for size in statements.IN_BUCKETS:
+        sql, values = statements.bucketed("EVALUATIONS_BY_SECTIONS", list(range(1, size + 1)))
+        assert registered[sql] == "EVALUATIONS_BY_SECTIONS"
+        assert len(values) == size
+    sql, values = statements.bucketed("EVALUATIONS_BY_SECTIONS", [5, 6, 7])
+    assert values == [5, 6, 7, 7, 7, 7, 7, 7]
+    assert statements._registry == registered
+
+@pytest.fixture
+def prepared(monkeypatch):
+    monkeypatch.setattr(statements, "ENABLED", True)
+
+def test_every_in_list_size_returns_the_unpadded_rows(seeded):
+    expected = query(queries.EVALUATIONS_BY_SECTIONS.format(section_ids="%s,%s,%s"), (101, 104, 107, 0, 100))
+    assert [row[0] for row in expected] == [101, 104, 107]
+    for size in statements.IN_BUCKETS:
+        # Filled to the bucket's size exactly, and one short of it so the last value is repeated
+        for count in (size, size - 1):
+            ids = [101, 104, *range(1000, 1000 + count - 3), 107]
+            sql, values = statements.bucketed("EVALUATIONS_BY_SECTIONS", ids)
+            assert len(values) == size
+            assert query(sql, (*values, 0, 100)) == expected
+
+def test_plain_cursors_unless_enabled(seeded):
+    assert not statements.ENABLED
+    seeded.get("/list-sections/", params=ALL_TERMS)
+    assert not statements._cursors
+
+def test_cursor_prepared_once_per_connection(seeded, prepared):
+    prepares = statements.PREPARES._values.get(("LIST_SECTIONS",), 0)
+    executions = statements.EXECUTIONS._values.get(("LIST_SECTIONS",), 0)
+    first = seeded.get("/list-sections/", params=ALL_TERMS).json()
+    assert seeded.get("/list-sections/", params=ALL_TERMS).json() == first
+    cursors = [conn_cursors[queries.LIST_SECTIONS] for conn_cursors in statements._cursors.values()
+               if queries.LIST_SECTIONS in conn_cursors]
+    # The second read reuses the pooled connection, and with it the cursor
+    assert len(cursors) == 1
+    assert statements.PREPARES._values[("LIST_SECTIONS",)] == prepares + 1
+    assert statements.EXECUTIONS._values[("LIST_SECTIONS",)] == executions + 2
+
+def test_discarded_connection_closes_its_prepared_cursors(seeded, prepared, monkeypatch):
+    closed = []
+    close = sqlite_engine.SQLiteCursor.close
+    monkeypatch.setattr(sqlite_engine.SQLiteCursor, "close", lambda cursor: closed.append(cursor) or close(cursor))
+    seeded.get("/list-sections/", params=ALL_TERMS)
+    seeded.get("/evaluations/", params={"section_ids": [101, 102]})
+    cursors = [cursor for conn_cursors in statements._cursors.values() for cursor in conn_cursors.values()]
+    assert len(cursors) >= 2
+    closed.clear()
+    database.pool.close()
+    assert not statements._cursors
+    assert len(closed) == len(cursors)
@@ -0,0 +1,50 @@
+import pytest
+from fastapi import HTTPException
+
+import database
+import versions
+from conftest import post, query
+from unit_of_work import UnitOfWork
+
+def shared_versions():
+    return dict(query("SELECT table_name, version FROM table_versions"))
+
+def test_failed_statement_keeps_none_of_the_unit(seeded):
+    tags, stored = dict(versions._versions), shared_versions()
+    # The semester is inserted first; the section then fails on its unknown instructor
+    post(seeded, "/add-section/", {"section_number": 900, "number_of_students": 30, "instructor_id": 99,
+                                   "course_number": "CS1000", "year": 2030, "semester": "Spring"}, status=400)
+    assert query("SELECT * FROM semesters WHERE year = 2030") == []
+    assert query("SELECT * FROM sections WHERE section_number = 900") == []
+    assert shared_versions() == stored
+    assert versions._versions == tags
+
+def test_failed_call_rolls_back_the_earlier_steps(seeded):
+    def failing(cursor):
+        cursor.execute("INSERT INTO sections (section_number, number_of_students, instructor_id, course_number,"
+                       " year, semester) VALUES (101, 1, 1, 'CS1000', 2023, 'Fall')")
+
+    unit = (UnitOfWork()
+            .execute("INSERT IGNORE INTO semesters (year, semester) VALUES (%s, %s)", (2031, "Fall"), "semesters")
+            .execute("UPDATE instructors SET name = %s WHERE instructor_id = 1", ("Grace",), "instructors")
+            .call(failing, tables=("sections",)))
+    stored = shared_versions()
+    with pytest.raises(HTTPException) as raised:
+        seeded.portal.call(unit.commit, database.db)
+    assert raised.value.status_code == 400
+    assert query("SELECT * FROM semesters WHERE year = 2031") == []
+    assert query("SELECT name FROM instructors") == [("Ada",)]
+    assert shared_versions() == stored
+
+def test_only_steps_that_changed_rows_bump_their_tables(seeded):
+    stored = shared_versions()
+    results = seeded.portal.call(
+        (UnitOfWork()
+         .execute("INSERT IGNORE INTO semesters (year, semester) VALUES (%s, %s)", (2024, "Fall"), "semesters")
+         .execute("UPDATE instructors SET name = %s WHERE instructor_id = 1", ("Grace",), "instructors")).commit,
+        database.db)
+    assert results == [0, 1]
+    after = shared_versions()
+    assert after["semesters"] == stored["semesters"]
+    assert after["instructors"] == stored["instructors"] + 1
+    assert versions._versions["instructors"] == after["instructors"]
@@ -0,0 +1,103 @@
+import asyncio
+
+import database
+import versions
+from conftest import poll_versions, post, query, write_elsewhere
+
+def test_unchanged_table_answers_304(seeded):
+    first = seeded.get("/instructors/")
+    tag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = seeded.get("/instructors/", headers={"If-None-Match": tag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == tag
+    # Weak comparison, and a list of candidates
+    assert seeded.get("/instructors/", headers={"If-None-Match": f'"other", W/{tag}'}).status_code == 304
+
+def test_write_to_a_read_table_changes_the_tag(seeded):
+    tag = seeded.get("/instructors/").headers["ETag"]
+    post(seeded, "/add-instructor/", {"instructor_id": 2, "name": "Grace"})
+    response = seeded.get("/instructors/", headers={"If-None-Match": tag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != tag
+    assert [row["name"] for row in response.json()] == ["Ada", "Grace"]
+
+def test_write_to_another_table_keeps_the_tag(seeded):
+    tag = seeded.get("/instructors/").headers["ETag"]
+    post(seeded, "/add-degree/", {"name": "Mathematics", "level": "BS"})
+    assert seeded.get("/instructors/", headers={"If-None-Match": tag}).status_code == 304
+
+def test_rejected_write_keeps_the_tag(seeded):
+    tag = seeded.get("/instructors/").headers["ETag"]
+    assert seeded.post("/add-instructor/", json={"instructor_id": 1, "name": "Ada again"}).status_code == 400
+    assert seeded.get("/instructors/", headers={"If-None-Match": tag}).status_code == 304
+
+def test_unchanged_evaluation_upsert_keeps_the_tag(seeded):
+    body = [{"section_ID": 101, "objective_code": 1, "eval_criteria": "Exam", "eval_A_count": 1, "eval_B_count": 1,
+             "eval_C_count": 1, "eval_F_count": 1, "improvements": ""}]
+    post(seeded, "/update-evaluations/", body, status=200)
+    tag = seeded.get("/get-evaluation/101").headers["ETag"]
+    post(seeded, "/update-evaluations/", body, status=200)
+    assert seeded.get("/get-evaluation/101", headers={"If-None-Match": tag}).status_code == 304
+
+def test_write_by_another_worker_changes_the_tag_once_polled(seeded):
+    tag = seeded.get("/instructors/").headers["ETag"]
+    write_elsewhere("INSERT INTO instructors (instructor_id, name) VALUES (%s, %s)", (2, "Grace"), "instructors")
+    # Until the next poll this worker answers from the versions it holds, without a query
+    assert seeded.get("/instructors/", headers={"If-None-Match": tag}).status_code == 304
+    poll_versions(seeded)
+    response = seeded.get("/instructors/", headers={"If-None-Match": tag})
+    assert response.status_code == 200
+    # The cached list was dropped too
+    assert [row["name"] for row in response.json()] == ["Ada", "Grace"]
+
+def test_304_touches_no_database(seeded, monkeypatch):
+    tag = seeded.get("/instructors/").headers["ETag"]
+    monkeypatch.setattr(database.Database, "run", None)  # any query would fail now
+    assert seeded.get("/instructors/", headers={"If-None-Match": tag}).status_code == 304
+
+def test_background_poll_rereads_the_versions(seeded, monkeypatch):
+    monkeypatch.setattr(versions, "VERSIONS_POLL_INTERVAL", 0.01)
+    tag = seeded.get("/instructors/").headers["ETag"]
+    write_elsewhere("INSERT INTO instructors (instructor_id, name) VALUES (%s, %s)", (2, "Grace"), "instructors")
+    task = seeded.portal.call(versions.start, database.db)
+    try:
+        seeded.portal.call(asyncio.sleep, 0.1)
+        assert seeded.get("/instructors/", headers={"If-None-Match": tag}).status_code == 200
+    finally:
+        seeded.portal.call(task.cancel)
+
+def test_writes_bump_the_shared_versions(seeded):
+    before = dict(query("SELECT table_name, version FROM table_versions"))
+    post(seeded, "/add-instructor/", {"instructor_id": 2, "name": "Grace"})
+    after = dict(query("SELECT table_name, version FROM table_versions"))
+    assert after["instructors"] == before["instructors"] + 1
+    assert after["sections"] == before["sections"]
+
+def test_index_picks_up_another_workers_write(seeded):
+    params = {"objective_codes": [2]}
+    post(seeded, "/associate-course-objective/", {"course_number": "CS2000", "objective_code": 2})
+    assert [row["course_number"] for row in seeded.get("/courses-by-objective/", params=params).json()] == ["CS2000"]
+    write_elsewhere("INSERT INTO course_learning_objectives (course_number, objective_code) VALUES (%s, %s)",
+                    ("CS1000", 2), "course_learning_objectives")
+    poll_versions(seeded)
+    response = seeded.get("/courses-by-objective/", params=params)
+    assert [row["course_number"] for row in response.json()] == ["CS1000", "CS2000"]
+
+def test_own_write_after_another_workers_reloads_the_index(seeded):
+    params = {"objective_codes": [2]}
+    seeded.get("/courses-by-objective/", params={"objective_codes": [1]})
+    write_elsewhere("INSERT INTO course_learning_objectives (course_number, objective_code) VALUES (%s, %s)",
+                    ("CS1000", 2), "course_learning_objectives")
+    # This write's version is two past the last one seen here
+    post(seeded, "/associate-course-objective/", {"course_number": "CS2000", "objective_code": 2})
+    response = seeded.get("/courses-by-objective/", params=params)
+    assert [row["course_number"] for row in response.json()] == ["CS1000", "CS2000"]
+
+def test_search_picks_up_another_workers_write(seeded):
+    assert seeded.get("/search", params={"q": "topology"}).json() == []
+    write_elsewhere("INSERT INTO courses (name, department_code, course_code) VALUES (%s, %s, %s)",
+                    ("Topology", "MATH", 3300), "courses")
+    poll_versions(seeded)
+    assert [row["course_number"] for row in seeded.get("/search", params={"q": "topology"}).json()] == ["MATH3300"]
@@ -0,0 +1,64 @@
+"""One pooled connection and one transaction per write request.
+
+A write route lists its statements on a ``UnitOfWork`` and awaits
+``commit(db)``. The statements run in order on one connection borrowed for the
+whole unit, inside one transaction: either all of them land or, on a database
+error, none do and the route answers 400. The transaction also bumps the versions
+of the tables they changed, and only after the commit are those passed to
+``table_changed``, so cached reads and ETags move on together with the data.
+"""
+from fastapi import HTTPException
+
+from database import DB_ERRORS
+from versions import record, table_changed
+
+class UnitOfWork:
+    """The writes of one request, applied atomically by ``commit``."""
+
+    def __init__(self):
+        self._steps = []
+
+    def execute(self, query, params, *tables):
+        """Queue one statement; ``tables`` count as changed if it affects any row (an ignored INSERT IGNORE does not)."""
+        def step(cursor):
+            cursor.execute(query, params)
+            return cursor.rowcount
+        self._steps.append((step, tables, bool))
+        return self
+
+    def insert(self, table, columns, entity):
+        """Queue an INSERT of ``entity``'s ``columns`` into ``table``."""
+        statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        return self.execute(statement, tuple(getattr(entity, column) for column in columns), table)
+
+    def call(self, write, *args, tables=(), changed=None):
+        """Queue ``write(cursor, *args)``, such as the rollup helpers.
+
+        ``tables`` count as changed if ``changed(result)`` is true, or always when ``changed`` is None.
+        """
+        self._steps.append((lambda cursor: write(cursor, *args), tables, changed or (lambda result: True)))
+        return self
+
+    async def commit(self, db):
+        """Run the queued steps in one transaction; returns each step's result (row count for statements)."""
+        results, versions = await db.run(self._apply)
+        if versions:
+            table_changed(versions)
+        return results
+
+    def _apply(self, conn):
+        results, changed = [], set()
+        try:
+            with conn.cursor() as cursor:
+                conn.start_transaction()
+                for step, tables, was_changed in self._steps:
+                    result = step(cursor)
+                    results.append(result)
+                    if was_changed(result):
+                        changed.update(tables)
+                versions = record(cursor, changed)
+                conn.commit()
+        except DB_ERRORS as error:
+            conn.rollback()
+            raise HTTPException(status_code=400, detail=str(error))
+        return results, versions
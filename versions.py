@@ -0,0 +1,146 @@
+"""Per-table versions behind conditional GETs.
+
+Every write bumps the versions of the tables it changed in ``table_versions``,
+inside its own transaction (``record``), and once committed passes the new
+versions to ``table_changed``. Every read route declares the tables it reads with
+``Depends(conditional(...))``, which tags the response with a strong ETag derived
+from their versions. If the request's ``If-None-Match`` already holds that tag,
+the route answers 304 before any query runs.
+
+The versions live in the database so that every worker process sees every write.
+A process keeps the versions it has seen in memory, and ``conditional`` answers
+from them alone, so a 304 costs no database round trip. A background task
+(``start``) re-reads them every ``VERSIONS_POLL_MS`` (config.txt, default 1000)
+and drops the cached reads of any table another process changed meanwhile.
+That is a deliberate window: for up to one poll interval after a write made
+through another worker, this one still tags and answers with what it had,
+including 304s for a copy that just went stale. Its own writes show at once.
+Structures a process keeps current from its own writes, like the in-memory
+indexes, register with ``on_change`` to hear of the tables other processes changed.
+
+The versions are read before the route queries, and a write's bump commits with
+it, so a tag can be older than the body it labels but never newer.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+
+from fastapi import HTTPException, Request, Response
+
+import queries
+from cache import reference_cache
+from coalesce import read_flights
+from config import config
+from database import DB_ERRORS
+
+VERSIONS_POLL_INTERVAL = float(config.get('VERSIONS_POLL_MS', 1000)) / 1000
+
+log = logging.getLogger(__name__)
+
+_versions = {}  # table -> latest version this process has seen
+_lock = threading.Lock()
+_listeners = []
+# A restored or recreated database hands out old versions again; the nonce keeps a tag
+# from before a restart from matching different data (at the cost of workers' tags differing).
+_NONCE = os.urandom(8).hex()
+
+def record(cursor, tables):
+    """Bump the versions of ``tables`` in the caller's transaction, as its last statement; returns ``{table: version}``.
+
+    ``cursor`` must return plain tuples.
+    """
+    tables = sorted(set(tables))
+    if not tables:
+        return {}
+    cursor.execute(queries.BUMP_TABLE_VERSIONS.format(tables=",".join(["(%s, 1)"] * len(tables))), tables)
+    cursor.execute(queries.TABLE_VERSIONS_OF.format(tables=",".join(["%s"] * len(tables))), tables)
+    return dict(cursor.fetchall())
+
+def on_change(listener):
+    """Call ``listener(tables)`` on the event loop with the tables another process changed, once this one sees it."""
+    _listeners.append(listener)
+    return listener
+
+def table_changed(versions):
+    """Adopt the versions a committed write ``record``-ed and drop the cached and coalesced reads of its tables."""
+    _adopt(versions, own=True)
+
+def _adopt(versions, own):
+    with _lock:
+        # A write bumps each of its tables by one, so a larger step means another process wrote the table in between
+        others = {table for table, version in versions.items() if not own or version > _versions.get(table, 0) + 1}
+        for table, version in versions.items():
+            _versions[table] = max(_versions.get(table, 0), version)
+    for table in versions:
+        reference_cache.invalidate(table)
+    read_flights.invalidate()
+    if others:
+        for listener in _listeners:
+            listener(others)
+
+def _read_versions(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(queries.TABLE_VERSIONS)
+        return cursor.fetchall()
+
+async def sync(db):
+    """Re-read every version and adopt those another process moved on."""
+    rows = await db.run(_read_versions, read=True)
+    with _lock:
+        changed = {table: version for table, version in rows if version > _versions.get(table, 0)}
+    if changed:
+        _adopt(changed, own=False)
+
+async def start(db):
+    """Read the versions ahead of the first request, then keep re-reading them; returns the task to cancel at shutdown."""
+    await _read_or_log(db)
+    return asyncio.ensure_future(_poll(db))
+
+async def _poll(db):
+    while True:
+        await asyncio.sleep(VERSIONS_POLL_INTERVAL)
+        await _read_or_log(db)
+
+async def _read_or_log(db):
+    # A database that is down only delays the next read
+    try:
+        await sync(db)
+    except DB_ERRORS as error:
+        log.warning("Table versions not read: %s", error)
+
+def etag(tables, coding=None, scope=None):
+    with _lock:
+        parts = [f"{table}={_versions.get(table, 0)}" for table in tables]
+    if scope:
+        parts.append(f"scope={scope}")
+    digest = hashlib.blake2b("|".join([_NONCE, *parts]).encode(), digest_size=12).hexdigest()
+    return f'"{digest}-{coding}"' if coding else f'"{digest}"'
+
+def _matches(if_none_match, tag):
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so a W/ prefix added by a proxy still matches
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in if_none_match.split(","))
+
+def conditional(*tables, coding=None, scope=None):
+    """Dependency for a read route over ``tables``: sets its ETag, or answers 304 when the client's copy is current.
+
+    A route that compresses its body passes ``coding(request)``, the content-coding it will apply or None; each
+    coding then gets a tag of its own, since the bytes differ, and the response varies on ``Accept-Encoding``.
+    A route whose body also depends on something other than the tables (the current date, say) passes
+    ``scope(request)``, a string describing it; the tag changes whenever that string does.
+    Writes made through other workers reach the tag within ``VERSIONS_POLL_INTERVAL`` (see the module docstring).
+    """
+    async def check(request: Request, response: Response):
+        tag = etag(tables, coding(request) if coding else None, scope(request) if scope else None)
+        # no-cache: browsers may keep the body but must revalidate it on every use
+        headers = {"ETag": tag, "Cache-Control": "no-cache"}
+        if coding:
+            headers["Vary"] = "Accept-Encoding"
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, tag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+    return check